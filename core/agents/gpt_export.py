@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+RooCode GPT Export Splitter
+Zerlegt *.gpt-export.json mit vielen Konversationen in einem Durchlauf in Transkripte
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Projekt-Root für Paketimporte verfügbar machen (Aufruf als Skript aus core/agents)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.agents.transkriptor import (ROLE_SPEAKER_MAP, BatchSettings, TranscriptError,
+                                      TranscriptLimits, iter_turns)
+from core.ci.json_stream import JsonArrayWriter, JsonStreamError, JsonStreamReader
+from core.common.atomic_file import atomic_output
+
+EXPORT_SUFFIX = ".gpt-export.json"
+SAFE_NAME = re.compile(r"[^A-Za-z0-9_-]+")
+
+
+def iter_conversations(export_path: Path) -> Iterator[Dict[str, Any]]:
+    """Streamt die Konversationen eines Exports (Wurzel-Array oder Feld 'conversations')"""
+    with open(export_path, 'r', encoding='utf-8') as f:
+        reader = JsonStreamReader(f)
+        if reader.peek() == "[":
+            yield from reader.iter_array()
+        else:
+            found = False
+            for key, value in reader.iter_object(stream_keys=("conversations",)):
+                if key == "conversations" and hasattr(value, "__next__"):
+                    found = True
+                    yield from value
+            if not found:
+                raise TranscriptError("MISSING_REQUIRED_FIELDS",
+                                      f"{export_path} contains no conversations array")
+        reader.expect_end()
+
+
+def _find_leaf(mapping: Dict[str, Any]) -> Optional[str]:
+    """Letzter Knoten des jeweils jüngsten Zweigs, falls current_node fehlt"""
+    roots = [node_id for node_id, node in mapping.items()
+             if not isinstance(node, dict) or node.get("parent") not in mapping]
+    if not roots:
+        return None
+    node_id = roots[0]
+    seen = set()
+    while node_id not in seen:
+        seen.add(node_id)
+        children = [child for child in (mapping[node_id] or {}).get("children") or []
+                    if child in mapping]
+        if not children:
+            break
+        node_id = children[-1]
+    return node_id
+
+
+def _node_message(node: Any) -> Optional[Dict[str, str]]:
+    """Wandelt einen Nachrichtenknoten in eine Chat-Nachricht (role, content) um"""
+    message = node.get("message") if isinstance(node, dict) else None
+    if not isinstance(message, dict):
+        return None
+
+    role = (message.get("author") or {}).get("role")
+    if role not in ROLE_SPEAKER_MAP:
+        # Tool-Aufrufe u.ä. gehören nicht zum Gesprächstext
+        return None
+
+    content = message.get("content")
+    if isinstance(content, dict):
+        parts = content.get("parts") or []
+        text = "\n".join(part for part in parts if isinstance(part, str))
+    else:
+        text = content if isinstance(content, str) else ""
+
+    if not text:
+        return None
+    return {"role": role, "content": text}
+
+
+def linearize_active_branch(conversation: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Liefert die Nachrichten des aktiven Zweigs von der Wurzel bis current_node.
+
+    Der Baum wird iterativ über die parent-Verweise durchlaufen, sodass auch
+    sehr tiefe Konversationen keine Rekursionsgrenze erreichen.
+    """
+    mapping = conversation.get("mapping") or {}
+    node_id = conversation.get("current_node")
+    if node_id not in mapping:
+        node_id = _find_leaf(mapping)
+
+    branch = []
+    seen = set()
+    while node_id in mapping and node_id not in seen:
+        seen.add(node_id)
+        node = mapping[node_id]
+        branch.append(node)
+        node_id = node.get("parent") if isinstance(node, dict) else None
+    branch.reverse()
+
+    messages = []
+    for node in branch:
+        message = _node_message(node)
+        if message is not None:
+            messages.append(message)
+    return messages
+
+
+def conversation_output_path(export_path: Path, output_dir: Path,
+                             conversation: Dict[str, Any], number: int) -> Path:
+    """Ausgabepfad {export}.{conversation_id}.transcript.json"""
+    name = export_path.name
+    if name.endswith(EXPORT_SUFFIX):
+        name = name[:-len(EXPORT_SUFFIX)]
+    conversation_id = conversation.get("conversation_id") or conversation.get("id")
+    suffix = SAFE_NAME.sub("_", str(conversation_id)) if conversation_id else f"{number:05d}"
+    return output_dir / f"{name}.{suffix}.transcript.json"
+
+
+def transcribe_conversation(conversation: Dict[str, Any], output_path: Path,
+                            limits: TranscriptLimits,
+                            deadline: Optional[float] = None) -> Dict[str, Any]:
+    """Linearisiert eine Konversation und schreibt ihr Transkript (Worker-Prozess)"""
+    result = {"conversation_id": conversation.get("conversation_id") or conversation.get("id"),
+              "title": conversation.get("title"), "output_file": str(output_path)}
+    try:
+        messages = linearize_active_branch(conversation)
+        if not messages:
+            raise TranscriptError("INVALID_FILE_FORMAT", "No text messages on the active branch")
+
+        speaker_counts: Dict[str, int] = {}
+        with atomic_output(output_path) as f:
+            writer = JsonArrayWriter(f, indent=2, ensure_ascii=False)
+            for turn in iter_turns(messages, limits, speaker_counts=speaker_counts,
+                                   deadline=deadline):
+                writer.write(turn)
+            writer.close()
+    except TranscriptError as e:
+        result.update({"status": "failed", "error_code": e.code, "error": str(e)})
+        return result
+    except OSError as e:
+        result.update({"status": "failed", "error_code": "OUTPUT_GENERATION_FAILED",
+                       "error": str(e)})
+        return result
+
+    result.update({"status": "success", "turns": sum(speaker_counts.values()),
+                   "speakers": speaker_counts})
+    return result
+
+
+def split_export(export_path: Path, output_dir: Path, pool: Optional[Executor] = None,
+                 limits: Optional[TranscriptLimits] = None,
+                 timeout_seconds: Optional[float] = None,
+                 max_pending: int = 16) -> List[Dict[str, Any]]:
+    """Liest den Export einmal und schreibt ein Transkript je Konversation.
+
+    Konversationen werden einzeln dekodiert und mit ``pool`` parallel
+    verarbeitet; höchstens ``max_pending`` liegen gleichzeitig im Speicher.
+    Die Ergebnisse folgen der Reihenfolge im Export.
+    """
+    export_path, output_dir = Path(export_path), Path(output_dir)
+    limits = limits or TranscriptLimits()
+    results: List[Dict[str, Any]] = []
+    pending: deque = deque()
+    output_paths = set()
+
+    def collect_next():
+        results.append(pending.popleft().result())
+
+    try:
+        for number, conversation in enumerate(iter_conversations(export_path)):
+            if not isinstance(conversation, dict):
+                raise TranscriptError("INVALID_FILE_FORMAT",
+                                      f"Conversation {number} in {export_path} is not an object")
+            output_path = conversation_output_path(export_path, output_dir, conversation, number)
+            if output_path in output_paths:
+                raise TranscriptError("OUTPUT_GENERATION_FAILED",
+                                      f"Duplicate conversation id for {output_path.name}")
+            output_paths.add(output_path)
+
+            deadline = time.monotonic() + timeout_seconds if timeout_seconds else None
+            if pool is None:
+                results.append(transcribe_conversation(conversation, output_path, limits,
+                                                       deadline))
+                continue
+            pending.append(pool.submit(transcribe_conversation, conversation, output_path,
+                                       limits, deadline))
+            if len(pending) >= max_pending:
+                collect_next()
+
+        while pending:
+            collect_next()
+    except JsonStreamError as e:
+        raise TranscriptError("INVALID_FILE_FORMAT", f"{export_path}: {e}") from None
+    except UnicodeDecodeError as e:
+        raise TranscriptError("ENCODING_ERROR", f"{export_path}: {e}") from None
+
+    return results
+
+
+def find_exports(input_dir: Path) -> List[Path]:
+    """Sammelt die GPT-Exporte eines Eingabeordners in stabiler Reihenfolge"""
+    return sorted(path for path in Path(input_dir).iterdir()
+                  if path.is_file() and path.name.endswith(EXPORT_SUFFIX))
+
+
+def split_exports(exports: List[Path], output_dir: Path,
+                  settings: Optional[BatchSettings] = None,
+                  limits: Optional[TranscriptLimits] = None) -> List[Tuple[Path, Any]]:
+    """Zerlegt mehrere Exporte mit einem gemeinsamen Prozesspool"""
+    settings = settings or BatchSettings()
+    outcomes = []
+
+    def run(pool):
+        for export_path in exports:
+            try:
+                outcomes.append((export_path, split_export(
+                    export_path, output_dir, pool, limits, settings.timeout_seconds,
+                    max_pending=2 * settings.jobs)))
+            except (TranscriptError, OSError) as e:
+                outcomes.append((export_path, e))
+
+    if settings.jobs > 1:
+        with ProcessPoolExecutor(max_workers=settings.jobs) as pool:
+            run(pool)
+    else:
+        run(None)
+    return outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RooCode GPT Export Splitter")
+    parser.add_argument("exports", nargs="*", help="GPT-Exporte (*.gpt-export.json)")
+    parser.add_argument("--batch", metavar="DIR", help="Alle *.gpt-export.json eines Ordners")
+    parser.add_argument("--output-dir", default="data/output", help="Zielverzeichnis")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Anzahl paralleler Prozesse (Standard aus mode.transkriptor.yaml)")
+    args = parser.parse_args()
+
+    settings = BatchSettings.from_config()
+    if args.jobs is not None:
+        settings.jobs = args.jobs
+
+    exports = [Path(name) for name in args.exports]
+    if args.batch:
+        exports += find_exports(Path(args.batch))
+    if not exports:
+        parser.error("No export files given")
+
+    failed = False
+    for export_path, outcome in split_exports(exports, Path(args.output_dir), settings,
+                                              TranscriptLimits.from_spec()):
+        if isinstance(outcome, Exception):
+            print(json.dumps({"input_file": str(export_path), "error": str(outcome)}),
+                  file=sys.stderr)
+            failed = True
+            continue
+        for result in outcome:
+            ok = result["status"] == "success"
+            failed = failed or not ok
+            print(json.dumps({"input_file": str(export_path), **result}),
+                  file=sys.stdout if ok else sys.stderr)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
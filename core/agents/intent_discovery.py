@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+RooCode Intent Discovery
+Sammelt unmapped Turns aus *.mapped.json und erzeugt Intent-Vorschläge (intent-scout/suggestions/)
+"""
+
+import re
+import sys
+import json
+import hashlib
+import logging
+import argparse
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Container, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import yaml
+
+# Projekt-Root für Paketimporte verfügbar machen (Aufruf als Skript aus core/agents)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.agents.lexical_index import trigrams
+from core.agents.llm_client import LlamaCppClient, LlmClientError
+from core.agents.mapping_cache import text_hash
+from core.agents.suggestion_inbox import SuggestionInbox
+from core.ci.json_stream import JsonStreamError, iter_json_array
+from core.common.atomic_file import atomic_output
+from core.vocab.vocab_store import VOCAB_PATH, VocabSnapshot, VocabStore, VocabStoreError
+
+MODE_PATH = PROJECT_ROOT / "core" / "modes" / "intent-discovery" / "mode.intent-discovery.yaml"
+SUGGESTIONS_DIR = PROJECT_ROOT / "intent-scout" / "suggestions"
+SCOUT_VERSION = "1.0"
+SUGGESTED_ID_PREFIX = "inform.uncategorized"
+SUGGESTED_ID_PATTERN = re.compile(rf"^{re.escape(SUGGESTED_ID_PREFIX)}\.(\d+)$")
+# Mersenne-Primzahl 2^61 - 1 für die MinHash-Permutationen
+MERSENNE_PRIME = (1 << 61) - 1
+
+logger = logging.getLogger('roocode.intent_discovery')
+
+
+@dataclass
+class DiscoverySettings:
+    """Einstellungen aus mode.intent-discovery.yaml (analyze_unmapped, generate_suggestions)"""
+    clustering_enabled: bool = False
+    minhash_permutations: int = 128
+    lsh_bands: int = 32
+    similarity_threshold: float = 0.5
+    seed: int = 1
+    # Dateipaare, die gleichzeitig verbunden werden
+    jobs: int = 1
+
+    @classmethod
+    def from_config(cls, mode_path: Path = MODE_PATH) -> "DiscoverySettings":
+        settings = cls()
+        try:
+            with open(mode_path, 'r', encoding='utf-8') as f:
+                mode = yaml.safe_load(f) or {}
+        except (OSError, yaml.YAMLError):
+            return settings
+
+        tools = {tool.get("name"): tool.get("config") or {} for tool in mode.get("tools") or []}
+        settings.jobs = tools.get("analyze_unmapped", {}).get("max_concurrent_files",
+                                                              settings.jobs)
+        config = tools.get("generate_suggestions", {})
+        settings.clustering_enabled = config.get("clustering_enabled", settings.clustering_enabled)
+        clustering = config.get("clustering") or {}
+        settings.minhash_permutations = clustering.get("minhash_permutations",
+                                                       settings.minhash_permutations)
+        settings.lsh_bands = clustering.get("lsh_bands", settings.lsh_bands)
+        settings.similarity_threshold = clustering.get("similarity_threshold",
+                                                       settings.similarity_threshold)
+        return settings
+
+
+@dataclass(frozen=True)
+class UnmappedTurn:
+    """Turn ohne zugeordneten Intent mit Herkunft"""
+    transcript_file: str
+    speaker: str
+    index: int
+    text: str
+    timestamp: Optional[str] = None
+
+    @property
+    def source_turn(self) -> str:
+        return f"{self.speaker}:{self.index}"
+
+
+def transcript_path_for(mapping_path: Path, transcript_dir: Path) -> Path:
+    """Gepaartes Transkript zu {name}.mapped.json"""
+    name = Path(mapping_path).name[:-len(".mapped.json")]
+    return Path(transcript_dir) / f"{name}.transcript.json"
+
+
+def null_refs(mappings: Iterable[Any]) -> Set[str]:
+    """turn_refs mit intent_id null"""
+    return {mapping["turn_ref"] for mapping in mappings
+            if isinstance(mapping, Mapping) and mapping.get("intent_id") is None
+            and isinstance(mapping.get("turn_ref"), str)}
+
+
+def unmapped_refs(mapping_path: Path) -> Set[str]:
+    """turn_refs mit intent_id null; die Mapping-Datei wird gestreamt"""
+    return null_refs(iter_json_array(mapping_path))
+
+
+def join_unmapped(turns: Iterable[Any], refs: Set[str],
+                  transcript_file: str) -> Iterator[UnmappedTurn]:
+    """Turns mit einem der turn_refs in Transkriptreihenfolge; endet, sobald alle gefunden sind"""
+    pending = set(refs)
+    if not pending:
+        return
+    for turn in turns:
+        if not isinstance(turn, Mapping) or not isinstance(turn.get("text"), str):
+            continue
+        ref = f"{turn.get('speaker')}:{turn.get('index')}"
+        if ref in pending:
+            pending.discard(ref)
+            yield UnmappedTurn(transcript_file, turn["speaker"], turn["index"], turn["text"],
+                               turn.get("timestamp"))
+            if not pending:
+                return
+
+
+def unmapped_turns(transcript_path: Path, mapping_path: Path) -> Iterator[UnmappedTurn]:
+    """Turns, deren Mapping intent_id null hat, in Transkriptreihenfolge.
+
+    Hash-Join in einem Durchlauf je Datei: Der Speicherbedarf wächst nur mit
+    der Zahl der unmapped Turns; das Transkript wird gelesen, bis alle
+    gesuchten turn_refs gefunden sind.
+    """
+    try:
+        pending = unmapped_refs(mapping_path)
+    except (OSError, JsonStreamError, UnicodeDecodeError) as e:
+        logger.warning(f"Skipping {mapping_path}: {e}")
+        return
+    if not pending:
+        return
+    try:
+        yield from join_unmapped(iter_json_array(transcript_path), pending,
+                                 Path(transcript_path).name)
+    except (OSError, JsonStreamError, UnicodeDecodeError) as e:
+        logger.warning(f"Skipping {transcript_path}: {e}")
+
+
+def _join_pair(pair: Tuple[Path, Path]) -> List[UnmappedTurn]:
+    return list(unmapped_turns(*pair))
+
+
+def collect_unmapped(mapping_paths: List[Path], transcript_dir: Path,
+                     jobs: int = 1) -> List[UnmappedTurn]:
+    """Unmapped Turns aller Dateipaare in Reihenfolge der sortierten Mapping-Pfade.
+
+    Mit ``jobs`` > 1 werden die Paare in getrennten Prozessen verbunden.
+    """
+    pairs = [(transcript_path_for(mapping_path, transcript_dir), mapping_path)
+             for mapping_path in sorted(map(Path, mapping_paths))]
+    if jobs <= 1 or len(pairs) <= 1:
+        return [turn for pair in pairs for turn in unmapped_turns(*pair)]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return [turn for turns in pool.map(_join_pair, pairs) for turn in turns]
+
+
+class MinHasher:
+    """MinHash-Signaturen über Zeichen-Trigramme.
+
+    Jede der ``permutations`` Hashfunktionen ist (a*x + b) mod p mit p = 2^61 - 1
+    über 32-Bit-Trigrammhashes; a < 2^31 hält das Produkt innerhalb von uint64.
+    """
+
+    def __init__(self, permutations: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 1 << 31, size=permutations, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 31, size=permutations, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        shingles = sorted(set(trigrams(text))) or [text]
+        hashes = np.array([int.from_bytes(hashlib.blake2b(s.encode('utf-8'),
+                                                          digest_size=4).digest(), 'little')
+                           for s in shingles], dtype=np.uint64)
+        return ((np.outer(self.a, hashes) + self.b[:, None]) % MERSENNE_PRIME).min(axis=1)
+
+
+def _find(parents: List[int], item: int) -> int:
+    while parents[item] != item:
+        parents[item] = parents[parents[item]]
+        item = parents[item]
+    return item
+
+
+def cluster_turns(turns: List[UnmappedTurn],
+                  settings: Optional[DiscoverySettings] = None) -> List[List[UnmappedTurn]]:
+    """Gruppiert ähnliche Turns; ohne clustering_enabled bildet jeder Turn einen Cluster.
+
+    Gleiche normalisierte Texte fallen sofort zusammen. Die übrigen werden per
+    LSH über MinHash-Bänder in Buckets verteilt; innerhalb eines Buckets wird
+    jeder Turn nur gegen den ersten geprüft (geschätzte Jaccard-Ähnlichkeit ab
+    ``similarity_threshold``), sodass der Aufwand linear in der Turn-Anzahl bleibt.
+    Cluster und Mitglieder folgen der Eingabereihenfolge.
+    """
+    settings = settings or DiscoverySettings()
+    if not settings.clustering_enabled:
+        return [[turn] for turn in turns]
+
+    parents = list(range(len(turns)))
+    first_by_text: Dict[str, int] = {}
+    distinct = []
+    for position, turn in enumerate(turns):
+        first = first_by_text.setdefault(text_hash(turn.text), position)
+        if first == position:
+            distinct.append(position)
+        else:
+            parents[position] = first
+
+    hasher = MinHasher(settings.minhash_permutations, settings.seed)
+    signatures = {position: hasher.signature(turns[position].text) for position in distinct}
+    rows = max(1, settings.minhash_permutations // settings.lsh_bands)
+    for band in range(settings.lsh_bands):
+        buckets: Dict[bytes, int] = {}
+        for position in distinct:
+            key = signatures[position][band * rows:(band + 1) * rows].tobytes()
+            anchor = buckets.setdefault(key, position)
+            if anchor == position:
+                continue
+            root, anchor_root = _find(parents, position), _find(parents, anchor)
+            if root != anchor_root and np.mean(signatures[position] == signatures[anchor]) \
+                    >= settings.similarity_threshold:
+                parents[max(root, anchor_root)] = min(root, anchor_root)
+
+    clusters: Dict[int, List[UnmappedTurn]] = {}
+    for position, turn in enumerate(turns):
+        clusters.setdefault(_find(parents, position), []).append(turn)
+    return list(clusters.values())
+
+
+class LlmDrafter:
+    """Entwirft Label und Begründung eines Vorschlags mit dem lokalen LLM (eine Anfrage je Cluster)"""
+    grammar = 'root ::= "{\\"label\\": " string ", \\"explanation\\": " string "}"\n' \
+              'string ::= "\\"" [^"\\\\\\n]{1,160} "\\""'
+
+    def __init__(self, client: LlamaCppClient, samples: int = 5):
+        self.client = client
+        self.samples = samples
+
+    @classmethod
+    def from_config(cls) -> "LlmDrafter":
+        return cls(LlamaCppClient.from_config())
+
+    def draft(self, cluster: List[UnmappedTurn]) -> Optional[Tuple[str, str]]:
+        examples = "\n".join(f"- {json.dumps(turn.text, ensure_ascii=False)}"
+                             for turn in cluster[:self.samples])
+        prompt = ("The following conversation turns match no existing intent. Propose a short "
+                  "intent label and explain why they form a distinct intent.\n"
+                  f"Turns ({len(cluster)} in total):\n{examples}\nAnswer as JSON: ")
+        try:
+            response = self.client.complete(prompt, grammar=self.grammar, n_predict=128,
+                                            temperature=0.0)
+            answer = json.loads(response.get("content", ""))
+            return answer["label"].strip(), answer["explanation"].strip()
+        except (LlmClientError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Drafting failed for {cluster[0].source_turn}: {e}")
+            return None
+
+
+def next_suggestion_number(inbox: SuggestionInbox, vocab: Optional[VocabSnapshot]) -> int:
+    """Nächste freie laufende Nummer nach indizierten Vorschlägen und Vokabular-IDs"""
+    highest = vocab.next_number(SUGGESTED_ID_PREFIX) - 1 if vocab is not None else 0
+    for existing_id in inbox.with_prefix(f"{SUGGESTED_ID_PREFIX}."):
+        match = SUGGESTED_ID_PATTERN.match(existing_id)
+        if match:
+            highest = max(highest, int(match.group(1)))
+    return highest + 1
+
+
+def suggested_id(number: int) -> str:
+    return f"{SUGGESTED_ID_PREFIX}.{number:05d}"
+
+
+def suggestion_for(cluster: List[UnmappedTurn], number: int, created_on: str,
+                   draft: Optional[Tuple[str, str]] = None) -> Dict[str, Any]:
+    """Vorschlag nach template.intent-suggestion.yaml; der erste Turn vertritt den Cluster"""
+    first = cluster[0]
+    if draft is None:
+        label = first.text.strip()[:60] or "Unlabeled turn"
+        explanation = "Turn does not match any existing intent" if len(cluster) == 1 else \
+            f"{len(cluster)} similar turns do not match any existing intent"
+    else:
+        label, explanation = draft
+    suggestion: Dict[str, Any] = {
+        "suggested_id": suggested_id(number),
+        "label": label,
+        "explanation": explanation,
+        "source_turn": first.source_turn,
+        "context": {"transcript_file": first.transcript_file, "turn_index": first.index,
+                    "speaker": first.speaker},
+    }
+    if first.timestamp:
+        suggestion["context"]["timestamp"] = first.timestamp
+    if len(cluster) > 1:
+        suggestion["source_turns"] = [{"transcript_file": turn.transcript_file,
+                                       "source_turn": turn.source_turn} for turn in cluster]
+    suggestion["metadata"] = {"created_on": created_on, "scout_version": SCOUT_VERSION,
+                              "status": "pending"}
+    return suggestion
+
+
+def write_suggestions(turns: List[UnmappedTurn], output_dir: Path = SUGGESTIONS_DIR,
+                      settings: Optional[DiscoverySettings] = None,
+                      drafter: Optional[LlmDrafter] = None, created_on: Optional[str] = None,
+                      vocab_path: Path = VOCAB_PATH) -> Dict[str, Any]:
+    """Schreibt einen Vorschlag je Cluster unmapped Turns als {date}_{context}.yaml.
+
+    Turns, die laut Inbox-Index schon in einem Vorschlag stehen, entfallen
+    (no_duplicate_suggestions); vorgeschlagene IDs werden gegen Vokabular und
+    Index geprüft (no_existing_intent_duplicates).
+    """
+    settings = settings or DiscoverySettings.from_config()
+    created_on = created_on or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    try:
+        vocab: Optional[VocabSnapshot] = VocabStore(vocab_path).snapshot()
+    except VocabStoreError:
+        vocab = None
+    vocab_ids: Container[str] = vocab if vocab is not None else frozenset()
+
+    output_dir = Path(output_dir)
+    with SuggestionInbox(output_dir) as inbox:
+        inbox.refresh()
+        fresh = [turn for turn in turns
+                 if not inbox.has_source_turn(turn.transcript_file, turn.source_turn)]
+        clusters = cluster_turns(fresh, settings)
+        number = next_suggestion_number(inbox, vocab)
+        for cluster in clusters:
+            while suggested_id(number) in inbox or suggested_id(number) in vocab_ids:
+                number += 1
+            draft = drafter.draft(cluster) if drafter is not None else None
+            suggestion = suggestion_for(cluster, number, created_on, draft)
+            context = Path(cluster[0].transcript_file).name.split(".")[0]
+            path = output_dir / f"{created_on[:10]}_{context}-{number:05d}.yaml"
+            with atomic_output(path) as f:
+                yaml.safe_dump(suggestion, f, sort_keys=False, allow_unicode=True)
+            inbox.record(path, [suggestion])
+            number += 1
+    return {"unmapped_turns_count": len(turns), "suggestions_count": len(clusters),
+            "already_suggested_count": len(turns) - len(fresh)}
+
+
+def discover(mapping_paths: List[Path], transcript_dir: Path, output_dir: Path = SUGGESTIONS_DIR,
+             settings: Optional[DiscoverySettings] = None,
+             drafter: Optional[LlmDrafter] = None,
+             created_on: Optional[str] = None, vocab_path: Path = VOCAB_PATH) -> Dict[str, Any]:
+    """Verbindet die Dateipaare und schreibt die Vorschläge ihrer unmapped Turns"""
+    settings = settings or DiscoverySettings.from_config()
+    turns = collect_unmapped(mapping_paths, transcript_dir, settings.jobs)
+    return write_suggestions(turns, output_dir, settings, drafter, created_on, vocab_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RooCode Intent Discovery")
+    parser.add_argument("mappings", nargs="+", help="Mapping-Dateien (*.mapped.json)")
+    parser.add_argument("--transcripts", default="data/output",
+                        help="Verzeichnis der gepaarten *.transcript.json")
+    parser.add_argument("--output-dir", default=str(SUGGESTIONS_DIR), help="Zielverzeichnis")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Anzahl paralleler Prozesse für den Dateiabgleich")
+    parser.add_argument("--cluster", action="store_true",
+                        help="Ähnliche Turns zusammenfassen (überschreibt clustering_enabled)")
+    parser.add_argument("--drafter", choices=["llama-cpp", "none"], default="llama-cpp",
+                        help="Label und Begründung vom lokalen LLM entwerfen lassen")
+    args = parser.parse_args()
+
+    settings = DiscoverySettings.from_config()
+    if args.cluster:
+        settings.clustering_enabled = True
+    if args.jobs is not None:
+        settings.jobs = args.jobs
+    drafter = LlmDrafter.from_config() if args.drafter == "llama-cpp" else None
+    summary = discover([Path(name) for name in args.mappings], Path(args.transcripts),
+                       Path(args.output_dir), settings, drafter)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,921 @@
+#!/usr/bin/env python3
+"""
+RooCode Intent Mapper Engine
+Ordnet Transkript-Turns per Embedding-Ähnlichkeit Intents aus vocab.yaml zu (*.mapped.json)
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import hashlib
+import logging
+import argparse
+import tempfile
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple
+
+import numpy as np
+import yaml
+
+# Projekt-Root für Paketimporte verfügbar machen (Aufruf als Skript aus core/agents)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.agents.lexical_index import LexicalIndex
+from core.agents.llm_client import CHARS_PER_TOKEN, LlamaCppClient, LlmClientError
+from core.agents.mapping_cache import MappingCache, open_cache, text_hash
+from core.ci.json_stream import JsonArrayWriter, JsonStreamError, iter_json_array
+from core.common.atomic_file import atomic_output
+from core.vocab.vocab_store import INTENT_ID_PATTERN, VocabStore, VocabStoreError
+
+MODE_PATH = PROJECT_ROOT / "core" / "modes" / "intent-mapper" / "mode.intent-mapper.yaml"
+SPEC_PATH = PROJECT_ROOT / "core" / "modes" / "intent-mapper" / "spec.intent-mapper.yaml"
+VOCAB_PATH = PROJECT_ROOT / "core" / "vocab" / "vocab.yaml"
+CACHE_DIR = PROJECT_ROOT / "temp"
+EMBEDDING_CACHE_DIR = CACHE_DIR / "embeddings"
+LEXICAL_CACHE_DIR = CACHE_DIR / "lexical"
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# Antwortschlüssel der Kandidaten beim Logprob-Scoring; "0" steht für keinen Intent
+SCORING_KEYS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+NONE_KEY = "0"
+
+logger = logging.getLogger('roocode.intent_mapper')
+
+
+class MappingError(ValueError):
+    """Verarbeitungsfehler mit Fehlercode (error_handling in spec.intent-mapper.yaml)"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+
+    def __reduce__(self):
+        # Übergabe aus Worker-Prozessen mit Fehlercode
+        return (MappingError, (self.code, self.message))
+
+
+@dataclass
+class MapperSettings:
+    """Klassifikationsparameter aus Mode und Spezifikation des Intent-Mappers"""
+    algorithm: str = "semantic_similarity"
+    confidence_threshold: float = 0.7
+    max_candidates: int = 3
+    include_candidates: bool = False
+    decimal_places: int = 3
+    cache_enabled: bool = True
+    pretty_print: bool = True
+    # Turns je Embedding-Anfrage
+    batch_size: int = 64
+    # Ab dieser Turn-Anzahl wird das Transkript fensterweise gestreamt
+    streaming_threshold: int = 1000
+    streaming_window: int = 256
+    # Persistenter Memo-Cache (Pfad relativ zum Projekt-Root, None = aus)
+    memo_cache_path: Optional[str] = None
+    memo_cache_max_entries: int = 100000
+    # LLM-Klassifikation: lexikalische Vorauswahl und Profil aus llm.config.yaml
+    llm_profile: str = "transkriptor"
+    prefilter_candidates: int = 20
+    # "generate" (grammatikgebundene Antwort) oder "logprobs" (Token-Wahrscheinlichkeiten)
+    llm_scoring: str = "generate"
+    # Gleichzeitige Anfragen bis zur Slot-Anzahl des Servers (throughput in der Spezifikation)
+    parallel_turn_processing: bool = False
+    # Nur Intents unter diesem ID-Präfix klassifizieren (z.B. "inform.")
+    category_scope: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, mode_path: Path = MODE_PATH,
+                    spec_path: Path = SPEC_PATH) -> "MapperSettings":
+        """Liest Schwellwert, Kandidaten und Cache-Einstellung; fehlende Werte bleiben Standard"""
+        settings = cls()
+        try:
+            with open(mode_path, 'r', encoding='utf-8') as f:
+                mode = yaml.safe_load(f) or {}
+            with open(spec_path, 'r', encoding='utf-8') as f:
+                spec = (yaml.safe_load(f) or {}).get("specification") or {}
+        except (OSError, yaml.YAMLError):
+            return settings
+
+        tools = {tool.get("name"): tool.get("config") or {}
+                 for tool in mode.get("tools") or [] if isinstance(tool, dict)}
+        classify = tools.get("classify_intent", {})
+        settings.algorithm = classify.get("matching_algorithm", settings.algorithm)
+        settings.confidence_threshold = classify.get("confidence_threshold",
+                                                     settings.confidence_threshold)
+        settings.cache_enabled = tools.get("load_vocabulary", {}).get(
+            "cache_enabled", settings.cache_enabled)
+
+        configuration = spec.get("configuration") or {}
+        classification = configuration.get("classification") or {}
+        settings.max_candidates = classification.get("max_candidates", settings.max_candidates)
+        settings.include_candidates = classification.get("include_candidates",
+                                                         settings.include_candidates)
+        settings.pretty_print = (configuration.get("output") or {}).get(
+            "pretty_print", settings.pretty_print)
+        memo = configuration.get("memo_cache") or {}
+        if memo:
+            settings.memo_cache_path = memo.get("path") if memo.get("enabled", True) else None
+            settings.memo_cache_max_entries = memo.get("max_entries",
+                                                       settings.memo_cache_max_entries)
+        performance = spec.get("performance_requirements") or {}
+        settings.streaming_threshold = (performance.get("memory_usage") or {}).get(
+            "streaming_threshold", settings.streaming_threshold)
+        throughput = performance.get("throughput") or {}
+        settings.parallel_turn_processing = throughput.get("parallel_turn_processing",
+                                                           settings.parallel_turn_processing)
+        llm = configuration.get("llm_classification") or {}
+        settings.llm_profile = llm.get("profile", settings.llm_profile)
+        settings.prefilter_candidates = llm.get("prefilter_candidates",
+                                                settings.prefilter_candidates)
+        settings.llm_scoring = llm.get("scoring", settings.llm_scoring)
+        confidence = (spec.get("classification_rules") or {}).get("confidence_handling") or {}
+        settings.decimal_places = confidence.get("confidence_decimal_places",
+                                                 settings.decimal_places)
+        return settings
+
+
+class Embedder(Protocol):
+    """Erzeugt L2-normierte Vektoren; ``name`` kennzeichnet Modell und Dimension im Cache"""
+    name: str
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        ...
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """Normiert Zeilen auf Länge 1, damit das Skalarprodukt der Kosinus-Ähnlichkeit entspricht"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class HashingEmbedder:
+    """Deterministischer Feature-Hashing-Embedder aus Wörtern und Zeichen-Trigrammen (Tests, Offline)"""
+
+    def __init__(self, dimension: int = 512):
+        self.dimension = dimension
+        self.name = f"hashing-{dimension}"
+
+    def _features(self, text: str) -> Iterable[str]:
+        for word in WORD_PATTERN.findall(text.lower()):
+            yield word
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                yield padded[i:i + 3]
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'),
+                                                        digest_size=8).digest(), "little")
+                matrix[row, digest % self.dimension] += 1.0 if digest >> 63 else -1.0
+        return _normalize(matrix)
+
+
+class LlamaCppEmbedder:
+    """Embeddings über den lokalen llama.cpp-Server (OpenAI-kompatibles /v1/embeddings)"""
+
+    def __init__(self, client: Optional[LlamaCppClient] = None):
+        self.client = client or LlamaCppClient()
+        self.name = self.client.name
+
+    @classmethod
+    def from_config(cls) -> "LlamaCppEmbedder":
+        """Endpunkt und Modell aus llm.config.yaml"""
+        return cls(LlamaCppClient.from_config())
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        try:
+            return _normalize(self.client.embed(texts))
+        except LlmClientError as e:
+            raise MappingError("CLASSIFICATION_FAILURE", f"Embedding request failed: {e}") from None
+
+
+def load_vocabulary(vocab_path: Path = VOCAB_PATH,
+                    prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Liest und prüft das Vokabular; liefert die Intents alphabetisch nach ID sortiert.
+
+    Gelesen wird der kompilierte Snapshot des Vocab-Stores; vocab.yaml wird
+    nur nach einer Änderung erneut geparst. Mit ``prefix`` nur der passende
+    ID-Bereich (z.B. "inform.").
+    """
+    try:
+        snapshot = VocabStore(vocab_path).snapshot()
+    except VocabStoreError as e:
+        raise MappingError(e.code, e.message) from None
+    intents = list(snapshot.records_with_prefix(prefix) if prefix else snapshot.records())
+    if not intents:
+        scope = f" under {prefix!r}" if prefix else ""
+        raise MappingError("VOCABULARY_EMPTY", f"{vocab_path} contains no intents{scope}")
+
+    for intent in intents:
+        if not INTENT_ID_PATTERN.match(intent["id"]):
+            raise MappingError("VOCABULARY_INVALID_FORMAT", f"Invalid intent id: {intent['id']!r}")
+        if not intent.get("label"):
+            raise MappingError("VOCABULARY_INVALID_FORMAT", f"Empty label for {intent['id']}")
+    return intents
+
+
+def intent_text(intent: Dict[str, Any]) -> str:
+    """Eingebetteter Text eines Intents: Label und Beschreibung"""
+    description = intent.get("description")
+    return f"{intent['label']}. {description}" if description else intent["label"]
+
+
+def vocabulary_version(intents: List[Dict[str, Any]]) -> str:
+    """Version des klassifikationsrelevanten Vokabularinhalts (IDs, Labels, Beschreibungen)"""
+    content = [[intent["id"], intent_text(intent)]
+               for intent in sorted(intents, key=lambda intent: intent["id"])]
+    return hashlib.sha256(json.dumps(content, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def vocabulary_hash(intents: List[Dict[str, Any]], embedder_name: str) -> str:
+    """Cache-Schlüssel aus eingebettetem Vokabularinhalt und Embedder"""
+    digest = hashlib.sha256(embedder_name.encode('utf-8'))
+    digest.update(vocabulary_version(intents).encode('ascii'))
+    return digest.hexdigest()
+
+
+@dataclass
+class VocabularyDiff:
+    """Klassifikationsrelevante Unterschiede zwischen zwei Vokabularständen"""
+    previous: List[Dict[str, Any]]
+    added: List[str]
+    removed: List[str]
+    changed: List[str]
+
+    @classmethod
+    def between(cls, previous: List[Dict[str, Any]],
+                current: List[Dict[str, Any]]) -> "VocabularyDiff":
+        """Vergleicht IDs und eingebettete Texte (Label und Beschreibung)"""
+        before = {intent["id"]: intent_text(intent) for intent in previous}
+        after = {intent["id"]: intent_text(intent) for intent in current}
+        return cls(previous=sorted(previous, key=lambda intent: intent["id"]),
+                   added=sorted(after.keys() - before.keys()),
+                   removed=sorted(before.keys() - after.keys()),
+                   changed=sorted(i for i in before.keys() & after.keys() if before[i] != after[i]))
+
+    @property
+    def stale(self) -> set:
+        """Intents, deren gespeicherte Werte nicht mehr gelten"""
+        return set(self.removed) | set(self.changed)
+
+    @property
+    def fresh(self) -> List[str]:
+        """Intents, deren Werte für bestehende Turns noch nie berechnet wurden"""
+        return sorted(set(self.added) | set(self.changed))
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def _references_stale(mapping: Dict[str, Any], stale: set) -> bool:
+    """Gespeichertes Ergebnis nennt einen entfernten oder geänderten Intent.
+
+    Ohne Kandidatenliste ist bei null-Mappings mit Konfidenz unbekannt, welcher
+    Intent sie geliefert hat; sie gelten dann ebenfalls als betroffen.
+    """
+    ids = [mapping.get("intent_id")] + [c.get("intent_id") for c in mapping.get("candidates") or []]
+    if any(intent_id in stale for intent_id in ids):
+        return True
+    return bool(stale) and mapping.get("intent_id") is None and "candidates" not in mapping \
+        and mapping.get("confidence", 0.0) > 0
+
+
+def _save_matrix(path: Path, matrix: np.ndarray):
+    """Schreibt die Matrix atomar als .npy"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, matrix)
+        os.replace(temp_name, path)
+    except BaseException:
+        try:
+            os.unlink(temp_name)
+        except OSError:
+            pass
+        raise
+
+
+class EmbeddingIndex:
+    """Embedding-Matrix des Vokabulars; Spalten alphabetisch nach Intent-ID"""
+
+    def __init__(self, intent_ids: List[str], matrix: np.ndarray):
+        self.intent_ids = intent_ids
+        self.matrix = matrix
+
+    @classmethod
+    def build(cls, intents: List[Dict[str, Any]], embedder: Embedder,
+              cache_dir: Optional[Path] = EMBEDDING_CACHE_DIR) -> "EmbeddingIndex":
+        """Bettet das Vokabular einmal ein; mit ``cache_dir`` wird die Matrix wiederverwendet"""
+        intents = sorted(intents, key=lambda intent: intent["id"])
+        intent_ids = [intent["id"] for intent in intents]
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = Path(cache_dir) / f"{vocabulary_hash(intents, embedder.name)}.npy"
+            if cache_path.exists():
+                try:
+                    matrix = np.load(cache_path)
+                    if matrix.shape[0] == len(intent_ids):
+                        return cls(intent_ids, matrix)
+                except (OSError, ValueError):
+                    pass
+
+        matrix = _normalize(embedder.embed([intent_text(intent) for intent in intents]))
+        if cache_path is not None:
+            _save_matrix(cache_path, matrix)
+        return cls(intent_ids, matrix)
+
+    def top_k(self, vectors: np.ndarray, k: int, decimal_places: int = 3):
+        """Beste ``k`` Intents je Zeile als (Spaltenindizes, gerundete Konfidenzen).
+
+        Konfidenz ist die auf [0, 1] begrenzte Kosinus-Ähnlichkeit. Gleichstände
+        (nach Rundung) entscheidet die alphabetisch kleinere ID; dazu wird die
+        Spaltenposition in einen eindeutigen ganzzahligen Schlüssel eingerechnet.
+        """
+        scale = 10 ** decimal_places
+        quantized = np.rint(np.clip(vectors @ self.matrix.T, 0.0, 1.0) * scale).astype(np.int64)
+        count = len(self.intent_ids)
+        keys = quantized * count + (count - 1 - np.arange(count))
+
+        k = min(k, count)
+        if k < count:
+            columns = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+        else:
+            columns = np.broadcast_to(np.arange(count), keys.shape)
+        order = np.argsort(-np.take_along_axis(keys, columns, axis=1), axis=1)
+        columns = np.take_along_axis(columns, order, axis=1)
+        return columns, np.take_along_axis(quantized, columns, axis=1) / scale
+
+
+def mapping_path_for(transcript_path: Path, output_dir: Path) -> Path:
+    """Ausgabepfad nach naming_pattern {input_filename}.mapped.json"""
+    name = Path(transcript_path).name
+    if name.endswith(".transcript.json"):
+        name = name[:-len(".transcript.json")]
+    return Path(output_dir) / f"{name}.mapped.json"
+
+
+class Classifier(Protocol):
+    """Klassifiziert Texte zu Mappings ohne turn_ref; ``name`` geht in den Memo-Schlüssel ein"""
+    name: str
+
+    def classify(self, texts: List[str]) -> List[Dict[str, Any]]:
+        ...
+
+    def may_change(self, texts: List[str], mappings: List[Dict[str, Any]],
+                   diff: VocabularyDiff) -> List[bool]:
+        """Je Turn, ob sein gespeichertes Mapping unter dem aktuellen Vokabular abweichen kann"""
+        ...
+
+
+def _result(intent_id: Optional[str], confidence: float, settings: MapperSettings,
+            candidates: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Mapping-Ergebnis; unter dem Schwellwert bleibt intent_id null"""
+    result = {"intent_id": intent_id if confidence >= settings.confidence_threshold else None,
+              "confidence": confidence}
+    if settings.include_candidates:
+        result["candidates"] = candidates or []
+    return result
+
+
+class UncachedResult(dict):
+    """Null-Ergebnis einer fehlgeschlagenen Klassifikation; landet nicht im Memo-Cache"""
+
+
+class EmbeddingClassifier:
+    """Semantische Ähnlichkeit gegen einen Embedding-Index des Vokabulars"""
+
+    def __init__(self, index: EmbeddingIndex, embedder: Embedder,
+                 settings: Optional[MapperSettings] = None):
+        self.index = index
+        self.embedder = embedder
+        self.settings = settings or MapperSettings()
+        self.name = embedder.name
+
+    def classify(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Bettet Texte stapelweise ein und wählt per Matrixprodukt die besten Intents"""
+        settings = self.settings
+        k = max(1, settings.max_candidates if settings.include_candidates else 1)
+        ids = self.index.intent_ids
+        results = []
+        for start in range(0, len(texts), settings.batch_size):
+            vectors = _normalize(self.embedder.embed(texts[start:start + settings.batch_size]))
+            columns, confidences = self.index.top_k(vectors, k, settings.decimal_places)
+            for text_columns, text_confidences in zip(columns.tolist(), confidences.tolist(),
+                                                          strict=True):
+                results.append(_result(
+                    ids[text_columns[0]], text_confidences[0], settings,
+                    [{"intent_id": ids[column], "confidence": confidence}
+                     for column, confidence in zip(text_columns, text_confidences, strict=True)]))
+        return results
+
+    def may_change(self, texts: List[str], mappings: List[Dict[str, Any]],
+                   diff: VocabularyDiff) -> List[bool]:
+        """Vergleicht gespeicherte Konfidenzen nur mit den Werten neuer oder geänderter Intents.
+
+        Die Ähnlichkeit zu unveränderten Intents hängt nicht vom übrigen
+        Vokabular ab. Ein Turn kann sich daher nur ändern, wenn ein gespeicherter
+        Intent weggefallen ist oder ein frischer Intent mindestens die
+        Konfidenz des letzten gespeicherten Platzes erreicht (Gleichstand
+        eingeschlossen, da dann die alphabetische Regel entscheidet).
+        """
+        settings = self.settings
+        stale = diff.stale
+        flags = [_references_stale(mapping, stale) for mapping in mappings]
+        column_of = {intent_id: column for column, intent_id in enumerate(self.index.intent_ids)}
+        columns = [column_of[intent_id] for intent_id in diff.fresh if intent_id in column_of]
+        pending = [position for position, flag in enumerate(flags) if not flag]
+        if not columns or not pending:
+            return flags
+
+        scale = 10 ** settings.decimal_places
+        fresh_matrix = self.index.matrix[columns]
+        for start in range(0, len(pending), settings.batch_size):
+            batch = pending[start:start + settings.batch_size]
+            vectors = _normalize(self.embedder.embed([texts[position] for position in batch]))
+            best = np.rint(np.clip(vectors @ fresh_matrix.T, 0.0, 1.0) * scale).max(axis=1) / scale
+            for position, score in zip(batch, best.tolist(), strict=True):
+                mapping = mappings[position]
+                candidates = mapping.get("candidates")
+                if candidates is None:
+                    bound = mapping.get("confidence", 0.0)
+                elif len(candidates) >= settings.max_candidates:
+                    bound = min(c["confidence"] for c in candidates)
+                else:
+                    bound = -1.0
+                flags[position] = score >= bound
+        return flags
+
+
+@lru_cache(maxsize=1024)
+def intent_grammar(candidate_ids: Tuple[str, ...], decimal_places: int = 3) -> str:
+    """GBNF-Grammatik, die nur {"intent_id": <Kandidat oder null>, "confidence": <0..1>} zulässt.
+
+    Je Kandidatenmenge wird sie einmal erzeugt; llama.cpp erzwingt sie beim
+    Sampling, sodass jede Antwort ohne Nachbearbeitung gültiges JSON ist.
+    """
+    ids = " | ".join(json.dumps(json.dumps(intent_id)) for intent_id in candidate_ids)
+    if decimal_places > 0:
+        digits = " ".join(["[0-9]"] * decimal_places)
+        confidence = f'"0." {digits} | "1.{"0" * decimal_places}"'
+    else:
+        confidence = '"0" | "1"'
+    return "\n".join([
+        'root ::= "{\\"intent_id\\": " intent ", \\"confidence\\": " confidence "}"',
+        f'intent ::= "null" | {ids}' if ids else 'intent ::= "null"',
+        f"confidence ::= {confidence}",
+    ])
+
+
+def answer_length(candidate_ids: List[str], decimal_places: int = 3) -> int:
+    """Obergrenze der Antwortlänge in Zeichen (und damit in Tokens) für n_predict"""
+    longest = max([len(intent_id) + 2 for intent_id in candidate_ids] + [len("null")])
+    return len('{"intent_id": , "confidence": }') + longest + decimal_places + 2
+
+
+def scoring_grammar(key_count: int) -> str:
+    """GBNF-Grammatik für genau einen Antwortschlüssel"""
+    keys = " | ".join(f'"{key}"' for key in SCORING_KEYS[:key_count] + NONE_KEY)
+    return f"root ::= {keys}"
+
+
+def key_probabilities(response: Dict[str, Any]) -> Dict[str, float]:
+    """Wahrscheinlichkeiten der Antwortschlüssel an der ersten Position (n_probs).
+
+    Unterstützt das ältere Format (probs/tok_str/prob) und das neuere
+    (top_logprobs/token/logprob) des llama.cpp-Servers; Varianten mit
+    führendem Leerzeichen werden zusammengefasst.
+    """
+    entries = response.get("completion_probabilities") or []
+    if not entries:
+        return {}
+    first = entries[0]
+    probabilities: Dict[str, float] = {}
+    if "probs" in first:
+        pairs = [(p.get("tok_str", ""), p.get("prob", 0.0)) for p in first["probs"]]
+    else:
+        pairs = [(p.get("token", ""), math.exp(p["logprob"]))
+                 for p in first.get("top_logprobs") or [] if "logprob" in p]
+    for token, probability in pairs:
+        key = token.strip()
+        probabilities[key] = probabilities.get(key, 0.0) + probability
+    return probabilities
+
+
+class LlmClassifier:
+    """LLM-Klassifikation über die lexikalisch vorausgewählten Kandidaten.
+
+    Der BM25-Index liefert je Turn höchstens ``prefilter_candidates`` Intents;
+    nur diese gelangen in den Prompt, sodass er unabhängig von der
+    Vokabulargröße in das Kontextfenster des Profils passt.
+    """
+
+    def __init__(self, lexical: LexicalIndex, intents: List[Dict[str, Any]],
+                 client: LlamaCppClient, settings: Optional[MapperSettings] = None):
+        self.lexical = lexical
+        self.intents = {intent["id"]: intent for intent in intents}
+        self.client = client
+        self.settings = settings or MapperSettings()
+        self.slots = client.parallel_slots if self.settings.parallel_turn_processing else 1
+        # Der Server teilt seinen Kontext auf alle Slots auf; jede Anfrage, auch eine
+        # serielle, erhält nur einen Slot. Ein Budget für beide Modi hält Prompts gleich.
+        self.context_tokens = client.slot_context_tokens
+        self.name = (f"{client.name}|prefilter={self.settings.prefilter_candidates}"
+                     f"|scoring={self.settings.llm_scoring}")
+        # Index des vorherigen Vokabulars, einmal je VocabularyDiff (alle Dateien eines Re-Mappings)
+        self._previous: Optional[Tuple[VocabularyDiff, LexicalIndex]] = None
+
+    @classmethod
+    def build(cls, intents: List[Dict[str, Any]], client: LlamaCppClient,
+              settings: MapperSettings,
+              cache_dir: Optional[Path] = LEXICAL_CACHE_DIR) -> "LlmClassifier":
+        """Lädt den Index der aktuellen Vokabularversion oder baut ihn neu"""
+        documents = [(intent["id"], f"{intent['id']} {intent_text(intent)}") for intent in intents]
+        if cache_dir is None:
+            lexical = LexicalIndex.build(documents)
+        else:
+            lexical = LexicalIndex.load_or_build(
+                documents, Path(cache_dir) / f"{vocabulary_version(intents)}.npz")
+        return cls(lexical, intents, client, settings)
+
+    def build_prompt(self, text: str, candidate_ids: List[str]) -> Tuple[str, List[str]]:
+        """Prompt mit so vielen Kandidaten, wie das Kontextfenster zulässt.
+
+        Anweisung und Kandidaten stehen vor dem Turn, damit aufeinanderfolgende
+        Anfragen mit gleicher Kandidatenmenge den Prompt-Cache des Servers nutzen.
+        """
+        scoring = self.settings.llm_scoring == "logprobs"
+        if scoring:
+            candidate_ids = candidate_ids[:len(SCORING_KEYS)]
+        while True:
+            if scoring:
+                lines = "\n".join(f"{key}) {intent_id}: {intent_text(self.intents[intent_id])}"
+                                  for key, intent_id in zip(SCORING_KEYS[:len(candidate_ids)],
+                                                            candidate_ids, strict=True))
+                prompt = ("Classify the conversation turn. Reply with the letter of the "
+                          f"matching intent, or {NONE_KEY} if none fits.\n"
+                          f"{lines}\n{NONE_KEY}) none of these\n"
+                          f"Turn: {json.dumps(text, ensure_ascii=False)}\n"
+                          "Answer:")
+                answer_tokens = 1
+            else:
+                lines = "\n".join(f"- {intent_id}: {intent_text(self.intents[intent_id])}"
+                                  for intent_id in candidate_ids)
+                prompt = ("Classify the conversation turn into exactly one candidate intent, "
+                          "or null if none fits.\n"
+                          f"Candidates:\n{lines}\n"
+                          f"Turn: {json.dumps(text, ensure_ascii=False)}\n"
+                          "Answer:\n")
+                answer_tokens = answer_length(candidate_ids, self.settings.decimal_places)
+            budget = (self.context_tokens - answer_tokens) * CHARS_PER_TOKEN
+            if len(prompt) <= budget or len(candidate_ids) <= 1:
+                return prompt, candidate_ids
+            candidate_ids = candidate_ids[:-1]
+
+    def parse_answer(self, content: str, candidate_ids: List[str]):
+        """Liest (intent_id, confidence) aus der grammatikgebundenen Antwort"""
+        try:
+            answer = json.loads(content)
+            intent_id, confidence = answer["intent_id"], float(answer["confidence"])
+        except (ValueError, TypeError, KeyError):
+            return None
+        if intent_id is not None and intent_id not in candidate_ids:
+            return None
+        return intent_id, min(max(confidence, 0.0), 1.0)
+
+    def _request(self, prompt: str, **parameters: Any) -> Dict[str, Any]:
+        return self.client.complete(prompt, temperature=0.0, cache_prompt=True, **parameters)
+
+    def generate(self, prompt: str, candidate_ids: List[str]) -> Optional[Dict[str, Any]]:
+        """Grammatikgebundene Antwort mit vom Modell angegebener Konfidenz"""
+        settings = self.settings
+        response = self._request(
+            prompt, grammar=intent_grammar(tuple(candidate_ids), settings.decimal_places),
+            n_predict=answer_length(candidate_ids, settings.decimal_places))
+        answer = self.parse_answer(response.get("content", ""), candidate_ids)
+        if answer is None:
+            return None
+        intent_id, confidence = answer
+        confidence = round(confidence if intent_id is not None else 0.0, settings.decimal_places)
+        candidates = [{"intent_id": intent_id, "confidence": confidence}] if intent_id else []
+        return _result(intent_id, confidence, settings, candidates)
+
+    def score(self, prompt: str, candidate_ids: List[str]) -> Optional[Dict[str, Any]]:
+        """Bewertet alle Kandidaten in einem Vorwärtsdurchlauf über ihre Schlüssel-Token.
+
+        Die Wahrscheinlichkeiten der Schlüssel (inklusive "keiner") werden
+        normiert und ergeben Konfidenz und Kandidatenliste; Gleichstände nach
+        Rundung entscheidet die alphabetisch kleinere ID.
+        """
+        settings = self.settings
+        response = self._request(prompt, grammar=scoring_grammar(len(candidate_ids)),
+                                 n_predict=1, n_probs=len(candidate_ids) + 1)
+        probabilities = key_probabilities(response)
+        candidate_keys = SCORING_KEYS[:len(candidate_ids)]
+        keys = candidate_keys + NONE_KEY
+        total = sum(probabilities.get(key, 0.0) for key in keys)
+        if total <= 0:
+            return None
+
+        scored = sorted(((round(probabilities.get(key, 0.0) / total, settings.decimal_places),
+                          intent_id)
+                         for key, intent_id in zip(candidate_keys, candidate_ids, strict=True)),
+                        key=lambda item: (-item[0], item[1]))
+        best_confidence, best_id = scored[0]
+        candidates = [{"intent_id": intent_id, "confidence": confidence}
+                      for confidence, intent_id in scored[:settings.max_candidates]]
+        return _result(best_id, best_confidence, settings, candidates)
+
+    def classify_one(self, text: str) -> Dict[str, Any]:
+        settings = self.settings
+        candidate_ids = [intent_id for intent_id, _ in
+                         self.lexical.top_k(text, settings.prefilter_candidates)]
+        if not candidate_ids:
+            # Kein lexikalischer Treffer: keine LLM-Anfrage nötig
+            return _result(None, 0.0, settings)
+
+        prompt, candidate_ids = self.build_prompt(text, candidate_ids)
+        try:
+            if settings.llm_scoring == "logprobs":
+                result = self.score(prompt, candidate_ids)
+            else:
+                result = self.generate(prompt, candidate_ids)
+        except LlmClientError as e:
+            # classification_failure: log_and_continue; die übrigen Turns bleiben erhalten
+            logger.warning(f"Classification request failed for turn {text[:40]!r}: {e}")
+            return UncachedResult(_result(None, 0.0, settings))
+        if result is None:
+            # Nur bei Servern ohne Grammatik- bzw. n_probs-Unterstützung;
+            # classification_failure: log_and_continue
+            logger.warning(f"Unparseable classification for turn {text[:40]!r}")
+            return UncachedResult(_result(None, 0.0, settings))
+        return result
+
+    def previous_index(self, diff: VocabularyDiff) -> LexicalIndex:
+        """BM25-Index über ``diff.previous``; wird nur für einen neuen Diff gebaut"""
+        if self._previous is None or self._previous[0] is not diff:
+            self._previous = (diff, LexicalIndex.build(
+                [(intent["id"], f"{intent['id']} {intent_text(intent)}")
+                 for intent in diff.previous]))
+        return self._previous[1]
+
+    def may_change(self, texts: List[str], mappings: List[Dict[str, Any]],
+                   diff: VocabularyDiff) -> List[bool]:
+        """Vergleicht die Kandidatenauswahl des alten und des aktuellen Vokabulars.
+
+        Der Prompt hängt nur von Turn, Kandidaten-IDs und deren Texten ab;
+        bleiben Auswahl und Texte gleich, liefert das deterministische Sampling
+        dasselbe Ergebnis wie zuvor.
+        """
+        k = self.settings.prefilter_candidates
+        previous = self.previous_index(diff)
+        changed = set(diff.changed)
+        flags = []
+        for text in texts:
+            current = [intent_id for intent_id, _ in self.lexical.top_k(text, k)]
+            before = [intent_id for intent_id, _ in previous.top_k(text, k)]
+            flags.append(current != before or any(intent_id in changed for intent_id in current))
+        return flags
+
+    def classify(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Klassifiziert Texte; mit parallel_turn_processing als gleichzeitige Anfragen.
+
+        Jeder Turn bleibt eine eigene Anfrage mit identischem Prompt, sodass
+        Ergebnisse und Gleichstandsregel denen der seriellen Verarbeitung
+        entsprechen; ``map`` erhält die Reihenfolge.
+        """
+        workers = min(self.slots, len(texts))
+        if workers <= 1:
+            return [self.classify_one(text) for text in texts]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self.classify_one, texts))
+
+
+class IntentMapper:
+    """Ordnet Turns über einen austauschbaren Klassifikator Intents zu"""
+
+    def __init__(self, classifier: Classifier, settings: Optional[MapperSettings] = None,
+                 cache: Optional[MappingCache] = None):
+        self.classifier = classifier
+        self.settings = settings or MapperSettings()
+        self.cache = cache
+
+    @classmethod
+    def from_config(cls, embedder: Optional[Embedder] = None, vocab_path: Path = VOCAB_PATH,
+                    settings: Optional[MapperSettings] = None,
+                    cache_dir: Optional[Path] = CACHE_DIR,
+                    client: Optional[LlamaCppClient] = None) -> "IntentMapper":
+        """Lädt Vokabular, Klassifikator und Memo-Cache.
+
+        ``matching_algorithm`` wählt zwischen Embedding-Ähnlichkeit
+        (semantic_similarity) und LLM-Klassifikation mit lexikalischer
+        Vorauswahl (llm_classification). Ohne cache_enabled oder ``cache_dir``
+        wird nichts zwischengespeichert.
+        """
+        settings = settings or MapperSettings.from_config()
+        intents = load_vocabulary(vocab_path, settings.category_scope)
+        cache_dir = Path(cache_dir) if cache_dir is not None and settings.cache_enabled else None
+        if settings.algorithm == "llm_classification":
+            classifier = LlmClassifier.build(
+                intents, client or LlamaCppClient.from_config(settings.llm_profile), settings,
+                cache_dir / "lexical" if cache_dir else None)
+        else:
+            embedder = embedder or LlamaCppEmbedder.from_config()
+            index = EmbeddingIndex.build(intents, embedder,
+                                         cache_dir / "embeddings" if cache_dir else None)
+            classifier = EmbeddingClassifier(index, embedder, settings)
+
+        mapper = cls(classifier, settings)
+        if settings.cache_enabled and settings.memo_cache_path:
+            mapper.cache = open_cache(PROJECT_ROOT / settings.memo_cache_path,
+                                      vocabulary_version(intents), mapper.model_id,
+                                      settings.memo_cache_max_entries)
+        return mapper
+
+    @property
+    def model_id(self) -> str:
+        """Klassifikator und ergebnisrelevante Einstellungen als Teil des Memo-Schlüssels"""
+        settings = self.settings
+        return (f"{self.classifier.name}|threshold={settings.confidence_threshold}"
+                f"|candidates={settings.max_candidates if settings.include_candidates else 0}"
+                f"|decimals={settings.decimal_places}")
+
+    def map_turns(self, turns: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Erzeugt je Turn ein Mapping.
+
+        Turns mit gleichem normalisiertem Text werden nur einmal klassifiziert;
+        Ergebnisse aus dem Memo-Cache überspringen die Klassifikation ganz.
+        """
+        return self._map_window(turns, self.cache)
+
+    def _map_window(self, turns: Iterable[Any], cache: Optional[MappingCache],
+                    first_position: int = 0) -> List[Dict[str, Any]]:
+        refs, keys, texts = [], [], {}
+        for position, turn in enumerate(turns, first_position):
+            if not isinstance(turn, Mapping) or not isinstance(turn.get("text"), str) \
+                    or "speaker" not in turn or "index" not in turn:
+                raise MappingError("TRANSCRIPT_INVALID_FORMAT",
+                                   f"Turn {position} lacks speaker, index or text")
+            key = text_hash(turn["text"])
+            refs.append(f"{turn['speaker']}:{turn['index']}")
+            keys.append(key)
+            texts.setdefault(key, turn["text"])
+        if not refs:
+            raise MappingError("TRANSCRIPT_EMPTY", "Transcript contains no turns")
+
+        results = cache.get_many(texts) if cache is not None else {}
+        missing = [key for key in texts if key not in results]
+        if missing:
+            classified = list(zip(missing, self.classifier.classify(
+                [texts[key] for key in missing]), strict=True))
+            results.update(classified)
+            if cache is not None:
+                # Fehlschläge werden im nächsten Lauf erneut klassifiziert
+                cache.put_many((key, result) for key, result in classified
+                               if not isinstance(result, UncachedResult))
+
+        return [{"turn_ref": ref, **results[key]} for ref, key in zip(refs, keys, strict=True)]
+
+    def map_file(self, transcript_path: Path, output_path: Path) -> Dict[str, Any]:
+        """Liest ein Transkript und schreibt {name}.mapped.json.
+
+        Bis ``streaming_threshold`` Turns wird im Speicher gearbeitet; größere
+        Transkripte werden fensterweise gelesen, klassifiziert und an die
+        Ausgabe angehängt. Die Ausgabe ist in beiden Fällen identisch.
+        """
+        threshold = self.settings.streaming_threshold
+        try:
+            turns = iter_json_array(transcript_path)
+            head = list(islice(turns, threshold + 1))
+            if len(head) <= threshold:
+                mappings = self.map_turns(head)
+                write_mappings(mappings, output_path, self.settings.pretty_print)
+                return mapping_summary(mappings)
+            return self._map_stream(chain(head, turns), output_path)
+        except (OSError, JsonStreamError, UnicodeDecodeError) as e:
+            raise MappingError("TRANSCRIPT_INVALID_FORMAT", f"{transcript_path}: {e}") from None
+
+    def _map_stream(self, turns: Iterator[Any], output_path: Path) -> Dict[str, Any]:
+        """Klassifiziert Fenster von ``streaming_window`` Turns und schreibt sie sofort.
+
+        Ohne Memo-Cache hält ein temporärer SQLite-Cache die Ergebnisse bereits
+        klassifizierter Texte außerhalb des Speichers, damit wiederholte Turns
+        wie im Speichermodus das Ergebnis ihres ersten Auftretens erhalten.
+        """
+        stats = MappingStats()
+        with tempfile.TemporaryDirectory(prefix="intent-mapper-") as temp_dir:
+            cache = self.cache
+            if cache is None:
+                cache = MappingCache(Path(temp_dir) / "run.sqlite3", "run", self.model_id,
+                                     max_entries=2 ** 62)
+            try:
+                with atomic_output(output_path) as f:
+                    writer = JsonArrayWriter(f, indent=2 if self.settings.pretty_print else None,
+                                             ensure_ascii=False)
+                    position = 0
+                    while True:
+                        window = list(islice(turns, self.settings.streaming_window))
+                        if not window:
+                            break
+                        for mapping in self._map_window(window, cache, position):
+                            writer.write(mapping)
+                            stats.add(mapping)
+                        position += len(window)
+                    writer.close()
+            finally:
+                if cache is not self.cache:
+                    cache.close()
+        return stats.summary()
+
+
+def write_mappings(mappings: List[Dict[str, Any]], output_path: Path, pretty_print: bool = True):
+    """Schreibt die Mappings atomar"""
+    with atomic_output(output_path) as f:
+        json.dump(mappings, f, indent=2 if pretty_print else None, ensure_ascii=False)
+
+
+class MappingStats:
+    """Laufende Kennzahlen aus monitoring.metrics der Spezifikation"""
+
+    def __init__(self):
+        self.turns = 0
+        self.mapped = 0
+        self.confidence_sum = 0.0
+
+    def add(self, mapping: Dict[str, Any]):
+        self.turns += 1
+        self.mapped += mapping["intent_id"] is not None
+        self.confidence_sum += mapping["confidence"]
+
+    def summary(self) -> Dict[str, Any]:
+        return {"turns_processed_count": self.turns,
+                "intents_mapped_count": self.mapped,
+                "unmapped_turns_count": self.turns - self.mapped,
+                "average_confidence_score": round(self.confidence_sum / self.turns, 3)
+                if self.turns else 0.0}
+
+
+def mapping_summary(mappings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Kennzahlen aus monitoring.metrics der Spezifikation"""
+    stats = MappingStats()
+    for mapping in mappings:
+        stats.add(mapping)
+    return stats.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RooCode Intent Mapper")
+    parser.add_argument("transcripts", nargs="+", help="Transkripte (*.transcript.json)")
+    parser.add_argument("--output-dir", default="data/mappings", help="Zielverzeichnis")
+    parser.add_argument("--vocab", default=str(VOCAB_PATH), help="Vokabular (vocab.yaml)")
+    parser.add_argument("--algorithm", choices=["semantic_similarity", "llm_classification"],
+                        default=None, help="Klassifikation (Standard aus mode.intent-mapper.yaml)")
+    parser.add_argument("--embedder", choices=["llama-cpp", "hashing"], default="llama-cpp",
+                        help="Embedding-Quelle (Standard: lokaler llama.cpp-Server)")
+    parser.add_argument("--category", default=None, metavar="PREFIX",
+                        help="Nur Intents unter diesem ID-Präfix zuordnen (z.B. inform.)")
+    args = parser.parse_args()
+
+    settings = MapperSettings.from_config()
+    if args.algorithm:
+        settings.algorithm = args.algorithm
+    settings.category_scope = args.category
+    embedder = LlamaCppEmbedder.from_config() if args.embedder == "llama-cpp" \
+        else HashingEmbedder()
+    try:
+        mapper = IntentMapper.from_config(embedder, Path(args.vocab), settings)
+    except MappingError as e:
+        print(json.dumps({"error_code": e.code, "error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+    failed = False
+    for name in args.transcripts:
+        transcript_path = Path(name)
+        output_path = mapping_path_for(transcript_path, Path(args.output_dir))
+        try:
+            summary = mapper.map_file(transcript_path, output_path)
+        except MappingError as e:
+            failed = True
+            print(json.dumps({"input_file": name, "error_code": e.code, "error": str(e)}),
+                  file=sys.stderr)
+            continue
+        print(json.dumps({"input_file": name, "output_file": str(output_path), **summary}))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
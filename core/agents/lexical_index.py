@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+RooCode Lexical Intent Index
+BM25 über Zeichen-Trigramme von Intent-IDs, Labels und Beschreibungen zur Kandidatenvorauswahl
+"""
+
+import os
+import re
+import tempfile
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+WORD_PATTERN = re.compile(r"\w+")
+# Standardparameter von Okapi BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def trigrams(text: str) -> List[str]:
+    """Zeichen-Trigramme je Wort mit Wortgrenzen (#), robust gegen Flexion und Tippfehler"""
+    text = unicodedata.normalize("NFC", text).casefold().replace("_", " ")
+    grams = []
+    for word in WORD_PATTERN.findall(text):
+        padded = f"#{word}#"
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class LexicalIndex:
+    """Invertierter Index mit vorberechneten BM25-Gewichten je (Trigramm, Intent).
+
+    Die Postings liegen als CSR-Arrays vor; eine Anfrage sammelt die Gewichte
+    ihrer Trigramme mit einem einzigen ``np.bincount``.
+    """
+
+    def __init__(self, intent_ids: List[str], terms: Dict[str, int], indptr: np.ndarray,
+                 postings: np.ndarray, weights: np.ndarray):
+        self.intent_ids = intent_ids
+        self.terms = terms
+        self.indptr = indptr
+        self.postings = postings
+        self.weights = weights
+
+    @classmethod
+    def build(cls, documents: Sequence[Tuple[str, str]]) -> "LexicalIndex":
+        """Baut den Index aus (Intent-ID, Text); Dokumente werden nach ID sortiert"""
+        documents = sorted(documents)
+        counts = [Counter(trigrams(text)) for _, text in documents]
+        lengths = np.array([sum(c.values()) for c in counts], dtype=np.float64)
+        average = lengths.mean() if len(lengths) and lengths.mean() > 0 else 1.0
+
+        by_term: Dict[str, List[Tuple[int, int]]] = {}
+        for doc, term_counts in enumerate(counts):
+            for term, tf in term_counts.items():
+                by_term.setdefault(term, []).append((doc, tf))
+
+        terms, indptr, postings, weights = {}, [0], [], []
+        for term in sorted(by_term):
+            entries = by_term[term]
+            idf = np.log(1 + (len(documents) - len(entries) + 0.5) / (len(entries) + 0.5))
+            for doc, tf in entries:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc] / average)
+                postings.append(doc)
+                weights.append(idf * tf * (BM25_K1 + 1) / (tf + norm))
+            terms[term] = len(indptr) - 1
+            indptr.append(len(postings))
+
+        return cls([intent_id for intent_id, _ in documents], terms,
+                   np.array(indptr, dtype=np.int64), np.array(postings, dtype=np.int32),
+                   np.array(weights, dtype=np.float32))
+
+    @classmethod
+    def load_or_build(cls, documents: Sequence[Tuple[str, str]],
+                      cache_path: Path) -> "LexicalIndex":
+        """Lädt den zur Vokabularversion gehörenden Index oder baut und speichert ihn"""
+        cache_path = Path(cache_path)
+        if cache_path.exists():
+            try:
+                return cls.load(cache_path)
+            except (OSError, ValueError, KeyError):
+                pass
+        index = cls.build(documents)
+        index.save(cache_path)
+        return index
+
+    def save(self, path: Path):
+        """Schreibt den Index atomar als .npz"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, intent_ids=np.array(self.intent_ids),
+                         terms=np.array(sorted(self.terms, key=self.terms.get)),
+                         indptr=self.indptr, postings=self.postings, weights=self.weights)
+            os.replace(temp_name, path)
+        except BaseException:
+            try:
+                os.unlink(temp_name)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, path: Path) -> "LexicalIndex":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["intent_ids"].tolist(),
+                       {term: i for i, term in enumerate(data["terms"].tolist())},
+                       data["indptr"], data["postings"], data["weights"])
+
+    def scores(self, text: str) -> np.ndarray:
+        """BM25-Wert jedes Intents für den Text (jedes Trigramm zählt einmal)"""
+        rows = [self.terms[term] for term in set(trigrams(text)) if term in self.terms]
+        if not rows:
+            return np.zeros(len(self.intent_ids), dtype=np.float64)
+        slices = [slice(self.indptr[row], self.indptr[row + 1]) for row in rows]
+        return np.bincount(np.concatenate([self.postings[s] for s in slices]),
+                           weights=np.concatenate([self.weights[s] for s in slices]),
+                           minlength=len(self.intent_ids))
+
+    def top_k(self, text: str, k: int) -> List[Tuple[str, float]]:
+        """Beste ``k`` Intents mit positivem Wert; Gleichstände nach alphabetischer ID"""
+        scores = self.scores(text)
+        positive = np.flatnonzero(scores > 0)
+        if len(positive) > k:
+            cutoff = np.partition(scores[positive], len(positive) - k)[len(positive) - k]
+            positive = positive[scores[positive] >= cutoff]
+        # Spalten sind nach ID sortiert: bei gleichem Wert gewinnt der kleinere Index
+        order = positive[np.lexsort((positive, -scores[positive]))][:k]
+        return [(self.intent_ids[i], float(scores[i])) for i in order]
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+RooCode Local LLM Client
+Schlanker HTTP-Client für den lokalen llama.cpp-Server (llm.config.yaml)
+"""
+
+import json
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+LLM_CONFIG_PATH = PROJECT_ROOT / "core" / "config" / "llm.config.yaml"
+
+# Grobe Abschätzung für Prompt-Budgets ohne Tokenizer
+CHARS_PER_TOKEN = 4
+
+
+class LlmClientError(RuntimeError):
+    """Server nicht erreichbar oder Antwort unbrauchbar"""
+
+
+class LlamaCppClient:
+    """Anfragen an den llama.cpp-Server mit den Sampling-Vorgaben eines Profils"""
+
+    def __init__(self, base_url: str = "http://127.0.0.1:8080", model: Optional[str] = None,
+                 profile: str = "default", context_tokens: int = 4096,
+                 defaults: Optional[Dict[str, Any]] = None, timeout_seconds: float = 30,
+                 parallel_slots: int = 1):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.profile = profile
+        self.context_tokens = context_tokens
+        self.parallel_slots = max(1, parallel_slots)
+        self.defaults = defaults or {}
+        self.timeout_seconds = timeout_seconds
+
+    @property
+    def name(self) -> str:
+        """Modell und Profil, z.B. für Cache-Schlüssel"""
+        return f"llama-cpp:{self.model or self.base_url}:{self.profile}"
+
+    @property
+    def slot_context_tokens(self) -> int:
+        """Kontext einer einzelnen Anfrage; der Server teilt ihn auf die Slots auf"""
+        return self.context_tokens // self.parallel_slots
+
+    @classmethod
+    def from_config(cls, profile: str = "default",
+                    config_path: Path = LLM_CONFIG_PATH) -> "LlamaCppClient":
+        """Port, Modell, Kontextgröße und Sampling-Vorgaben; Profilwerte überschreiben die Basis"""
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = yaml.safe_load(f) or {}
+        except (OSError, yaml.YAMLError):
+            return cls(profile=profile)
+
+        overrides = (config.get("profiles") or {}).get(profile) or {}
+
+        def section(name: str) -> Dict[str, Any]:
+            return {**(config.get(name) or {}), **(overrides.get(name) or {})}
+
+        port = (config.get("interface") or {}).get("api_port", 8080)
+        return cls(base_url=f"http://127.0.0.1:{port}",
+                   model=section("model").get("name"),
+                   profile=profile,
+                   context_tokens=section("context").get("max_tokens", 4096),
+                   parallel_slots=section("performance").get("parallel_slots", 1),
+                   defaults={key: value for key, value in section("defaults").items()
+                             if key in ("temperature", "top_k", "top_p", "seed",
+                                        "repeat_penalty")})
+
+    def post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Sendet JSON und liefert die dekodierte Antwort"""
+        request = urllib.request.Request(f"{self.base_url}{path}",
+                                         data=json.dumps(payload).encode('utf-8'),
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout_seconds) as response:
+                return json.load(response)
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            raise LlmClientError(f"{path}: {e}") from None
+
+    def complete(self, prompt: str, **parameters: Any) -> Dict[str, Any]:
+        """Textvervollständigung über /completion; Parameter überschreiben die Profilvorgaben"""
+        return self.post("/completion", {**self.defaults, **parameters, "prompt": prompt})
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embeddings über das OpenAI-kompatible /v1/embeddings in Eingabereihenfolge"""
+        payload: Dict[str, Any] = {"input": texts}
+        if self.model:
+            payload["model"] = self.model
+        data = self.post("/v1/embeddings", payload).get("data") or []
+        if len(data) != len(texts):
+            raise LlmClientError(f"Expected {len(texts)} embeddings, got {len(data)}")
+        return [item["embedding"] for item in sorted(data, key=lambda item: item.get("index", 0))]
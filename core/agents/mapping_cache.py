@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+RooCode Mapping Memo Cache
+Persistenter LRU-Cache für Turn-Klassifikationen, geteilt über Dateien und Läufe
+"""
+
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+WHITESPACE = re.compile(r"\s+")
+# Obergrenze gebundener Parameter je SQLite-Abfrage
+QUERY_CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memo (
+    text_hash TEXT NOT NULL,
+    vocab_version TEXT NOT NULL,
+    model_id TEXT NOT NULL,
+    result TEXT NOT NULL,
+    last_used INTEGER NOT NULL,
+    UNIQUE (text_hash, vocab_version, model_id)
+);
+CREATE INDEX IF NOT EXISTS memo_last_used ON memo (last_used);
+"""
+
+
+def normalize_text(text: str) -> str:
+    """Vergleichsform eines Turns: NFC, Groß-/Kleinschreibung und Leerraum vereinheitlicht"""
+    return WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip().casefold()
+
+
+def text_hash(text: str) -> str:
+    """Cache-Schlüssel des normalisierten Turn-Texts"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+class MappingCache:
+    """SQLite-Memo (Text-Hash, Vokabularversion, Modell-ID) -> Mapping mit LRU-Verdrängung.
+
+    Einträge anderer Vokabularversionen werden nie getroffen und altern
+    über die LRU-Grenze ``max_entries`` aus dem Cache heraus.
+    """
+
+    def __init__(self, path: Path, vocab_version: str, model_id: str,
+                 max_entries: int = 100000):
+        self.path = Path(path)
+        self.vocab_version = vocab_version
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.path), timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def get_many(self, hashes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Liefert vorhandene Mappings und markiert sie als zuletzt verwendet"""
+        hashes = list(dict.fromkeys(hashes))
+        found: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(hashes), QUERY_CHUNK):
+            chunk = hashes[start:start + QUERY_CHUNK]
+            rows = self.connection.execute(
+                f"SELECT text_hash, result FROM memo WHERE vocab_version = ? AND model_id = ? "
+                f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                [self.vocab_version, self.model_id, *chunk]).fetchall()
+            found.update((key, json.loads(result)) for key, result in rows)
+
+        if found:
+            now = time.time_ns()
+            with self.connection:
+                self.connection.executemany(
+                    "UPDATE memo SET last_used = ? WHERE text_hash = ? AND vocab_version = ? "
+                    "AND model_id = ?",
+                    [(now, key, self.vocab_version, self.model_id) for key in found])
+        return found
+
+    def put_many(self, results: Iterable[Tuple[str, Dict[str, Any]]]):
+        """Speichert Mappings und verdrängt die am längsten unbenutzten Einträge"""
+        now = time.time_ns()
+        rows = [(key, self.vocab_version, self.model_id,
+                 json.dumps(result, ensure_ascii=False), now)
+                for key, result in results]
+        if not rows:
+            return
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO memo (text_hash, vocab_version, model_id, result, "
+                "last_used) VALUES (?, ?, ?, ?, ?)", rows)
+            # Ein Stapel teilt sich last_used; rowid (neuere Einfügung zuerst) bricht Gleichstände
+            self.connection.execute(
+                "DELETE FROM memo WHERE rowid IN (SELECT rowid FROM memo "
+                "ORDER BY last_used DESC, rowid DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM memo").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+
+def open_cache(path: Optional[Path], vocab_version: str, model_id: str,
+               max_entries: int) -> Optional[MappingCache]:
+    """Öffnet den Cache; ohne Pfad oder bei nicht beschreibbarem Ort wird ohne Cache gearbeitet"""
+    if path is None:
+        return None
+    try:
+        return MappingCache(path, vocab_version, model_id, max_entries)
+    except (OSError, sqlite3.Error):
+        return None
+
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+RooCode Fused Transcript Pipeline
+Führt aufeinanderfolgende Flow-Schritte auf einem einmal geparsten Transkript aus
+"""
+
+import sys
+import json
+import argparse
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Tuple
+
+import yaml
+
+# Projekt-Root für Paketimporte verfügbar machen (Aufruf als Skript aus core/agents)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.agents.intent_discovery import (DiscoverySettings, LlmDrafter, join_unmapped,
+                                          null_refs, write_suggestions)
+from core.agents.intent_mapper import (IntentMapper, mapping_path_for, mapping_summary,
+                                       write_mappings)
+from core.agents.transcript_validator import (TranscriptValidator, ValidatorSettings,
+                                              validation_path_for, write_report)
+from core.ci.json_stream import iter_json_array
+from core.vocab.vocab_store import VOCAB_PATH
+
+FLOWS_PATH = PROJECT_ROOT / "core" / "modes" / "buddy" / "buddy-flows.yaml"
+
+
+class PipelineError(ValueError):
+    """Transkript für die Pipeline unbrauchbar (Codes wie in den Agenten-Spezifikationen)"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+
+    def __reduce__(self):
+        return (PipelineError, (self.code, self.message))
+
+
+def _freeze(value: Any) -> Any:
+    """Macht geparste JSON-Werte unveränderlich (Objekte schreibgeschützt, Listen als Tupel)"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class Transcript:
+    """Einmal gelesenes, unveränderliches Transkript, das sich alle Schritte teilen"""
+    path: Path
+    turns: Tuple[Any, ...]
+
+    @classmethod
+    def load(cls, path: Path) -> "Transcript":
+        """Liest und dekodiert die Datei genau einmal; die Wurzel muss ein Turn-Array sein"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            raise PipelineError("TRANSCRIPT_INVALID_FORMAT", f"{path}: {e}") from None
+        if not isinstance(data, list):
+            raise PipelineError("TRANSCRIPT_INVALID_FORMAT",
+                                f"{path}: root must be an array of turns")
+        return cls(Path(path), _freeze(data))
+
+
+@dataclass
+class PipelineContext:
+    """Ausgabeort und zwischen Transkripten geteilte Ressourcen (Validator, Vokabular).
+
+    ``artifacts`` hält Zwischenergebnisse eines Transkripts (z.B. die Mappings
+    für die Intent-Discovery) im Speicher; ohne Fusion wird es vor jedem
+    Schritt geleert, sodass Schritte wie getrennte Agentenläufe von der Platte lesen.
+    """
+    project_root: Path
+    output_dir: Path
+    resources: Dict[str, Any] = field(default_factory=dict)
+    artifacts: Dict[str, Any] = field(default_factory=dict)
+
+    def resource(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Erzeugt eine Ressource beim ersten Zugriff"""
+        if name not in self.resources:
+            self.resources[name] = factory()
+        return self.resources[name]
+
+
+StepFunction = Callable[[Transcript, PipelineContext], Dict[str, Any]]
+STEP_REGISTRY: Dict[str, StepFunction] = {}
+
+
+def register_step(slug: str) -> Callable[[StepFunction], StepFunction]:
+    """Registriert einen Schritt unter seinem Mode-Slug"""
+    def decorator(function: StepFunction) -> StepFunction:
+        STEP_REGISTRY[slug] = function
+        return function
+    return decorator
+
+
+@register_step("validator")
+def validator_step(transcript: Transcript, context: PipelineContext) -> Dict[str, Any]:
+    """Schreibt {name}.validation.json"""
+    validator = context.resource(
+        "validator", lambda: TranscriptValidator(ValidatorSettings.from_spec()))
+    report = validator.validate_turns(transcript.turns, str(transcript.path))
+    output_path = validation_path_for(transcript.path, context.output_dir)
+    write_report(report, output_path)
+    return {"step": "validator", "artifact": str(output_path), "status": report["status"]}
+
+
+@register_step("intent-mapper")
+def intent_mapper_step(transcript: Transcript, context: PipelineContext) -> Dict[str, Any]:
+    """Schreibt {name}.mapped.json"""
+    mapper = context.resource("intent_mapper", IntentMapper.from_config)
+    mappings = mapper.map_turns(transcript.turns)
+    output_path = mapping_path_for(transcript.path, context.output_dir)
+    write_mappings(mappings, output_path, mapper.settings.pretty_print)
+    context.artifacts["mappings"] = mappings
+    return {"step": "intent-mapper", "artifact": str(output_path), **mapping_summary(mappings)}
+
+
+@register_step("intent-discovery")
+def intent_discovery_step(transcript: Transcript, context: PipelineContext) -> Dict[str, Any]:
+    """Schreibt Vorschläge für unmapped Turns nach intent-scout/suggestions.
+
+    Die Mappings kommen aus dem vorangehenden Mapper-Schritt; nur ohne sie
+    wird {name}.mapped.json gelesen. Das Transkript selbst wird nicht erneut geparst.
+    """
+    mappings = context.artifacts.get("mappings")
+    if mappings is None:
+        mappings = iter_json_array(mapping_path_for(transcript.path, context.output_dir))
+    settings = context.resource("discovery_settings", DiscoverySettings.from_config)
+    drafter = context.resource("drafter", LlmDrafter.from_config)
+    vocab_path = context.resource("vocab_path", lambda: VOCAB_PATH)
+    turns = list(join_unmapped(transcript.turns, null_refs(mappings), transcript.path.name))
+    output_dir = context.project_root / "intent-scout" / "suggestions"
+    summary = write_suggestions(turns, output_dir, settings, drafter, vocab_path=vocab_path)
+    return {"step": "intent-discovery", "artifact": str(output_dir), **summary}
+
+
+def fused_segments(steps: List[str]) -> List[List[str]]:
+    """Gruppiert aufeinanderfolgende registrierte Schritte; andere bleiben einzeln"""
+    segments: List[List[str]] = []
+    for step in steps:
+        if step in STEP_REGISTRY and segments and segments[-1][0] in STEP_REGISTRY:
+            segments[-1].append(step)
+        else:
+            segments.append([step])
+    return segments
+
+
+def run_steps(transcript_path: Path, steps: List[str], context: PipelineContext,
+              fused: bool = True) -> List[Dict[str, Any]]:
+    """Führt registrierte Schritte für ein Transkript aus.
+
+    Mit ``fused`` wird die Datei einmal gelesen und das unveränderliche
+    Transkript an alle Schritte übergeben; sonst liest jeder Schritt sie
+    selbst, wie bei getrennten Agentenläufen. Die Artefakte sind identisch.
+    Meldet ein Schritt ``status: invalid``, laufen die folgenden nicht mehr.
+    """
+    unknown = [step for step in steps if step not in STEP_REGISTRY]
+    if unknown:
+        raise ValueError(f"Steps without pipeline implementation: {', '.join(unknown)}")
+
+    context.artifacts = {}
+    transcript = Transcript.load(transcript_path) if fused else None
+    results = []
+    for step in steps:
+        if not fused:
+            context.artifacts = {}
+        step_input = transcript if fused else Transcript.load(transcript_path)
+        result = STEP_REGISTRY[step](step_input, context)
+        results.append(result)
+        if result.get("status") == "invalid":
+            break
+    return results
+
+
+def load_flow(flow_id: str, flows_path: Path = FLOWS_PATH) -> Dict[str, Any]:
+    """Liest eine Flow-Definition aus buddy-flows.yaml"""
+    with open(flows_path, 'r', encoding='utf-8') as f:
+        flows = (yaml.safe_load(f) or {}).get("flows") or []
+    for flow in flows:
+        if isinstance(flow, dict) and flow.get("id") == flow_id:
+            return flow
+    raise ValueError(f"Unknown flow: {flow_id}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RooCode Fused Transcript Pipeline")
+    parser.add_argument("transcripts", nargs="+", help="Transkripte (*.transcript.json)")
+    parser.add_argument("--flow", default="transcript_processing",
+                        help="Flow aus buddy-flows.yaml, dessen Transkript-Schritte laufen")
+    parser.add_argument("--output-dir", default=None,
+                        help="Zielverzeichnis (Standard: output_folder des Flows)")
+    parser.add_argument("--fused", action=argparse.BooleanOptionalAction, default=None,
+                        help="Transkript einmal lesen und zwischen Schritten teilen "
+                             "(Standard: fused des Flows)")
+    args = parser.parse_args()
+
+    flow = load_flow(args.flow)
+    fused = args.fused if args.fused is not None else bool(flow.get("fused", False))
+    steps = [step for step in flow.get("steps") or [] if step in STEP_REGISTRY]
+    output_dir = Path(args.output_dir or (flow.get("input") or {}).get("output_folder")
+                      or "data/output")
+    context = PipelineContext(PROJECT_ROOT, output_dir)
+
+    failed = False
+    for name in args.transcripts:
+        try:
+            results = run_steps(Path(name), steps, context, fused)
+        except PipelineError as e:
+            print(json.dumps({"transcript": name, "error_code": e.code, "error": e.message}),
+                  file=sys.stderr)
+            failed = True
+            continue
+        for result in results:
+            print(json.dumps({"transcript": name, **result}))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+RooCode Incremental Re-Mapping
+Aktualisiert bestehende *.mapped.json nach Vokabularänderungen; neu klassifiziert
+werden nur Turns, deren Ergebnis sich durch die Änderung ändern kann
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Projekt-Root für Paketimporte verfügbar machen (Aufruf als Skript aus core/agents)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.agents.intent_mapper import (VOCAB_PATH, HashingEmbedder, IntentMapper,
+                                       LlamaCppEmbedder, MapperSettings, MappingError,
+                                       VocabularyDiff, load_vocabulary, mapping_path_for,
+                                       mapping_summary, write_mappings)
+from core.ci.json_stream import JsonStreamError, iter_json_array
+
+
+def _load_mappings(mapping_path: Path) -> List[Dict[str, Any]]:
+    """Bisherige Mappings; fehlende oder unlesbare Dateien gelten als nicht vorhanden"""
+    try:
+        with open(mapping_path, 'r', encoding='utf-8') as f:
+            mappings = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return mappings if isinstance(mappings, list) else []
+
+
+def remap_file(mapper: IntentMapper, diff: VocabularyDiff, transcript_path: Path,
+               mapping_path: Path) -> Dict[str, Any]:
+    """Klassifiziert nur betroffene Turns neu und ersetzt die Mapping-Datei atomar.
+
+    Passen die gespeicherten Mappings nicht mehr zum Transkript (andere
+    Turn-Anzahl oder turn_refs), wird die Datei vollständig neu gemappt.
+    """
+    try:
+        turns = list(iter_json_array(transcript_path))
+    except (OSError, JsonStreamError, UnicodeDecodeError) as e:
+        raise MappingError("TRANSCRIPT_INVALID_FORMAT", f"{transcript_path}: {e}") from None
+
+    mappings = _load_mappings(mapping_path)
+    refs = [f"{turn.get('speaker')}:{turn.get('index')}" if isinstance(turn, dict) else None
+            for turn in turns]
+    if not turns or [m.get("turn_ref") if isinstance(m, dict) else None
+                     for m in mappings] != refs:
+        summary = mapper.map_file(transcript_path, mapping_path)
+        return {**summary, "turns_reclassified": len(turns), "turns_changed": len(turns),
+                "full_remap": True}
+
+    affected = []
+    if diff:
+        flags = mapper.classifier.may_change([turn.get("text", "") for turn in turns],
+                                             mappings, diff)
+        affected = [position for position, flag in enumerate(flags) if flag]
+    changed = 0
+    if affected:
+        for position, mapping in zip(affected, mapper.map_turns([turns[p] for p in affected]),
+                                     strict=True):
+            if mapping != mappings[position]:
+                mappings[position] = mapping
+                changed += 1
+        if changed:
+            write_mappings(mappings, mapping_path, mapper.settings.pretty_print)
+    return {**mapping_summary(mappings), "turns_reclassified": len(affected),
+            "turns_changed": changed, "full_remap": False}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RooCode Incremental Re-Mapping")
+    parser.add_argument("transcripts", nargs="+", help="Transkripte (*.transcript.json)")
+    parser.add_argument("--previous-vocab", required=True,
+                        help="Vokabular, mit dem die bestehenden Mappings erzeugt wurden")
+    parser.add_argument("--output-dir", default="data/mappings", help="Verzeichnis der Mappings")
+    parser.add_argument("--vocab", default=str(VOCAB_PATH), help="Aktuelles Vokabular (vocab.yaml)")
+    parser.add_argument("--embedder", choices=["llama-cpp", "hashing"], default="llama-cpp",
+                        help="Embedding-Quelle (wie beim ursprünglichen Mapping)")
+    args = parser.parse_args()
+
+    settings = MapperSettings.from_config()
+    embedder = LlamaCppEmbedder.from_config() if args.embedder == "llama-cpp" \
+        else HashingEmbedder()
+    try:
+        diff = VocabularyDiff.between(load_vocabulary(Path(args.previous_vocab)),
+                                      load_vocabulary(Path(args.vocab)))
+        mapper = IntentMapper.from_config(embedder, Path(args.vocab), settings)
+    except MappingError as e:
+        print(json.dumps({"error_code": e.code, "error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+    failed = False
+    for name in args.transcripts:
+        transcript_path = Path(name)
+        output_path = mapping_path_for(transcript_path, Path(args.output_dir))
+        try:
+            summary = remap_file(mapper, diff, transcript_path, output_path)
+        except MappingError as e:
+            failed = True
+            print(json.dumps({"input_file": name, "error_code": e.code, "error": str(e)}),
+                  file=sys.stderr)
+            continue
+        print(json.dumps({"input_file": name, "output_file": str(output_path), **summary}))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
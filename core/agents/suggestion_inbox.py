@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+RooCode Suggestion Inbox
+SQLite-Index über intent-scout/suggestions: Hash, Freigabe und Verarbeitungsstand je Datei
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+from core.vocab.vocab_store import file_digest
+
+INDEX_NAME = ".inbox.sqlite3"
+# Obergrenze gebundener Parameter je SQLite-Abfrage
+QUERY_CHUNK = 500
+# Verarbeitungsstand je Datei (Spalte processed)
+PENDING, PROCESSED, SKIPPED = 0, 1, 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest BLOB NOT NULL,
+    approved INTEGER NOT NULL,
+    processed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS suggested_ids (
+    suggested_id TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS suggested_ids_id ON suggested_ids (suggested_id);
+CREATE INDEX IF NOT EXISTS suggested_ids_name ON suggested_ids (name);
+CREATE TABLE IF NOT EXISTS source_turns (
+    transcript_file TEXT NOT NULL,
+    source_turn TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS source_turns_ref ON source_turns (transcript_file, source_turn);
+CREATE INDEX IF NOT EXISTS source_turns_name ON source_turns (name);
+CREATE INDEX IF NOT EXISTS files_pending ON files (name) WHERE approved = 1 AND processed = 0;
+"""
+
+
+def load_suggestions(path: Path) -> List[Dict[str, Any]]:
+    """Vorschläge einer Datei: einzelner Vorschlag (Template) oder Liste unter suggestions"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.safe_load(f) or {}
+    if isinstance(data, dict) and isinstance(data.get("suggestions"), list):
+        return [s for s in data["suggestions"] if isinstance(s, dict)]
+    return [data] if isinstance(data, dict) else []
+
+
+def source_refs(suggestion: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(transcript_file, source_turn) aller Turns eines Vorschlags, inklusive source_turns"""
+    context = suggestion.get("context")
+    refs = [((context or {}).get("transcript_file") if isinstance(context, dict) else None,
+             suggestion.get("source_turn"))]
+    refs += [(member.get("transcript_file"), member.get("source_turn"))
+             for member in suggestion.get("source_turns") or [] if isinstance(member, dict)]
+    return [(transcript_file, source_turn) for transcript_file, source_turn in refs
+            if isinstance(transcript_file, str) and isinstance(source_turn, str)]
+
+
+def is_approved(suggestion: Dict[str, Any]) -> bool:
+    """approved: true oder metadata.status: approved"""
+    metadata = suggestion.get("metadata") or {}
+    return suggestion.get("approved") is True or \
+        (isinstance(metadata, dict) and metadata.get("status") == "approved")
+
+
+class SuggestionInbox:
+    """Index der Vorschlagsdateien eines Verzeichnisses.
+
+    Dateien werden nur neu gelesen, wenn Größe oder mtime abweichen und sich
+    dann auch der Inhalt (SHA-256) geändert hat; jede Inhaltsänderung, etwa
+    eine Freigabe, setzt ``processed`` auf ``PENDING`` zurück. Neben den
+    vorgeschlagenen IDs werden die Quell-Turns indiziert, damit die Discovery
+    bereits vorgeschlagene Turns ohne Lesen der Dateien erkennt.
+    """
+
+    def __init__(self, directory: Path, index_path: Optional[Path] = None):
+        self.directory = Path(directory)
+        self.index_path = Path(index_path) if index_path else self.directory / INDEX_NAME
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.index_path), timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def refresh(self) -> Dict[str, int]:
+        """Gleicht den Index mit dem Verzeichnis ab; liefert Zähler für neu gelesene und entfernte Dateien"""
+        known = {name: (size, mtime_ns, digest) for name, size, mtime_ns, digest in
+                 self.connection.execute("SELECT name, size, mtime_ns, digest FROM files")}
+        seen = set()
+        parsed = 0
+        with self.connection:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".yaml") or not entry.is_file():
+                        continue
+                    seen.add(entry.name)
+                    stat = entry.stat()
+                    row = known.get(entry.name)
+                    if row and row[:2] == (stat.st_size, stat.st_mtime_ns):
+                        continue
+                    digest = file_digest(Path(entry.path))
+                    if row and row[2] == digest:
+                        self.connection.execute(
+                            "UPDATE files SET size = ?, mtime_ns = ? WHERE name = ?",
+                            (stat.st_size, stat.st_mtime_ns, entry.name))
+                        continue
+                    try:
+                        suggestions = load_suggestions(Path(entry.path))
+                    except (OSError, yaml.YAMLError):
+                        suggestions = []
+                    self._store(entry.name, stat, digest, suggestions)
+                    parsed += 1
+
+            removed = [name for name in known if name not in seen]
+            self.connection.executemany("DELETE FROM files WHERE name = ?",
+                                        [(name,) for name in removed])
+            self.connection.executemany("DELETE FROM suggested_ids WHERE name = ?",
+                                        [(name,) for name in removed])
+            self.connection.executemany("DELETE FROM source_turns WHERE name = ?",
+                                        [(name,) for name in removed])
+        return {"files_parsed": parsed, "files_removed": len(removed)}
+
+    def record(self, path: Path, suggestions: List[Dict[str, Any]]):
+        """Trägt eine gerade geschriebene Datei ein, ohne sie erneut zu lesen"""
+        path = Path(path)
+        with self.connection:
+            self._store(path.name, path.stat(), file_digest(path), suggestions)
+
+    def _store(self, name: str, stat: os.stat_result, digest: bytes,
+               suggestions: List[Dict[str, Any]]):
+        approved = int(any(is_approved(s) for s in suggestions))
+        self.connection.execute(
+            "INSERT OR REPLACE INTO files (name, size, mtime_ns, digest, approved, processed) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (name, stat.st_size, stat.st_mtime_ns, digest, approved, PENDING))
+        self.connection.execute("DELETE FROM suggested_ids WHERE name = ?", (name,))
+        self.connection.executemany(
+            "INSERT INTO suggested_ids (suggested_id, name) VALUES (?, ?)",
+            [(s["suggested_id"], name) for s in suggestions
+             if isinstance(s.get("suggested_id"), str)])
+        self.connection.execute("DELETE FROM source_turns WHERE name = ?", (name,))
+        self.connection.executemany(
+            "INSERT INTO source_turns (transcript_file, source_turn, name) VALUES (?, ?, ?)",
+            [(*ref, name) for s in suggestions for ref in source_refs(s)])
+
+    def pending(self) -> List[Path]:
+        """Freigegebene, noch nicht verarbeitete Dateien"""
+        rows = self.connection.execute(
+            "SELECT name FROM files WHERE approved = 1 AND processed = 0 ORDER BY name")
+        return [self.directory / name for name, in rows]
+
+    def skipped(self) -> List[Path]:
+        """Freigegebene Dateien, die der Updater als Duplikat oder ungültig übersprungen hat"""
+        rows = self.connection.execute(
+            "SELECT name FROM files WHERE approved = 1 AND processed = ? ORDER BY name",
+            (SKIPPED,))
+        return [self.directory / name for name, in rows]
+
+    def _mark(self, paths: Iterable[Path], state: int):
+        names = [Path(path).name for path in paths]
+        with self.connection:
+            for start in range(0, len(names), QUERY_CHUNK):
+                chunk = names[start:start + QUERY_CHUNK]
+                self.connection.execute(
+                    f"UPDATE files SET processed = ? WHERE name IN ({','.join('?' * len(chunk))})",
+                    [state, *chunk])
+
+    def mark_processed(self, paths: Iterable[Path]):
+        self._mark(paths, PROCESSED)
+
+    def mark_skipped(self, paths: Iterable[Path]):
+        """Übersprungene Dateien werden erst nach einer Inhaltsänderung wieder fällig"""
+        self._mark(paths, SKIPPED)
+
+    def has_source_turn(self, transcript_file: str, source_turn: str) -> bool:
+        """Ob ein Vorschlag den Turn bereits enthält (als source_turn oder in source_turns)"""
+        return self.connection.execute(
+            "SELECT 1 FROM source_turns WHERE transcript_file = ? AND source_turn = ? LIMIT 1",
+            (transcript_file, source_turn)).fetchone() is not None
+
+    def __contains__(self, suggested_id: object) -> bool:
+        return self.connection.execute(
+            "SELECT 1 FROM suggested_ids WHERE suggested_id = ? LIMIT 1",
+            (suggested_id,)).fetchone() is not None
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        """Vorgeschlagene IDs mit Präfix, als Bereichsabfrage über den ID-Index"""
+        rows = self.connection.execute(
+            "SELECT DISTINCT suggested_id FROM suggested_ids WHERE suggested_id >= ? "
+            "AND suggested_id < ? ORDER BY suggested_id", (prefix, prefix + "\U0010ffff"))
+        return [suggested_id for suggested_id, in rows]
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> "SuggestionInbox":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+RooCode Transcript Validator Engine
+Prüft *.transcript.json spaltenweise mit NumPy und schreibt *.validation.json (spec.validator.yaml)
+"""
+
+import sys
+import json
+import argparse
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import yaml
+
+# Projekt-Root für Paketimporte verfügbar machen (Aufruf als Skript aus core/agents)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.ci.json_stream import JsonStreamError, iter_json_array
+from core.common.atomic_file import atomic_output
+
+SPEC_PATH = PROJECT_ROOT / "core" / "modes" / "validator" / "spec.validator.yaml"
+
+REQUIRED_FIELDS = {"speaker": str, "index": int, "text": str,
+                   "char_pos_start": int, "char_pos_end": int}
+# Turns werden durch genau ein Zeichen getrennt (siehe Transkriptor)
+SEPARATOR_LENGTH = 1
+MAX_REASONABLE_TEXT_LENGTH = 10000
+
+SEVERITIES = {
+    "INVALID_JSON": "critical",
+    "MISSING_REQUIRED_FIELD": "critical",
+    "INVALID_FIELD_TYPE": "critical",
+    "TURN_LIMIT_EXCEEDED": "critical",
+    "TOO_FEW_TURNS": "critical",
+    "UNEXPECTED_FIELD": "error",
+    "INVALID_SPEAKER": "error",
+    "INDEX_SEQUENCE_ERROR": "error",
+    "EMPTY_TEXT": "error",
+    "CHARACTER_POSITION_MISMATCH": "error",
+    "CHARACTER_POSITION_OVERLAP": "error",
+    "CHARACTER_POSITION_GAP": "error",
+    "UNUSUAL_TEXT_LENGTH": "warning",
+    "SPEAKER_TRANSITION_UNUSUAL": "warning"
+}
+
+
+@dataclass
+class ValidatorSettings:
+    """Prüfparameter aus spec.validator.yaml"""
+    allowed_speakers: List[str] = field(default_factory=lambda: ["user", "agent", "system"])
+    min_turns: int = 1
+    max_turns: int = 5000
+    collect_all_errors: bool = True
+    max_errors_per_category: Optional[int] = 100
+    allow_additional_fields: bool = False
+
+    @classmethod
+    def from_spec(cls, spec_path: Path = SPEC_PATH) -> "ValidatorSettings":
+        """Liest die Parameter aus der Spezifikation; fehlende Werte bleiben Standard"""
+        settings = cls()
+        try:
+            with open(spec_path, 'r', encoding='utf-8') as f:
+                spec = (yaml.safe_load(f) or {}).get("specification") or {}
+        except (OSError, yaml.YAMLError):
+            return settings
+
+        rules = spec.get("validation_rules") or {}
+        speakers = (rules.get("speaker_validation") or {}).get("valid_speaker_values")
+        if speakers:
+            settings.allowed_speakers = list(speakers)
+        constraints = (spec.get("input_requirements") or {}).get("file_constraints") or {}
+        settings.min_turns = constraints.get("min_turns", settings.min_turns)
+        settings.max_turns = constraints.get("max_turns", settings.max_turns)
+        error_handling = (spec.get("processing_workflow") or {}).get("error_handling") or {}
+        settings.collect_all_errors = error_handling.get("collect_all_errors",
+                                                         settings.collect_all_errors)
+        settings.max_errors_per_category = error_handling.get("max_errors_per_category",
+                                                              settings.max_errors_per_category)
+        strictness = (spec.get("configuration") or {}).get("validation_strictness") or {}
+        settings.allow_additional_fields = strictness.get("allow_additional_fields",
+                                                          settings.allow_additional_fields)
+        return settings
+
+
+def validation_path_for(transcript_path: Path, output_dir: Path) -> Path:
+    """Ausgabepfad nach naming_pattern {input_filename}.validation.json"""
+    name = transcript_path.name
+    if name.endswith(".transcript.json"):
+        name = name[:-len(".transcript.json")]
+    return output_dir / f"{name}.validation.json"
+
+
+class _Findings:
+    """Sammelt Fehler und Warnungen mit Limit je Kategorie"""
+
+    def __init__(self, settings: ValidatorSettings):
+        self.settings = settings
+        self.errors: List[Dict[str, Any]] = []
+        self.warnings: List[Dict[str, Any]] = []
+        self.counts: Dict[str, int] = {}
+        self.suppressed: Dict[str, int] = {}
+
+    @property
+    def stopped(self) -> bool:
+        """Ohne collect_all_errors endet die Prüfung nach dem ersten Fehler"""
+        return not self.settings.collect_all_errors and bool(self.errors)
+
+    def add(self, code: str, message: str, turn_index: Optional[int] = None,
+            field_name: Optional[str] = None, context: Optional[Dict[str, Any]] = None):
+        """Fügt einen Befund hinzu"""
+        if self.stopped:
+            return
+        count = self.counts.get(code, 0) + 1
+        self.counts[code] = count
+        limit = self.settings.max_errors_per_category
+        if limit and count > limit:
+            self.suppressed[code] = self.suppressed.get(code, 0) + 1
+            return
+
+        severity = SEVERITIES[code]
+        finding = {"code": code, "message": message, "severity": severity,
+                   "turn_index": turn_index, "field": field_name, "context": context}
+        (self.warnings if severity == "warning" else self.errors).append(finding)
+
+    def add_rows(self, code: str, rows: np.ndarray, message: str, field_name: Optional[str],
+                 context: Dict[str, np.ndarray]):
+        """Meldet alle Turns einer Maske; nur Einträge bis zum Limit werden aufgebaut"""
+        limit = self.settings.max_errors_per_category
+        shown = len(rows) if not limit else max(0, limit - self.counts.get(code, 0))
+        for i, position in enumerate(rows[:shown]):
+            self.add(code, message, int(position), field_name,
+                     {name: int(values[i]) for name, values in context.items()})
+            if self.stopped:
+                return
+        hidden = len(rows) - min(shown, len(rows))
+        if hidden > 0:
+            self.counts[code] = self.counts.get(code, 0) + hidden
+            self.suppressed[code] = self.suppressed.get(code, 0) + hidden
+
+
+class TranscriptValidator:
+    """Validiert Transkripte nach spec.validator.yaml.
+
+    Turns werden einmal durchlaufen und in Spalten (Speaker-Code, Index,
+    Start, Ende, Textlänge) abgelegt; Sequenz- und Positionsregeln werden
+    anschließend als Vektoroperationen über alle Turns ausgewertet.
+    """
+
+    def __init__(self, settings: Optional[ValidatorSettings] = None):
+        self.settings = settings or ValidatorSettings()
+        self.speaker_codes = {speaker: code
+                              for code, speaker in enumerate(self.settings.allowed_speakers)}
+
+    def _load_columns(self, turns: Iterable[Any], findings: _Findings) -> Dict[str, np.ndarray]:
+        """Strukturprüfung je Turn und Aufbau der Spalten vollständiger Turns"""
+        rows, speakers, indices, starts, ends, lengths = [], [], [], [], [], []
+        turn_count = 0
+
+        for position, turn in enumerate(turns):
+            turn_count += 1
+            if position == self.settings.max_turns:
+                findings.add("TURN_LIMIT_EXCEEDED",
+                             f"Transcript has more than {self.settings.max_turns} turns", position)
+            if not isinstance(turn, Mapping):
+                findings.add("INVALID_FIELD_TYPE", "Turn is not an object", position)
+                continue
+
+            complete = True
+            for name, expected in REQUIRED_FIELDS.items():
+                if name not in turn:
+                    findings.add("MISSING_REQUIRED_FIELD", f"Turn is missing '{name}'",
+                                 position, name)
+                    complete = False
+                    continue
+                value = turn[name]
+                if not isinstance(value, expected) or isinstance(value, bool):
+                    findings.add("INVALID_FIELD_TYPE",
+                                 f"'{name}' must be {expected.__name__}, "
+                                 f"found {type(value).__name__}", position, name)
+                    complete = False
+
+            if not self.settings.allow_additional_fields:
+                for name in turn:
+                    if name not in REQUIRED_FIELDS:
+                        findings.add("UNEXPECTED_FIELD", f"Unexpected field '{name}'",
+                                     position, name)
+
+            if complete:
+                rows.append(position)
+                speakers.append(self.speaker_codes.get(turn["speaker"], -1))
+                indices.append(turn["index"])
+                starts.append(turn["char_pos_start"])
+                ends.append(turn["char_pos_end"])
+                lengths.append(len(turn["text"]))
+
+        return {
+            "turn_count": turn_count,
+            "row": np.asarray(rows, dtype=np.int64),
+            "speaker": np.asarray(speakers, dtype=np.int8),
+            "index": np.asarray(indices, dtype=np.int64),
+            "start": np.asarray(starts, dtype=np.int64),
+            "end": np.asarray(ends, dtype=np.int64),
+            "length": np.asarray(lengths, dtype=np.int64)
+        }
+
+    def _check_columns(self, columns: Dict[str, np.ndarray], findings: _Findings):
+        """Wertet Speaker-, Index-, Text- und Positionsregeln vektorisiert aus"""
+        row, speaker, index = columns["row"], columns["speaker"], columns["index"]
+        start, end, length = columns["start"], columns["end"], columns["length"]
+        if not len(row):
+            return
+
+        def report(code, mask, message, field_name, **context):
+            findings.add_rows(code, row[mask], message, field_name,
+                              {name: values[mask] for name, values in context.items()})
+
+        # speaker_validation
+        report("INVALID_SPEAKER", speaker < 0, "Speaker value not in allowed list", "speaker")
+
+        # index_validation: je Speaker 0, 1, 2, ... in Dateireihenfolge
+        sequence_error = np.zeros(len(row), dtype=bool)
+        for code in range(len(self.settings.allowed_speakers)):
+            positions = np.flatnonzero(speaker == code)
+            if not len(positions):
+                continue
+            speaker_index = index[positions]
+            previous = np.concatenate(([-1], speaker_index[:-1]))
+            sequence_error[positions[speaker_index - previous != 1]] = True
+        report("INDEX_SEQUENCE_ERROR", sequence_error,
+               "Index sequence broken or duplicated for speaker", "index", index=index)
+
+        # text_validation
+        report("EMPTY_TEXT", length == 0, "Text is empty", "text")
+
+        # character_position_validation: Bereich passt zu Text und ist nicht negativ
+        mismatch = (start < 0) | (end <= start) | (end - start != length)
+        report("CHARACTER_POSITION_MISMATCH", mismatch,
+               "Character range does not match text length", "char_pos_end",
+               char_pos_start=start, char_pos_end=end, text_length=length)
+
+        previous_end = np.concatenate(([-SEPARATOR_LENGTH], end[:-1]))
+        report("CHARACTER_POSITION_OVERLAP", start < previous_end,
+               "Character positions overlap previous turn", "char_pos_start",
+               char_pos_start=start, previous_end=previous_end)
+        report("CHARACTER_POSITION_GAP", start > previous_end + SEPARATOR_LENGTH,
+               "Gap in character position coverage", "char_pos_start",
+               char_pos_start=start, previous_end=previous_end)
+
+        # Warnungen
+        report("UNUSUAL_TEXT_LENGTH", length > MAX_REASONABLE_TEXT_LENGTH,
+               "Text unusually long", "text", text_length=length)
+        system_code = self.speaker_codes.get("system", -2)
+        repeated = np.concatenate(([False], speaker[1:] == speaker[:-1]))
+        report("SPEAKER_TRANSITION_UNUSUAL", repeated & (speaker >= 0) & (speaker != system_code),
+               "Consecutive turns from the same speaker", "speaker")
+
+    def _check_turn_count(self, columns: Dict[str, np.ndarray], findings: _Findings):
+        """file_constraints.min_turns; ein leeres Transkript ist nie gültig"""
+        if columns["turn_count"] < self.settings.min_turns:
+            findings.add("TOO_FEW_TURNS",
+                         f"Transcript has {columns['turn_count']} turns, "
+                         f"at least {self.settings.min_turns} required")
+
+    def validate_turns(self, turns: Iterable[Any], file_name: str = "") -> Dict[str, Any]:
+        """Prüft eine Folge von Turns und liefert den Bericht nach output_requirements"""
+        findings = _Findings(self.settings)
+        columns = self._load_columns(turns, findings)
+        self._check_turn_count(columns, findings)
+        if not findings.stopped:
+            self._check_columns(columns, findings)
+        return self._compile_report(file_name, columns, findings)
+
+    def validate_file(self, transcript_path: Path) -> Dict[str, Any]:
+        """Prüft eine *.transcript.json; die Datei wird streamend gelesen"""
+        findings = _Findings(self.settings)
+        try:
+            columns = self._load_columns(iter_json_array(transcript_path), findings)
+        except (JsonStreamError, UnicodeDecodeError, OSError) as e:
+            findings.add("INVALID_JSON", str(e))
+            columns = self._load_columns([], findings)
+        else:
+            self._check_turn_count(columns, findings)
+            if not findings.stopped:
+                self._check_columns(columns, findings)
+        return self._compile_report(str(transcript_path), columns, findings)
+
+    def _compile_report(self, file_name: str, columns: Dict[str, np.ndarray],
+                        findings: _Findings) -> Dict[str, Any]:
+        """Fasst Befunde und Statistik zusammen"""
+        speaker_counts = np.bincount(columns["speaker"][columns["speaker"] >= 0],
+                                     minlength=len(self.settings.allowed_speakers))
+        total_errors = sum(count for code, count in findings.counts.items()
+                           if SEVERITIES[code] != "warning")
+        if total_errors:
+            status = "invalid"
+        elif findings.warnings or findings.suppressed:
+            status = "warning"
+        else:
+            status = "valid"
+
+        return {
+            "status": status,
+            "file": file_name,
+            "validated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "turn_count": columns["turn_count"],
+            "errors": findings.errors,
+            "warnings": findings.warnings,
+            "statistics": {
+                "turns_by_speaker": {speaker: int(speaker_counts[code])
+                                     for speaker, code in self.speaker_codes.items()},
+                "total_characters": int(columns["end"].max()) if len(columns["end"]) else 0,
+                "findings_by_code": dict(sorted(findings.counts.items())),
+                "suppressed_by_code": dict(sorted(findings.suppressed.items()))
+            }
+        }
+
+
+def write_report(report: Dict[str, Any], output_path: Path):
+    """Schreibt den Bericht atomar"""
+    with atomic_output(output_path) as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RooCode Transcript Validator")
+    parser.add_argument("transcripts", nargs="+", help="Transkripte (*.transcript.json)")
+    parser.add_argument("--output-dir", default="data/validation", help="Zielverzeichnis")
+    args = parser.parse_args()
+
+    validator = TranscriptValidator(ValidatorSettings.from_spec())
+    output_dir = Path(args.output_dir)
+    all_valid = True
+
+    for name in args.transcripts:
+        transcript_path = Path(name)
+        report = validator.validate_file(transcript_path)
+        output_path = validation_path_for(transcript_path, output_dir)
+        write_report(report, output_path)
+        print(json.dumps({"file": str(transcript_path), "status": report["status"],
+                          "report": str(output_path)}))
+        all_valid = all_valid and report["status"] != "invalid"
+
+    sys.exit(0 if all_valid else 1)
+
+
+if __name__ == "__main__":
+    main()
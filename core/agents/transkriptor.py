@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+RooCode Transkriptor Engine
+Wandelt *.chat.json-Exporte streamend in *.transcript.json um (spec.transkriptor.yaml)
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import deque
+from itertools import islice
+from concurrent.futures import Executor, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import yaml
+
+# Projekt-Root für Paketimporte verfügbar machen (Aufruf als Skript aus core/agents)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.ci.json_stream import JsonArrayWriter, JsonStreamError, JsonStreamReader
+from core.common.atomic_file import atomic_output
+
+SPEC_PATH = PROJECT_ROOT / "core" / "modes" / "spec.transkriptor.yaml"
+MODE_PATH = PROJECT_ROOT / "core" / "modes" / "mode.transkriptor.yaml"
+
+# processing_rules.speaker_detection.mapping
+ROLE_SPEAKER_MAP = {"user": "user", "assistant": "agent", "system": "system"}
+CHAT_REQUIRED_FIELDS = ["messages", "conversation_id"]
+INPUT_SUFFIXES = [".chat.json", ".gpt-export.json"]
+# Fehler, die bei erneutem Versuch anders ausgehen können; Eingabefehler sind deterministisch
+RETRYABLE_CODES = {"PROCESSING_TIMEOUT", "OUTPUT_GENERATION_FAILED"}
+DEADLINE_CHECK_INTERVAL = 256
+DEFAULT_SHARD_MESSAGES = 1000
+
+
+class TranscriptError(ValueError):
+    """Verarbeitungsfehler mit Fehlercode aus spec.transkriptor.yaml (error_handling)"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+
+    def __reduce__(self):
+        # Übergabe aus Worker-Prozessen mit Fehlercode
+        return (TranscriptError, (self.code, self.message))
+
+
+@dataclass
+class TranscriptLimits:
+    """Eingabegrenzen aus input_requirements der Spezifikation"""
+    max_size_mb: int = 50
+    max_messages: int = 10000
+    max_content_length: int = 10000
+
+    @classmethod
+    def from_spec(cls, spec_path: Path = SPEC_PATH) -> "TranscriptLimits":
+        """Liest die Grenzen aus spec.transkriptor.yaml; fehlende Werte bleiben Standard"""
+        limits = cls()
+        try:
+            with open(spec_path, 'r', encoding='utf-8') as f:
+                spec = (yaml.safe_load(f) or {}).get("specification") or {}
+        except (OSError, yaml.YAMLError):
+            return limits
+
+        requirements = spec.get("input_requirements") or {}
+        constraints = requirements.get("file_constraints") or {}
+        content = (requirements.get("content_validation") or {}).get("content_constraints") or {}
+        limits.max_size_mb = constraints.get("max_size_mb", limits.max_size_mb)
+        limits.max_messages = constraints.get("max_messages", limits.max_messages)
+        limits.max_content_length = content.get("max_length", limits.max_content_length)
+        return limits
+
+
+@dataclass
+class BatchSettings:
+    """Ausführungsparameter für Stapelläufe (execution in mode.transkriptor.yaml)"""
+    jobs: int = 1
+    timeout_seconds: float = 300
+    retry_attempts: int = 2
+    # Exporte ab dieser Größe werden in Nachrichtenbereiche aufgeteilt
+    shard_threshold_mb: float = 10
+    shard_messages: int = DEFAULT_SHARD_MESSAGES
+
+    @classmethod
+    def from_config(cls, mode_path: Path = MODE_PATH,
+                    spec_path: Path = SPEC_PATH) -> "BatchSettings":
+        """Liest Timeout, Wiederholungen und Parallelität aus Mode und Spezifikation"""
+        settings = cls()
+        try:
+            with open(mode_path, 'r', encoding='utf-8') as f:
+                execution = (yaml.safe_load(f) or {}).get("execution") or {}
+            with open(spec_path, 'r', encoding='utf-8') as f:
+                spec = (yaml.safe_load(f) or {}).get("specification") or {}
+        except (OSError, yaml.YAMLError):
+            return settings
+
+        settings.timeout_seconds = execution.get("timeout_seconds", settings.timeout_seconds)
+        settings.retry_attempts = execution.get("retry_attempts", settings.retry_attempts)
+        performance = spec.get("performance_requirements") or {}
+        memory_usage = performance.get("memory_usage") or {}
+        settings.shard_threshold_mb = memory_usage.get("streaming_threshold_mb",
+                                                       settings.shard_threshold_mb)
+        if execution.get("parallel_processing"):
+            throughput = performance.get("throughput") or {}
+            max_files = throughput.get("max_concurrent_files") or os.cpu_count() or 1
+            settings.jobs = max(1, min(max_files, os.cpu_count() or 1))
+        return settings
+
+
+def transcript_path_for(input_path: Path, output_dir: Path) -> Path:
+    """Ausgabepfad nach naming_pattern {input_filename}.transcript.json"""
+    name = input_path.name
+    for suffix in INPUT_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    else:
+        name = input_path.stem
+    return output_dir / f"{name}.transcript.json"
+
+
+def iter_chat_messages(input_path: Path) -> Iterator[Any]:
+    """Streamt die Nachrichten eines Chat-Exports; Pflichtfelder werden am Ende geprüft"""
+    seen = set()
+    with open(input_path, 'r', encoding='utf-8') as f:
+        reader = JsonStreamReader(f)
+        for key, value in reader.iter_object(stream_keys=("messages",)):
+            seen.add(key)
+            if key == "messages":
+                if not hasattr(value, "__next__"):
+                    raise TranscriptError("INVALID_FILE_FORMAT",
+                                          f"'messages' in {input_path} is not an array")
+                yield from value
+        reader.expect_end()
+
+    missing = [field for field in CHAT_REQUIRED_FIELDS if field not in seen]
+    if missing:
+        raise TranscriptError("MISSING_REQUIRED_FIELDS",
+                              f"{input_path} is missing {', '.join(missing)}")
+
+
+def iter_turns(messages: Iterable[Any], limits: Optional[TranscriptLimits] = None,
+               position: int = 0, speaker_counts: Optional[Dict[str, int]] = None,
+               first_message: int = 0,
+               deadline: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """Erzeugt Turns mit laufenden Zeichenpositionen und Indizes je Speaker.
+
+    Der Gesamttext (Nachrichten, getrennt durch ein Zeichen) wird nie aufgebaut;
+    es genügt die Länge jeder Nachricht. ``position`` und ``speaker_counts``
+    erlauben den Start mitten in einer Konversation. Nach ``deadline``
+    (time.monotonic) bricht die Verarbeitung mit PROCESSING_TIMEOUT ab.
+    """
+    limits = limits or TranscriptLimits()
+    speaker_counts = speaker_counts if speaker_counts is not None else {}
+
+    for number, message in enumerate(messages, first_message):
+        if (deadline is not None and number % DEADLINE_CHECK_INTERVAL == 0
+                and time.monotonic() > deadline):
+            raise TranscriptError("PROCESSING_TIMEOUT", f"Timed out at message {number}")
+        if number >= limits.max_messages:
+            raise TranscriptError("CONTENT_TOO_LARGE",
+                                  f"More than {limits.max_messages} messages")
+        if not isinstance(message, dict) or "role" not in message or "content" not in message:
+            raise TranscriptError("MISSING_REQUIRED_FIELDS",
+                                  f"Message {number} requires 'role' and 'content'")
+
+        speaker = ROLE_SPEAKER_MAP.get(message["role"])
+        if speaker is None:
+            raise TranscriptError("SPEAKER_DETECTION_FAILED",
+                                  f"Message {number} has unknown role {message['role']!r}")
+
+        text = message["content"]
+        if not isinstance(text, str) or not text:
+            raise TranscriptError("INVALID_FILE_FORMAT",
+                                  f"Message {number} has empty or non-string content")
+        if len(text) > limits.max_content_length:
+            raise TranscriptError("CONTENT_TOO_LARGE",
+                                  f"Message {number} exceeds {limits.max_content_length} characters")
+
+        index = speaker_counts.get(speaker, 0)
+        speaker_counts[speaker] = index + 1
+        end = position + len(text)
+        yield {
+            "speaker": speaker,
+            "index": index,
+            "text": text,
+            "char_pos_start": position,
+            "char_pos_end": end
+        }
+        position = end + 1
+
+
+def _transcribe_shard(messages: List[Any], position: int, speaker_counts: Dict[str, int],
+                      first_message: int, limits: TranscriptLimits,
+                      deadline: Optional[float]) -> Tuple[str, int]:
+    """Erzeugt den kodierten Ausgabeabschnitt eines Nachrichtenbereichs (Worker-Prozess)"""
+    encoder = JsonArrayWriter(None, indent=2, ensure_ascii=False)
+    turns = [encoder.encode(turn) for turn in iter_turns(messages, limits, position,
+                                                         speaker_counts, first_message,
+                                                         deadline)]
+    return encoder.separator.join(turns), len(turns)
+
+
+def iter_shards(messages: Iterable[Any], shard_messages: int,
+                speaker_counts: Optional[Dict[str, int]] = None
+                ) -> Iterator[Tuple[List[Any], int, Dict[str, int], int]]:
+    """Teilt Nachrichten in Bereiche und berechnet deren Startwerte als Präfixsumme.
+
+    Für jeden Bereich werden Startposition und Speaker-Zähler aus den Längen
+    und Rollen aller vorherigen Nachrichten geliefert, sodass die Bereiche
+    unabhängig voneinander die endgültigen ``char_pos_*``- und ``index``-Werte
+    erzeugen. Ungültige Nachrichten meldet erst der Worker des Bereichs.
+    ``speaker_counts`` enthält danach die Zähler über alle Nachrichten.
+    """
+    speaker_counts = speaker_counts if speaker_counts is not None else {}
+    position = 0
+    first_message = 0
+    messages = iter(messages)
+
+    while True:
+        shard = list(islice(messages, shard_messages))
+        if not shard:
+            return
+        yield shard, position, dict(speaker_counts), first_message
+
+        for message in shard:
+            if not isinstance(message, dict):
+                continue
+            speaker = ROLE_SPEAKER_MAP.get(message.get("role"))
+            if speaker is not None:
+                speaker_counts[speaker] = speaker_counts.get(speaker, 0) + 1
+            content = message.get("content")
+            position += (len(content) if isinstance(content, str) else 0) + 1
+        first_message += len(shard)
+
+
+def _write_sharded(input_path: Path, writer: JsonArrayWriter, pool: Executor,
+                   shard_messages: int, limits: TranscriptLimits,
+                   deadline: Optional[float]) -> Dict[str, int]:
+    """Verteilt Nachrichtenbereiche auf den Pool und schreibt die Abschnitte in Reihenfolge"""
+    # Begrenzt die gleichzeitig im Speicher gehaltenen Bereiche
+    max_pending = 2 * (os.cpu_count() or 1)
+    pending = deque()
+    speaker_counts: Dict[str, int] = {}
+
+    def write_next():
+        # Die Frist gilt auch für das Warten: ein hängender Bereich bricht die Datei ab
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            text, count = pending.popleft().result(timeout=timeout)
+        except FutureTimeout:
+            raise TranscriptError("PROCESSING_TIMEOUT",
+                                  f"Timed out waiting for messages of {input_path}") from None
+        writer.write_encoded(text, count)
+
+    try:
+        for shard, position, counts, first_message in iter_shards(
+                iter_chat_messages(input_path), shard_messages, speaker_counts):
+            if deadline is not None and time.monotonic() > deadline:
+                raise TranscriptError("PROCESSING_TIMEOUT",
+                                      f"Timed out at message {first_message}")
+            pending.append(pool.submit(_transcribe_shard, shard, position, counts,
+                                       first_message, limits, deadline))
+            if len(pending) >= max_pending:
+                write_next()
+
+        while pending:
+            write_next()
+    finally:
+        # Nach einem Fehler belegen noch wartende Bereiche den Pool nicht weiter
+        for future in pending:
+            future.cancel()
+    return speaker_counts
+
+
+def transcribe_file(input_path: Path, output_path: Path,
+                    limits: Optional[TranscriptLimits] = None,
+                    timeout_seconds: Optional[float] = None,
+                    pool: Optional[Executor] = None,
+                    shard_messages: int = DEFAULT_SHARD_MESSAGES) -> Dict[str, Any]:
+    """Schreibt das Transkript eines Chat-Exports und liefert Kennzahlen.
+
+    Nachrichten werden einzeln gelesen und Turns einzeln geschrieben; die
+    Ausgabe ersetzt das Ziel erst nach vollständiger Verarbeitung. Mit
+    ``pool`` werden Bereiche von ``shard_messages`` Nachrichten parallel
+    verarbeitet; das Ergebnis ist identisch mit dem seriellen Lauf.
+    """
+    deadline = time.monotonic() + timeout_seconds if timeout_seconds else None
+    input_path, output_path = Path(input_path), Path(output_path)
+    limits = limits or TranscriptLimits()
+
+    size = input_path.stat().st_size
+    if size > limits.max_size_mb * 1024 * 1024:
+        raise TranscriptError("CONTENT_TOO_LARGE",
+                              f"{input_path} exceeds {limits.max_size_mb} MB")
+
+    speaker_counts: Dict[str, int] = {}
+    try:
+        with atomic_output(output_path) as f:
+            writer = JsonArrayWriter(f, indent=2, ensure_ascii=False)
+            if pool is not None:
+                speaker_counts = _write_sharded(input_path, writer, pool, shard_messages,
+                                                limits, deadline)
+            else:
+                for turn in iter_turns(iter_chat_messages(input_path), limits,
+                                       speaker_counts=speaker_counts, deadline=deadline):
+                    writer.write(turn)
+            writer.close()
+    except JsonStreamError as e:
+        raise TranscriptError("INVALID_FILE_FORMAT", f"{input_path}: {e}") from None
+    except UnicodeDecodeError as e:
+        raise TranscriptError("ENCODING_ERROR", f"{input_path}: {e}") from None
+    except OSError as e:
+        raise TranscriptError("OUTPUT_GENERATION_FAILED", f"{input_path}: {e}") from None
+
+    return {
+        "input_file": str(input_path),
+        "output_file": str(output_path),
+        "turns": sum(speaker_counts.values()),
+        "speakers": speaker_counts,
+        "input_bytes": size
+    }
+
+
+def find_inputs(input_dir: Path) -> List[Path]:
+    """Sammelt die Chat-Exporte eines Eingabeordners in stabiler Reihenfolge"""
+    return sorted(path for path in Path(input_dir).iterdir()
+                  if path.is_file() and path.name.endswith(".chat.json"))
+
+
+def transcribe_with_retries(input_path: Path, output_path: Path,
+                            limits: Optional[TranscriptLimits] = None,
+                            timeout_seconds: Optional[float] = None,
+                            retry_attempts: int = 0, pool: Optional[Executor] = None,
+                            shard_messages: int = DEFAULT_SHARD_MESSAGES) -> Dict[str, Any]:
+    """Verarbeitet eine Datei mit Wiederholungen; Fehler werden als Ergebnis geliefert"""
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            result = transcribe_file(input_path, output_path, limits, timeout_seconds,
+                                     pool, shard_messages)
+            result.update({"status": "success", "attempts": attempts})
+            return result
+        except TranscriptError as e:
+            if e.code in RETRYABLE_CODES and attempts <= retry_attempts:
+                continue
+            return {"input_file": str(input_path), "output_file": str(output_path),
+                    "status": "failed", "attempts": attempts,
+                    "error_code": e.code, "error": str(e)}
+
+
+def _transcribe_task(task) -> Dict[str, Any]:
+    """Einstiegspunkt der Worker-Prozesse"""
+    return transcribe_with_retries(*task)
+
+
+def transcribe_batch(inputs: List[Path], output_dir: Path,
+                     settings: Optional[BatchSettings] = None,
+                     limits: Optional[TranscriptLimits] = None) -> List[Dict[str, Any]]:
+    """Transkribiert mehrere Exporte, bei ``settings.jobs > 1`` in einem Prozesspool.
+
+    Jede Datei wird unabhängig und atomar geschrieben; Inhalt und Reihenfolge
+    der Ergebnisse sind daher unabhängig von der Anzahl der Prozesse. Exporte
+    ab ``shard_threshold_mb`` werden zuerst, nacheinander und in Bereiche
+    aufgeteilt über alle Prozesse verarbeitet; kleine Exporte werden erst danach
+    eingereiht, damit die Bereiche nicht hinter ihnen warten, während die Frist
+    der großen Datei schon läuft.
+    """
+    settings = settings or BatchSettings()
+    limits = limits or TranscriptLimits()
+    output_dir = Path(output_dir)
+
+    tasks = [(Path(input_path), transcript_path_for(Path(input_path), output_dir), limits,
+              settings.timeout_seconds, settings.retry_attempts) for input_path in inputs]
+    output_paths = [task[1] for task in tasks]
+    if len(set(output_paths)) != len(output_paths):
+        raise TranscriptError("OUTPUT_GENERATION_FAILED",
+                              "Several inputs map to the same transcript file")
+
+    if settings.jobs <= 1 or len(tasks) <= 1:
+        return [_transcribe_task(task) for task in tasks]
+
+    threshold = settings.shard_threshold_mb * 1024 * 1024
+    large = {i for i, task in enumerate(tasks)
+             if task[0].is_file() and task[0].stat().st_size >= threshold}
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+    pool = ProcessPoolExecutor(max_workers=settings.jobs)
+    timed_out = False
+    try:
+        for i in sorted(large):
+            results[i] = transcribe_with_retries(*tasks[i], pool=pool,
+                                                 shard_messages=settings.shard_messages)
+        small = [i for i in range(len(tasks)) if i not in large]
+        futures = [(i, pool.submit(_transcribe_task, tasks[i])) for i in small]
+        deadline = _batch_deadline(len(small), settings)
+        for i, future in futures:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                results[i] = future.result(timeout=timeout)
+            except FutureTimeout:
+                # Ein hängender Worker darf den Stapel nicht blockieren
+                timed_out = True
+                future.cancel()
+                results[i] = {"input_file": str(tasks[i][0]), "output_file": str(tasks[i][1]),
+                              "status": "failed", "attempts": settings.retry_attempts + 1,
+                              "error_code": "PROCESSING_TIMEOUT",
+                              "error": f"Timed out waiting for worker result of {tasks[i][0]}"}
+    finally:
+        pool.shutdown(wait=not timed_out, cancel_futures=timed_out)
+    return results
+
+
+def _batch_deadline(file_count: int, settings: BatchSettings) -> Optional[float]:
+    """Spätester Zeitpunkt (time.monotonic) für die Ergebnisse der kleinen Exporte.
+
+    Jeder Versuch einer Datei hat ``timeout_seconds``; die Dateien laufen in
+    Runden zu ``jobs`` Prozessen.
+    """
+    if not settings.timeout_seconds or not file_count:
+        return None
+    rounds = -(-file_count // settings.jobs)
+    per_file = settings.timeout_seconds * (settings.retry_attempts + 1)
+    return time.monotonic() + rounds * per_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RooCode Transkriptor")
+    parser.add_argument("inputs", nargs="*", help="Chat-Exporte (*.chat.json)")
+    parser.add_argument("--batch", metavar="DIR",
+                        help="Alle *.chat.json eines Ordners verarbeiten (z.B. data/input)")
+    parser.add_argument("--output-dir", default="data/output", help="Zielverzeichnis")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Anzahl paralleler Prozesse (Standard aus mode.transkriptor.yaml)")
+    parser.add_argument("--shard-messages", type=int, default=None, metavar="N",
+                        help="Nachrichten je Bereich bei großen Exporten")
+    args = parser.parse_args()
+
+    settings = BatchSettings.from_config()
+    if args.jobs is not None:
+        settings.jobs = args.jobs
+    if args.shard_messages is not None:
+        settings.shard_messages = args.shard_messages
+
+    inputs = [Path(name) for name in args.inputs]
+    if args.batch:
+        inputs += find_inputs(Path(args.batch))
+    if not inputs:
+        parser.error("No input files given")
+
+    try:
+        results = transcribe_batch(inputs, Path(args.output_dir), settings,
+                                   TranscriptLimits.from_spec())
+    except TranscriptError as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+    for result in results:
+        print(json.dumps(result), file=sys.stdout if result["status"] == "success" else sys.stderr)
+
+    sys.exit(0 if all(result["status"] == "success" for result in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
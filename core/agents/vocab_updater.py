@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+RooCode Vocab Updater
+Übernimmt freigegebene Intent-Vorschläge stapelweise in vocab.yaml und vocab.history.yaml
+"""
+
+import os
+import sys
+import json
+import heapq
+import shutil
+import sqlite3
+import argparse
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+# Projekt-Root für Paketimporte verfügbar machen (Aufruf als Skript aus core/agents)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.agents.suggestion_inbox import SuggestionInbox, is_approved, load_suggestions
+from core.common.atomic_file import atomic_output
+from core.vocab.vocab_store import (INTENT_ID_PATTERN, TIMESTAMP_FORMAT, VOCAB_PATH,
+                                    VocabSnapshot, VocabStore, VocabStoreError, file_digest,
+                                    iso_timestamp)
+
+MODE_PATH = PROJECT_ROOT / "core" / "modes" / "vocab-updater" / "mode.vocab-updater.yaml"
+HISTORY_PATH = PROJECT_ROOT / "core" / "vocab" / "vocab.history.yaml"
+BACKUP_DIR = PROJECT_ROOT / "core" / "vocab" / "backups"
+SUGGESTIONS_DIR = PROJECT_ROOT / "intent-scout" / "suggestions"
+# Letzte Bytes der History, in denen der abschließende Kommentarblock gesucht wird
+TAIL_WINDOW = 64 * 1024
+
+
+class UpdateError(ValueError):
+    """Abbruch eines Stapels mit Fehlercode; vocab.yaml und History bleiben unverändert"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+
+    def __reduce__(self):
+        return (UpdateError, (self.code, self.message))
+
+
+@dataclass
+class UpdaterSettings:
+    """Ziele und Regeln aus mode.vocab-updater.yaml"""
+    vocab_path: Path = VOCAB_PATH
+    history_path: Path = HISTORY_PATH
+    backup_enabled: bool = True
+    backup_dir: Path = BACKUP_DIR
+    added_by: str = "vocab-updater"
+
+    @classmethod
+    def from_config(cls, mode_path: Path = MODE_PATH) -> "UpdaterSettings":
+        settings = cls()
+        try:
+            with open(mode_path, 'r', encoding='utf-8') as f:
+                mode = yaml.safe_load(f) or {}
+        except (OSError, yaml.YAMLError):
+            return settings
+
+        target = mode.get("output_target") or {}
+        if target.get("primary"):
+            settings.vocab_path = PROJECT_ROOT / target["primary"]
+        if target.get("history"):
+            settings.history_path = PROJECT_ROOT / target["history"]
+        settings.backup_enabled = target.get("backup_enabled", settings.backup_enabled)
+        settings.added_by = mode.get("agent", settings.added_by)
+        return settings
+
+
+def select_entries(files: Iterable[Path], snapshot: VocabSnapshot,
+                   settings: UpdaterSettings, added_on: str
+                   ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, str]]]:
+    """Neue Vokabular- und History-Einträge aus freigegebenen Vorschlägen.
+
+    Eindeutigkeit wird per Binärsuche im Snapshot und einer Menge für den
+    laufenden Stapel geprüft; übersprungene Vorschläge werden mit Grund gemeldet.
+    """
+    entries, history, skipped = [], [], []
+    batch_ids = set()
+    for path in files:
+        try:
+            suggestions = load_suggestions(path)
+        except (OSError, yaml.YAMLError) as e:
+            skipped.append({"file": str(path), "reason": f"invalid_format: {e}"})
+            continue
+        for suggestion in suggestions:
+            intent_id = suggestion.get("suggested_id")
+            reason = None
+            if not is_approved(suggestion):
+                reason = "not_approved"
+            elif not isinstance(intent_id, str) or not INTENT_ID_PATTERN.match(intent_id):
+                reason = "invalid_id"
+            elif not suggestion.get("label") or not suggestion.get("explanation"):
+                reason = "missing_fields"
+            elif intent_id in snapshot or intent_id in batch_ids:
+                reason = "duplicate"
+            if reason:
+                skipped.append({"file": str(path), "suggested_id": str(intent_id),
+                                "reason": reason})
+                continue
+
+            batch_ids.add(intent_id)
+            created_on = (suggestion.get("metadata") or {}).get("created_on") or added_on
+            origin = path.relative_to(PROJECT_ROOT).as_posix() \
+                if path.resolve().is_relative_to(PROJECT_ROOT) else path.name
+            entries.append({"id": intent_id, "label": suggestion["label"],
+                            "description": suggestion["explanation"],
+                            "created_on": str(iso_timestamp(created_on)), "origin": origin,
+                            "added_on": added_on, "added_by": settings.added_by})
+            history.append({"id": intent_id, "label": suggestion["label"],
+                            "created_on": added_on, "added_by": settings.added_by,
+                            "origin": origin, "comment": f"Approved suggestion from "
+                                                         f"{suggestion.get('source_turn', 'unknown')}"})
+    return entries, history, skipped
+
+
+def _scalar(value: Any) -> str:
+    """YAML-Skalar; JSON-Strings sind gültige doppelt quotierte YAML-Strings"""
+    return json.dumps(value, ensure_ascii=False)
+
+
+def render_entries(records: Iterable[Dict[str, Any]]) -> str:
+    """Listeneinträge im Stil der Vokabulardateien (zwei Leerzeichen, Leerzeile dazwischen)"""
+    blocks = []
+    for record in records:
+        lines = [f"{'  - ' if i == 0 else '    '}{key}: {_scalar(value)}"
+                 for i, (key, value) in enumerate(record.items())]
+        blocks.append("\n".join(lines) + "\n")
+    return "    \n".join(blocks)
+
+
+def split_trailer(text: str) -> Tuple[str, str]:
+    """Trennt den abschließenden Block aus Leer- und Kommentarzeilen ab"""
+    lines = text.splitlines(keepends=True)
+    end = len(lines)
+    while end > 0 and (not lines[end - 1].strip() or lines[end - 1].lstrip().startswith("#")):
+        end -= 1
+    return "".join(lines[:end]), "".join(lines[end:])
+
+
+def write_vocabulary(vocab_path: Path, snapshot: VocabSnapshot, entries: List[Dict[str, Any]]):
+    """Schreibt vocab.yaml atomar: Kopf und Schlusskommentare bleiben, die Liste entsteht
+    aus einem einzigen Merge des sortierten Snapshots mit den sortierten neuen Einträgen"""
+    text = Path(vocab_path).read_text(encoding='utf-8')
+    marker = text.find("\nintents:")
+    if not text.startswith("intents:") and marker < 0:
+        raise UpdateError("VOCABULARY_INVALID_FORMAT", f"{vocab_path} has no intents list")
+    head_end = text.index("\n", marker + 1) + 1 if marker >= 0 else text.index("\n") + 1
+    _, trailer = split_trailer(text[head_end:])
+
+    def key(record: Dict[str, Any]) -> bytes:
+        return record["id"].encode('utf-8')
+
+    merged = heapq.merge(snapshot.records(), sorted(entries, key=key), key=key)
+    with atomic_output(vocab_path) as f:
+        f.write(text[:head_end])
+        f.write(render_entries(merged))
+        f.write(trailer)
+
+
+def append_history(history_path: Path, records: List[Dict[str, Any]]) -> Tuple[int, bytes]:
+    """Hängt Einträge vor dem abschließenden Kommentarblock an, ohne die Datei neu zu schreiben.
+
+    Liefert Position und ursprünglichen Schlussblock, damit ein fehlgeschlagener
+    Stapel die History zurücksetzen kann.
+    """
+    with open(history_path, 'r+b') as f:
+        size = f.seek(0, os.SEEK_END)
+        start = max(0, size - TAIL_WINDOW)
+        f.seek(start)
+        window = f.read()
+        body, trailer = split_trailer(window.decode('utf-8', errors='surrogateescape'))
+        trailer_bytes = trailer.encode('utf-8', errors='surrogateescape')
+        position = size - len(trailer_bytes)
+        separator = "    \n" if body.strip() and not body.rstrip(" ").endswith("history:\n") else ""
+        f.seek(position)
+        f.write((separator + render_entries(records)).encode('utf-8') + trailer_bytes)
+        f.flush()
+        os.fsync(f.fileno())
+    return position, trailer_bytes
+
+
+def restore_history(history_path: Path, position: int, trailer: bytes):
+    with open(history_path, 'r+b') as f:
+        f.seek(position)
+        f.write(trailer)
+        f.truncate()
+
+
+def backup_vocabulary(vocab_path: Path, backup_dir: Path, stamp: str) -> Path:
+    """Eine Sicherung je Stapel; der Inhalt wird gegen die Quelle geprüft (backup_verification)"""
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    backup_path = backup_dir / f"{Path(vocab_path).stem}.{stamp}.yaml"
+    shutil.copy2(vocab_path, backup_path)
+    if file_digest(backup_path) != file_digest(vocab_path):
+        raise UpdateError("BACKUP_VERIFICATION_FAILED", f"{backup_path} differs from source")
+    return backup_path
+
+
+def update_vocabulary(files: List[Path], settings: Optional[UpdaterSettings] = None,
+                      now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Übernimmt einen Stapel Vorschlagsdateien als eine Transaktion.
+
+    Reihenfolge: Sicherung, History anhängen, vocab.yaml atomar ersetzen;
+    scheitert der letzte Schritt, wird die History auf ihren Stand zurückgesetzt.
+    """
+    settings = settings or UpdaterSettings.from_config()
+    now = now or datetime.now(timezone.utc)
+    added_on = now.strftime(TIMESTAMP_FORMAT)
+    try:
+        snapshot = VocabStore(settings.vocab_path).snapshot()
+    except VocabStoreError as e:
+        raise UpdateError(e.code, e.message) from None
+
+    entries, history, skipped = select_entries(sorted(map(Path, files)), snapshot, settings,
+                                               added_on)
+    summary: Dict[str, Any] = {"intents_added": len(entries), "skipped": skipped,
+                               "backup_file": None}
+    if not entries:
+        return summary
+
+    if settings.backup_enabled:
+        summary["backup_file"] = str(backup_vocabulary(settings.vocab_path, settings.backup_dir,
+                                                       now.strftime("%Y%m%dT%H%M%S%fZ")))
+    position, trailer = append_history(settings.history_path, history)
+    try:
+        write_vocabulary(settings.vocab_path, snapshot, entries)
+    except BaseException:
+        restore_history(settings.history_path, position, trailer)
+        raise
+    return summary
+
+
+def process_inbox(inbox: SuggestionInbox, settings: Optional[UpdaterSettings] = None,
+                  now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Verarbeitet nur neue oder neu freigegebene Vorschläge laut Inbox-Index.
+
+    Nach erfolgreichem Stapel werden die Dateien als verarbeitet markiert,
+    Dateien mit doppelten oder ungültigen Vorschlägen als übersprungen;
+    erst eine Inhaltsänderung (z.B. erneute Freigabe) macht sie wieder fällig.
+    """
+    scan = inbox.refresh()
+    files = inbox.pending()
+    summary = update_vocabulary(files, settings, now)
+    rejected = {Path(entry["file"]).name for entry in summary["skipped"]
+                if entry["reason"] != "not_approved"}
+    skipped = [path for path in files if path.name in rejected]
+    processed = [path for path in files if path.name not in rejected]
+    inbox.mark_processed(processed)
+    inbox.mark_skipped(skipped)
+    summary.update(scan, files_processed=len(processed), files_skipped=len(skipped))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RooCode Vocab Updater")
+    parser.add_argument("suggestions", nargs="*", help="Vorschlagsdateien (*.yaml)")
+    parser.add_argument("--suggestions-dir", default=str(SUGGESTIONS_DIR),
+                        help="Ohne Dateiangabe: neue oder neu freigegebene Vorschläge "
+                             "dieses Ordners laut Inbox-Index verarbeiten")
+    args = parser.parse_args()
+
+    try:
+        if args.suggestions:
+            summary = update_vocabulary([Path(name) for name in args.suggestions])
+        else:
+            with SuggestionInbox(Path(args.suggestions_dir)) as inbox:
+                summary = process_inbox(inbox)
+    except (UpdateError, OSError, sqlite3.Error) as e:
+        print(json.dumps({"error_code": getattr(e, "code", "OUTPUT_GENERATION_FAILED"),
+                          "error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+RooCode Validator Benchmark
+Misst Dateisuche, Parsing, Template- und Referenzprüfungen seriell und parallel
+"""
+
+import json
+import sys
+import time
+import tempfile
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.ci.json_stream import iter_json_array
+from core.ci.synthetic_project import generate_project
+from core.ci.template_validator import TemplateValidator
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Schema-Prüfungen je Datei; Referenzprüfungen benötigen vocab.yaml bzw. alle Mode-Slugs
+TEMPLATE_CATEGORIES = ["mode", "spec", "vocab", "vocab_history", "llm_config", "yaml",
+                       "transcripts"]
+REFERENTIAL_CATEGORIES = ["flows", "mappings"]
+
+
+def peak_rss_mb() -> Dict[str, Optional[float]]:
+    """Spitzenwert des Arbeitsspeichers dieses Prozesses und seiner beendeten Kindprozesse"""
+    if resource is not None:
+        # ru_maxrss in KiB (Linux); macOS liefert Bytes
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return {
+            "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor, 1),
+            "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / divisor, 1)
+        }
+    try:
+        import psutil
+        return {"self": round(psutil.Process().memory_info().peak_wset / 2 ** 20, 1),
+                "children": None}
+    except (ImportError, AttributeError):
+        return {"self": None, "children": None}
+
+
+def parse_file(file_path: Path) -> int:
+    """Parst eine Projektdatei vollständig und gibt die Anzahl der Wurzelelemente zurück"""
+    if file_path.suffix == ".json":
+        return sum(1 for _ in iter_json_array(file_path))
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = yaml.safe_load(f)
+    return len(data) if isinstance(data, (dict, list)) else 0
+
+
+def _phase_result(files: List[Path], seconds: float) -> Dict[str, Any]:
+    """Laufzeit und Durchsatz einer Phase"""
+    size = sum(path.stat().st_size for path in files)
+    return {
+        "files": len(files),
+        "bytes": size,
+        "seconds": round(seconds, 4),
+        "files_per_second": round(len(files) / seconds, 1) if seconds else None,
+        "mb_per_second": round(size / 2 ** 20 / seconds, 2) if seconds else None
+    }
+
+
+def _timed_validation(validator: TemplateValidator, files: List[Path], jobs: int) -> float:
+    """Validiert Dateien seriell oder im Prozesspool und misst die Laufzeit"""
+    start = time.perf_counter()
+    if jobs > 1:
+        validator.validate_files_parallel(files, jobs)
+    else:
+        for file_path in files:
+            validator.validate_file(file_path)
+    return time.perf_counter() - start
+
+
+def run_mode(project_root: Path, jobs: int) -> Dict[str, Any]:
+    """Führt alle Phasen in einem Modus aus (jobs=1: seriell).
+
+    Template- und Referenzprüfungen lesen ihre Dateien selbst; die Parsing-Phase
+    misst nur das Einlesen und zeigt damit den Anteil der Prüflogik.
+    """
+    validator = TemplateValidator(str(project_root))
+    phases: Dict[str, Any] = {}
+
+    start = time.perf_counter()
+    index = validator.get_index(rebuild=True)
+    all_files = validator.collect_project_files("all")
+    phases["discovery"] = _phase_result(all_files, time.perf_counter() - start)
+    phases["discovery"]["directories_scanned"] = index.directories_scanned
+
+    start = time.perf_counter()
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            list(pool.map(parse_file, all_files,
+                          chunksize=max(1, len(all_files) // (jobs * 4))))
+    else:
+        for file_path in all_files:
+            parse_file(file_path)
+    phases["parsing"] = _phase_result(all_files, time.perf_counter() - start)
+
+    template_files = sorted(index.get(*TEMPLATE_CATEGORIES))
+    phases["template_checks"] = _phase_result(
+        template_files, _timed_validation(validator, template_files, jobs))
+
+    referential_files = sorted(index.get(*REFERENTIAL_CATEGORIES))
+    phases["referential_checks"] = _phase_result(
+        referential_files, _timed_validation(validator, referential_files, jobs))
+
+    summary = validator.generate_report()["validation_summary"]
+    return {
+        "jobs": jobs,
+        "phases": phases,
+        "total_seconds": round(sum(phase["seconds"] for phase in phases.values()), 4),
+        "total_errors": summary["total_errors"],
+        "total_warnings": summary["total_warnings"],
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def _run_mode_in_process(project_root: Path, jobs: int, connection):
+    connection.send(run_mode(project_root, jobs))
+    connection.close()
+
+
+def run_mode_isolated(project_root: Path, jobs: int) -> Dict[str, Any]:
+    """Führt einen Modus in einem eigenen Prozess aus, damit Speicherspitzen getrennt bleiben"""
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_run_mode_in_process,
+                                      args=(project_root, jobs, sender))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        raise RuntimeError(f"Benchmark process for jobs={jobs} exited with code "
+                           f"{process.exitcode}") from None
+    finally:
+        process.join()
+    return result
+
+
+def run_benchmark(project_root: Path, jobs: int = 4) -> Dict[str, Any]:
+    """Vergleicht seriellen und parallelen Lauf auf einem bestehenden Projekt"""
+    modes = [run_mode_isolated(project_root, 1)]
+    if jobs > 1:
+        modes.append(run_mode_isolated(project_root, jobs))
+    return {
+        "project_root": str(project_root),
+        "python": sys.version.split()[0],
+        "cpu_count": multiprocessing.cpu_count(),
+        "modes": modes
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RooCode Validator Benchmark")
+    parser.add_argument("--scale", type=int, default=100,
+                        help="Skalierung des synthetischen Projekts (100-10000)")
+    parser.add_argument("--jobs", type=int, default=4, help="Prozesse im parallelen Modus")
+    parser.add_argument("--seed", type=int, default=0, help="Zufallsstartwert des Generators")
+    parser.add_argument("--project-root", default=None,
+                        help="Bestehendes Projekt messen statt eines synthetischen")
+    parser.add_argument("--output", default=None, help="Ergebnis zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    if args.project_root:
+        result = run_benchmark(Path(args.project_root), args.jobs)
+    else:
+        with tempfile.TemporaryDirectory(prefix="roocode-bench-") as temp_dir:
+            generation_start = time.perf_counter()
+            counts = generate_project(Path(temp_dir), args.scale, args.seed)
+            generation_seconds = time.perf_counter() - generation_start
+            result = run_benchmark(Path(temp_dir), args.jobs)
+            result.update({"scale": args.scale, "generated": counts,
+                           "generation_seconds": round(generation_seconds, 2)})
+
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding='utf-8')
+
+
+if __name__ == "__main__":
+    main()
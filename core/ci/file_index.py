@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+RooCode Project File Index
+Einmaliger os.scandir-Durchlauf mit Ignore-Regeln und Klassifikation nach Subsystem
+"""
+
+import os
+import re
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+# Verzeichnisse, die nie validierbare Dateien enthalten (Modelle, Logs, Laufzeitdaten)
+DEFAULT_IGNORE_PATTERNS = [
+    ".git/",
+    "__pycache__/",
+    ".venv/",
+    "venv/",
+    "node_modules/",
+    ".pytest_cache/",
+    ".mypy_cache/",
+    ".ruff_cache/",
+    ".tox/",
+    "/models/",
+    "/engines/",
+    "/logs/",
+    "/temp/",
+    "/data/input/"
+]
+
+# Klassifikation nach Dateiname; der erste Treffer gewinnt
+CATEGORY_PATTERNS: List[Tuple[str, str]] = [
+    ("template", "template.*.yaml"),
+    ("ci", "ci.*.yaml"),
+    ("mode", "mode.*.yaml"),
+    ("spec", "spec.*.yaml"),
+    ("vocab", "vocab.yaml"),
+    ("vocab_history", "vocab.history.yaml"),
+    ("flows", "buddy-flows.yaml"),
+    ("llm_config", "llm.config.yaml"),
+    ("mappings", "*.mapped.json"),
+    ("transcripts", "*.transcript.json"),
+    ("yaml", "*.yaml")
+]
+
+
+def classify(file_name: str) -> Optional[str]:
+    """Ordnet einen Dateinamen einer Indexkategorie zu"""
+    for category, pattern in CATEGORY_PATTERNS:
+        if fnmatch(file_name, pattern):
+            return category
+    return None
+
+
+def _translate(pattern: str) -> Pattern:
+    """Übersetzt ein gitignore-Muster in einen regulären Ausdruck"""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 1:]:
+            end = pattern.index("]", i + 1)
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(parts) + r"\Z")
+
+
+class IgnoreRules:
+    """Ignore-Regeln im gitignore-Format (Negation, Verankerung, Verzeichnismuster, **)"""
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self.rules: List[Tuple[Pattern, bool, bool, bool]] = []
+        for pattern in patterns:
+            self.add(pattern)
+
+    def add(self, pattern: str):
+        """Fügt ein Muster hinzu; Kommentare und Leerzeilen werden übersprungen"""
+        pattern = pattern.strip()
+        if not pattern or pattern.startswith("#"):
+            return
+
+        negated = pattern.startswith("!")
+        if negated:
+            pattern = pattern[1:]
+
+        dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+
+        # Muster mit innerem '/' gelten relativ zum Projekt-Root
+        anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+
+        self.rules.append((_translate(pattern), negated, dir_only, anchored))
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Prüft einen Pfad relativ zum Projekt-Root; die letzte passende Regel gewinnt"""
+        name = rel_path.rsplit("/", 1)[-1]
+        ignored = False
+        for regex, negated, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path if anchored else name):
+                ignored = not negated
+        return ignored
+
+
+class ProjectIndex:
+    """Klassifizierter Dateiindex eines Projekts aus einem einzigen Verzeichnisdurchlauf"""
+
+    def __init__(self, project_root: Path, ignore_patterns: Iterable[str] = ()):
+        self.project_root = Path(project_root)
+        self.ignore_rules = IgnoreRules(list(DEFAULT_IGNORE_PATTERNS) + list(ignore_patterns))
+        self.files: Dict[str, List[Path]] = {}
+        self.directories_scanned = 0
+
+    def build(self) -> "ProjectIndex":
+        """Durchläuft den Projektbaum und überspringt ignorierte Verzeichnisse vollständig"""
+        self.files = {category: [] for category, _ in CATEGORY_PATTERNS}
+        self.directories_scanned = 0
+        pending = [(str(self.project_root), "")]
+
+        while pending:
+            dir_path, rel_dir = pending.pop()
+            self.directories_scanned += 1
+            try:
+                entries = list(os.scandir(dir_path))
+            except OSError:
+                continue
+
+            for entry in entries:
+                rel_path = f"{rel_dir}{entry.name}"
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+
+                if self.ignore_rules.is_ignored(rel_path, is_dir):
+                    continue
+
+                if is_dir:
+                    pending.append((entry.path, f"{rel_path}/"))
+                    continue
+
+                category = classify(entry.name)
+                if category is not None:
+                    self.files[category].append(Path(entry.path))
+
+        return self
+
+    def get(self, *categories: str) -> List[Path]:
+        """Gibt die Dateien der angegebenen Kategorien zurück"""
+        files = []
+        for category in categories:
+            files += self.files.get(category, [])
+        return files
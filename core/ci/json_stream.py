@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+RooCode JSON Stream Reader
+Liest und schreibt große JSON-Arrays elementweise, ohne die Datei vollständig zu laden
+"""
+
+import json
+from pathlib import Path
+from typing import Any, IO, Iterable, Iterator, Optional, Tuple, Union
+
+WHITESPACE = " \t\n\r"
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+class JsonStreamError(ValueError):
+    """Fehler beim inkrementellen Parsen einer JSON-Datei"""
+
+
+class JsonStreamReader:
+    """Inkrementeller Parser für JSON-Arrays und -Objekte.
+
+    Der Puffer enthält nur das aktuell dekodierte Element; bereits gelesene
+    Zeichen werden beim Nachladen verworfen. Der Speicherbedarf hängt damit
+    von der größten Einzelstruktur ab, nicht von der Dateigröße.
+    """
+
+    def __init__(self, fp: IO[str], chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.consumed = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    @property
+    def offset(self) -> int:
+        """Zeichenposition in der Datei"""
+        return self.consumed + self.pos
+
+    def _fill(self) -> bool:
+        """Lädt weiteren Text nach; False bei Dateiende"""
+        if self.eof:
+            return False
+        if self.pos:
+            self.consumed += self.pos
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        # Leseblock wächst mit dem Puffer, damit große Elemente linear bleiben
+        chunk = self.fp.read(max(self.chunk_size, len(self.buffer)))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        """Nächstes Strukturzeichen, ohne es zu verbrauchen ('' bei Dateiende)"""
+        return self._peek()
+
+    def _peek(self) -> str:
+        """Gibt das nächste Nicht-Whitespace-Zeichen zurück ('' bei Dateiende)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str):
+        """Verbraucht ein erwartetes Strukturzeichen"""
+        actual = self._peek()
+        if actual != char:
+            raise JsonStreamError(
+                f"Expected '{char}' at offset {self.offset}, found '{actual or 'EOF'}'")
+        self.pos += 1
+
+    def read_value(self) -> Any:
+        """Dekodiert den nächsten vollständigen JSON-Wert"""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise JsonStreamError(
+                    f"Invalid JSON at offset {self.consumed + e.pos}: {e.msg}") from None
+            # Ein Wert am Pufferende kann abgeschnitten sein (z.B. Zahlen)
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def iter_array(self) -> Iterator[Any]:
+        """Liefert die Elemente des Arrays an der aktuellen Position einzeln"""
+        self._expect("[")
+        if self._peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.read_value()
+            separator = self._peek()
+            if separator == "]":
+                self.pos += 1
+                return
+            if separator != ",":
+                raise JsonStreamError(
+                    f"Expected ',' or ']' at offset {self.offset}, found '{separator or 'EOF'}'")
+            self.pos += 1
+
+    def iter_object(self, stream_keys: Iterable[str] = ()) -> Iterator[Tuple[str, Any]]:
+        """Liefert die Felder des Objekts an der aktuellen Position.
+
+        Arrays unter ``stream_keys`` werden nicht dekodiert, sondern als Iterator
+        geliefert. Der Iterator muss vor dem nächsten Feld verbraucht werden;
+        nicht gelesene Elemente werden übersprungen.
+        """
+        stream_keys = set(stream_keys)
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise JsonStreamError(f"Expected object key at offset {self.offset}")
+            self._expect(":")
+            if key in stream_keys and self._peek() == "[":
+                items = self.iter_array()
+                yield key, items
+                for _ in items:
+                    pass
+            else:
+                yield key, self.read_value()
+            separator = self._peek()
+            if separator == "}":
+                self.pos += 1
+                return
+            if separator != ",":
+                raise JsonStreamError(
+                    f"Expected ',' or '}}' at offset {self.offset}, found '{separator or 'EOF'}'")
+            self.pos += 1
+
+    def expect_end(self):
+        """Stellt sicher, dass nach dem Wurzelwert nur Whitespace folgt"""
+        if self._peek() != "":
+            raise JsonStreamError(f"Unexpected data after JSON value at offset {self.offset}")
+
+
+def iter_json_array(file_path: Union[str, Path], key: Optional[str] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """Streamt die Elemente eines Wurzel-Arrays oder des Arrays unter ``key``"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        reader = JsonStreamReader(f, chunk_size)
+        if key is None:
+            yield from reader.iter_array()
+        else:
+            if reader._peek() != "{":
+                raise JsonStreamError(f"Expected object with '{key}' array in {file_path}")
+            found = False
+            for name, value in reader.iter_object(stream_keys=(key,)):
+                if name != key:
+                    continue
+                if not hasattr(value, "__next__"):
+                    raise JsonStreamError(f"Field '{key}' in {file_path} is not an array")
+                found = True
+                yield from value
+            if not found:
+                raise JsonStreamError(f"Field '{key}' missing in {file_path}")
+        reader.expect_end()
+
+
+class JsonArrayWriter:
+    """Schreibt ein JSON-Array elementweise.
+
+    Die Ausgabe ist zeichengleich mit ``json.dump(items, fp, indent=indent)``,
+    ohne dass die Elemente gesammelt werden müssen.
+    """
+
+    def __init__(self, fp: IO[str], indent: Optional[int] = None, ensure_ascii: bool = True):
+        self.fp = fp
+        self.indent = indent
+        self.ensure_ascii = ensure_ascii
+        self.count = 0
+
+    @property
+    def separator(self) -> str:
+        """Trennzeichen zwischen kodierten Elementen"""
+        return ", " if self.indent is None else ",\n"
+
+    def encode(self, item: Any) -> str:
+        """Kodiert ein Element mit der Einrückung innerhalb des Arrays"""
+        text = json.dumps(item, indent=self.indent, ensure_ascii=self.ensure_ascii)
+        if self.indent is None:
+            return text
+        padding = " " * self.indent
+        return padding + text.replace("\n", "\n" + padding)
+
+    def write(self, item: Any):
+        """Hängt ein Element an das Array an"""
+        self.write_encoded(self.encode(item))
+
+    def write_encoded(self, text: str, count: int = 1):
+        """Hängt bereits kodierte Elemente an (mit ``separator`` verbundene ``encode``-Ausgaben)"""
+        if not count:
+            return
+        opening = "[" if self.indent is None else "[\n"
+        self.fp.write((self.separator if self.count else opening) + text)
+        self.count += count
+
+    def close(self):
+        """Schließt das Array ab"""
+        if not self.count:
+            self.fp.write("[]")
+        elif self.indent is None:
+            self.fp.write("]")
+        else:
+            self.fp.write("\n]")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+RooCode Validation Report Writers
+Streamende Ausgabe von Validierungsfehlern als JSON Lines oder SARIF
+"""
+
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, IO
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+TOOL_NAME = "roocode-template-validator"
+
+
+class ReportWriter(ABC):
+    """Basisklasse: gibt Fehler und Warnungen aus, sobald sie gefunden werden"""
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+
+    @abstractmethod
+    def write_error(self, error: Dict[str, Any]):
+        """Gibt einen Validierungsfehler aus"""
+
+    @abstractmethod
+    def write_warning(self, warning: Dict[str, Any]):
+        """Gibt eine Warnung aus"""
+
+    @abstractmethod
+    def close(self, summary: Dict[str, Any]):
+        """Schließt den Bericht mit der Zusammenfassung ab"""
+
+
+class JsonLinesReportWriter(ReportWriter):
+    """Ein JSON-Objekt pro Zeile; die Zusammenfassung folgt als letzte Zeile"""
+
+    def _emit(self, record: Dict[str, Any]):
+        self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+
+    def write_error(self, error: Dict[str, Any]):
+        self._emit({"record": "error", **error})
+
+    def write_warning(self, warning: Dict[str, Any]):
+        self._emit({"record": "warning", **warning})
+
+    def close(self, summary: Dict[str, Any]):
+        self._emit({"record": "summary", **summary})
+
+
+class SarifReportWriter(ReportWriter):
+    """SARIF 2.1.0 für Code-Scanning-Werkzeuge.
+
+    Ergebnisse werden direkt in das results-Array geschrieben; Regelliste und
+    Zusammenfassung folgen am Ende des Run-Objekts, da die Schlüsselreihenfolge
+    in SARIF nicht festgelegt ist.
+    """
+
+    def __init__(self, stream: IO[str], project_root: Path):
+        super().__init__(stream)
+        self.project_root = Path(project_root).resolve()
+        self.rule_ids: Dict[str, str] = {}
+        self.result_count = 0
+        self.stream.write(f'{{"$schema": "{SARIF_SCHEMA}", "version": "2.1.0", '
+                          f'"runs": [{{"results": [')
+        self.stream.flush()
+
+    def _artifact_uri(self, file_path: str) -> str:
+        """Pfad relativ zum Projekt-Root mit Schrägstrichen"""
+        path = Path(file_path)
+        try:
+            return path.resolve().relative_to(self.project_root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def _write_result(self, rule_id: str, level: str, message: str,
+                      file_path: str, line_number: int = 0):
+        self.rule_ids.setdefault(rule_id, level)
+
+        location: Dict[str, Any] = {"artifactLocation": {"uri": self._artifact_uri(file_path)}}
+        if line_number:
+            location["region"] = {"startLine": line_number}
+
+        result = {
+            "ruleId": rule_id,
+            "level": level,
+            "message": {"text": message},
+            "locations": [{"physicalLocation": location}]
+        }
+
+        separator = ", " if self.result_count else ""
+        self.stream.write(separator + json.dumps(result))
+        self.stream.flush()
+        self.result_count += 1
+
+    def write_error(self, error: Dict[str, Any]):
+        message = f"expected {error['expected_value']!r}, found {error['actual_value']!r}"
+        if error["yaml_path"]:
+            message = f"{error['yaml_path']}: {message}"
+        self._write_result(error["error_type"], "error", message,
+                           error["affected_file"], error["line_number"])
+
+    def write_warning(self, warning: Dict[str, Any]):
+        self._write_result(warning["warning_type"], "warning", warning["message"],
+                           warning["affected_file"])
+
+    def close(self, summary: Dict[str, Any]):
+        rules = [{"id": rule_id, "defaultConfiguration": {"level": level}}
+                 for rule_id, level in self.rule_ids.items()]
+        tool = {"driver": {"name": TOOL_NAME, "rules": rules}}
+        invocation = {"executionSuccessful": True, "properties": summary}
+
+        self.stream.write(f'], "tool": {json.dumps(tool)}, '
+                          f'"invocations": [{json.dumps(invocation)}]}}]}}\n')
+        self.stream.flush()
+
+
+def create_report_writer(report_format: str, stream: IO[str], project_root: Path) -> ReportWriter:
+    """Erzeugt den Writer für ein Ausgabeformat (jsonl, sarif)"""
+    if report_format == "jsonl":
+        return JsonLinesReportWriter(stream)
+    if report_format == "sarif":
+        return SarifReportWriter(stream, project_root)
+    raise ValueError(f"Unsupported streaming report format: {report_format}")
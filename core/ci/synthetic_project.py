@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+RooCode Synthetic Project Generator
+Erzeugt Projektbäume in der Struktur dieses Repositories für Validator-Benchmarks
+"""
+
+import json
+import random
+import shutil
+import sys
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# Umfang je Skalierungseinheit; Skalierung 10.000 ergibt 100.000 Intents
+INTENTS_PER_UNIT = 10
+TURNS_PER_TRANSCRIPT = 20
+MODES_PER_FLOWS_FILE = 100
+
+TIMESTAMP = "2025-06-29T00:00:00Z"
+INTENT_DOMAINS = ["inform", "confirm", "task", "request", "feedback", "navigate", "meta"]
+WORDS = ["project", "file", "mode", "intent", "review", "update", "model", "export",
+         "question", "status", "config", "deploy", "error", "result", "summary", "step"]
+
+
+def _mode_document(slug: str, rng: random.Random, broken: bool) -> Dict[str, Any]:
+    """mode.*.yaml nach template.mode.yaml"""
+    mode = {
+        "slug": slug,
+        "agent": f"{slug}-agent",
+        "description": f"Synthetic mode {slug}",
+        "version": "1.0.0",
+        "model_source": {"type": "local", "reference": f"models/{slug}.gguf"},
+        "tools": [{"name": f"tool_{i}", "type": "file", "config": {"enabled": True}}
+                  for i in range(rng.randint(1, 4))],
+        "input_constraints": {"file_types": [".json"], "max_file_size_mb": 50,
+                              "encoding": "utf-8"},
+        "output_target": {"format": "json", "destination": "data/output",
+                          "naming_pattern": "{basename}.out.json"},
+        "execution": {"timeout_seconds": 300, "retry_attempts": 3,
+                      "parallel_processing": False},
+        "integration": {"buddy_compatible": True, "flow_triggers": [], "dependencies": []},
+        "metadata": {"created_on": TIMESTAMP, "last_modified": TIMESTAMP, "status": "active"}
+    }
+    if broken:
+        del mode["execution"]
+    return mode
+
+
+def _spec_document(slug: str) -> Dict[str, Any]:
+    """spec.*.yaml nach template.spec.yaml"""
+    return {
+        "agent_id": slug,
+        "name": f"Synthetic {slug}",
+        "description": f"Specification for {slug}",
+        "version": "1.0.0",
+        "capabilities": {"input_types": ["json"], "output_types": ["json"],
+                         "tools": ["file_reader"]},
+        "configuration": {
+            "model_requirements": {"min_context_length": 4096,
+                                   "recommended_model_size": "7B"},
+            "performance": {"max_processing_time": 300, "memory_limit_mb": 2048}
+        },
+        "dependencies": {"required_modules": ["json"], "optional_modules": []},
+        "validation": {"input_schema": "schema.in.json", "output_schema": "schema.out.json",
+                       "test_cases": "tests/"},
+        "metadata": {"created_on": TIMESTAMP, "last_modified": TIMESTAMP,
+                     "author": "synthetic", "tags": ["benchmark"]}
+    }
+
+
+def _transcript(rng: random.Random) -> List[Dict[str, Any]]:
+    """*.transcript.json mit fortlaufenden Zeichenpositionen"""
+    turns = []
+    position = 0
+    counters = {"user": 0, "agent": 0}
+    for i in range(TURNS_PER_TRANSCRIPT):
+        speaker = "user" if i % 2 == 0 else "agent"
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 40)))
+        turns.append({
+            "speaker": speaker,
+            "index": counters[speaker],
+            "text": text,
+            "char_pos_start": position,
+            "char_pos_end": position + len(text)
+        })
+        counters[speaker] += 1
+        position += len(text) + 1
+    return turns
+
+
+def generate_project(target_root: Path, scale: int = 100, seed: int = 0,
+                     error_rate: float = 0.01,
+                     source_root: Path = PROJECT_ROOT) -> Dict[str, int]:
+    """Erzeugt ein synthetisches Projekt und gibt die Dateianzahl je Art zurück.
+
+    Templates und ci.rules.yaml werden aus ``source_root`` übernommen; ein Anteil
+    von ``error_rate`` der Einträge ist absichtlich fehlerhaft, damit auch die
+    Fehlerpfade des Validators gemessen werden.
+    """
+    rng = random.Random(seed)
+    target_root = Path(target_root)
+    counts = {"modes": 0, "specs": 0, "flows": 0, "intents": 0,
+              "suggestions": 0, "transcripts": 0, "mappings": 0}
+
+    shutil.copytree(source_root / "core" / "templates", target_root / "core" / "templates",
+                    dirs_exist_ok=True)
+    ci_dir = target_root / "core" / "ci"
+    ci_dir.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(source_root / "core" / "ci" / "ci.rules.yaml", ci_dir / "ci.rules.yaml")
+
+    # Modes und Spezifikationen, je Mode ein Verzeichnis wie core/modes/<slug>/
+    slugs = [f"mode-{i:05d}" for i in range(scale)]
+    for slug in slugs:
+        mode_dir = target_root / "core" / "modes" / slug
+        mode_dir.mkdir(parents=True, exist_ok=True)
+        with open(mode_dir / f"mode.{slug}.yaml", 'w', encoding='utf-8') as f:
+            yaml.safe_dump(_mode_document(slug, rng, rng.random() < error_rate), f,
+                           sort_keys=False)
+        with open(mode_dir / f"spec.{slug}.yaml", 'w', encoding='utf-8') as f:
+            yaml.safe_dump(_spec_document(slug), f, sort_keys=False)
+        counts["modes"] += 1
+        counts["specs"] += 1
+
+    # buddy-flows.yaml referenziert die erzeugten Modes
+    for start in range(0, scale, MODES_PER_FLOWS_FILE):
+        flows_dir = target_root / "core" / "modes" / f"buddy-{start // MODES_PER_FLOWS_FILE:03d}"
+        flows_dir.mkdir(parents=True, exist_ok=True)
+        block = slugs[start:start + MODES_PER_FLOWS_FILE]
+        flows = []
+        for i in range(0, len(block), 5):
+            steps = [slug if rng.random() >= error_rate else f"missing-{slug}"
+                     for slug in block[i:i + 5]]
+            flows.append({"id": f"flow_{start + i}", "label": f"Flow {start + i}",
+                          "description": "Synthetic flow", "steps": steps,
+                          "input": {"default_folder": "data/input",
+                                    "file_pattern": "*.chat.json",
+                                    "output_folder": "data/output"}})
+        with open(flows_dir / "buddy-flows.yaml", 'w', encoding='utf-8') as f:
+            yaml.safe_dump({"flows": flows}, f, sort_keys=False)
+        counts["flows"] += 1
+
+    # Zentrales Vokabular
+    intent_ids = sorted({f"{INTENT_DOMAINS[i % len(INTENT_DOMAINS)]}.{rng.choice(WORDS)}.{i:06d}"
+                         for i in range(scale * INTENTS_PER_UNIT)})
+    vocab_dir = target_root / "core" / "vocab"
+    vocab_dir.mkdir(parents=True, exist_ok=True)
+    intents = [{"id": intent_id, "label": intent_id.split(".")[1].title(),
+                "description": f"Synthetic intent {intent_id}",
+                "created_on": TIMESTAMP, "origin": "manual"} for intent_id in intent_ids]
+    with open(vocab_dir / "vocab.yaml", 'w', encoding='utf-8') as f:
+        yaml.safe_dump({"intents": intents}, f, sort_keys=False)
+    counts["intents"] = len(intent_ids)
+
+    # Intent-Scout-Vorschläge nach template.intent-suggestion.yaml
+    suggestions_dir = target_root / "intent-scout" / "suggestions"
+    suggestions_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(scale):
+        suggestion = {
+            "suggested_id": f"inform.uncategorized.{i:05d}",
+            "label": f"Suggestion {i}",
+            "explanation": "Turn does not match any existing intent",
+            "source_turn": f"user:{rng.randrange(TURNS_PER_TRANSCRIPT // 2)}",
+            "context": {"transcript_file": f"chat-{i:05d}.transcript.json",
+                        "turn_index": rng.randrange(TURNS_PER_TRANSCRIPT // 2),
+                        "speaker": "user"},
+            "metadata": {"created_on": TIMESTAMP, "scout_version": "1.0",
+                         "status": "pending"}
+        }
+        with open(suggestions_dir / f"2025-06-29_chat-{i:05d}.yaml", 'w',
+                  encoding='utf-8') as f:
+            yaml.safe_dump(suggestion, f, sort_keys=False)
+        counts["suggestions"] += 1
+
+    # Transkripte und Mapping-Ergebnisse
+    output_dir = target_root / "data" / "output"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(scale):
+        turns = _transcript(rng)
+        with open(output_dir / f"chat-{i:05d}.transcript.json", 'w', encoding='utf-8') as f:
+            json.dump(turns, f, indent=2)
+        mapping = []
+        for turn in turns:
+            if turn["speaker"] != "user":
+                mapping.append({"turn_ref": f"agent:{turn['index']}", "intent_id": None,
+                                "confidence": None})
+                continue
+            intent_id = rng.choice(intent_ids) if rng.random() >= error_rate else "unknown.intent"
+            mapping.append({"turn_ref": f"user:{turn['index']}", "intent_id": intent_id,
+                            "confidence": round(rng.uniform(0.7, 1.0), 3)})
+        with open(output_dir / f"chat-{i:05d}.mapped.json", 'w', encoding='utf-8') as f:
+            json.dump(mapping, f, indent=2)
+        counts["transcripts"] += 1
+        counts["mappings"] += 1
+
+    # Verzeichnisse, die die Dateisuche überspringen muss
+    for ignored in ["models", "logs", "temp"]:
+        ignored_dir = target_root / ignored
+        ignored_dir.mkdir(parents=True, exist_ok=True)
+        (ignored_dir / "mode.ignored.yaml").write_text("slug: ignored\n", encoding='utf-8')
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RooCode Synthetic Project Generator")
+    parser.add_argument("target_root", help="Zielverzeichnis")
+    parser.add_argument("--scale", type=int, default=100, help="Skalierungsfaktor (100-10000)")
+    parser.add_argument("--seed", type=int, default=0, help="Zufallsstartwert")
+    parser.add_argument("--error-rate", type=float, default=0.01,
+                        help="Anteil absichtlich fehlerhafter Einträge")
+    args = parser.parse_args()
+
+    counts = generate_project(Path(args.target_root), args.scale, args.seed, args.error_rate)
+    print(json.dumps(counts, indent=2))
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
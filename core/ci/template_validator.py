@@ -7,30 +7,104 @@ Prüft YAML-Dateien gegen ihre entsprechenden Templates
 import yaml
 import json
 import sys
-import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Container, Dict, List, Any, Optional, Set, Tuple
+
+# Projekt-Root für Paketimporte verfügbar machen (Aufruf als Skript aus core/ci)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.ci.file_index import ProjectIndex, classify
+from core.ci.json_stream import JsonStreamError, iter_json_array
+from core.ci.report_writers import ReportWriter, create_report_writer
+from core.vocab.vocab_store import VocabStore, VocabStoreError
+
+TRANSCRIPT_REQUIRED_FIELDS = ["speaker", "index", "text", "char_pos_start", "char_pos_end"]
+
+# Indexkategorien je Subsystem (siehe subsystem_validation in ci.rules.yaml)
+SUBSYSTEM_CATEGORIES = {
+    "vocab": ["vocab", "vocab_history"],
+    "modes": ["mode", "spec"],
+    "flows": ["flows"],
+    "mappings": ["mappings"],
+    "transcripts": ["transcripts"],
+    "all": ["mode", "spec", "vocab", "vocab_history", "flows", "llm_config", "yaml",
+            "mappings", "transcripts"]
+}
+
+# Validator je Worker-Prozess; Vokabular und Mode-Slugs werden pro Prozess einmal geladen
+_worker_validator: Optional["TemplateValidator"] = None
+
+
+def _init_worker(project_root: str, ignore_patterns: List[str]):
+    """Initialisiert den Validator eines Worker-Prozesses"""
+    global _worker_validator
+    _worker_validator = TemplateValidator(project_root, ignore_patterns=ignore_patterns)
+
+
+def _validate_in_worker(file_path: Path) -> Tuple[bool, List, List]:
+    """Validiert eine Datei im Worker-Prozess"""
+    return _worker_validator.validate_file_isolated(file_path)
 
 class TemplateValidator:
-    def __init__(self, project_root: str):
+    def __init__(self, project_root: str, cache_parsed: bool = False,
+                 ignore_patterns: Optional[List[str]] = None,
+                 max_errors_per_category: Optional[int] = None,
+                 reporter: Optional[ReportWriter] = None, retain_results: bool = True):
         self.project_root = Path(project_root)
         self.templates_dir = self.project_root / "core" / "templates"
-        self.errors = []
-        self.warnings = []
+        self.ignore_patterns = list(ignore_patterns or [])
+        self._index: Optional[ProjectIndex] = None
+        self._ci_rules: Optional[Dict[str, Any]] = None
+        # Streaming-Ausgabe: Ergebnisse gehen direkt an den Writer statt in Listen
+        self.max_errors_per_category = max_errors_per_category
+        self.reporter = reporter
+        self.retain_results = retain_results
+        self._reset_results()
+        self._vocab_ids: Optional[Container[str]] = None
+        self._vocab_error: Optional[str] = None
+        self._mode_slugs: Optional[Set[str]] = None
+        # Geparste Dateien nach (mtime, size) vorhalten, z.B. im Daemon-Betrieb
+        self._parsed_cache: Optional[Dict[Path, Tuple[Tuple[int, int], Any]]] = \
+            {} if cache_parsed else None
     
-    def load_yaml(self, file_path: Path) -> Dict[str, Any]:
+    def load_yaml(self, file_path: Path, record_errors: bool = True) -> Dict[str, Any]:
         """Lädt YAML-Datei sicher"""
         try:
+            if self._parsed_cache is not None:
+                stat = file_path.stat()
+                cache_key = (stat.st_mtime_ns, stat.st_size)
+                cached = self._parsed_cache.get(file_path)
+                if cached is not None and cached[0] == cache_key:
+                    return cached[1]
+            
             with open(file_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
+                data = yaml.safe_load(f)
+            
+            if self._parsed_cache is not None:
+                self._parsed_cache[file_path] = (cache_key, data)
+            return data
         except Exception as e:
-            self.add_error("yaml_load_error", str(file_path), "", "", str(e))
+            if record_errors:
+                self.add_error("yaml_load_error", str(file_path), "", "", str(e))
             return {}
     
+    def _reset_results(self):
+        """Setzt Fehler, Warnungen und Zähler zurück"""
+        self.errors = []
+        self.warnings = []
+        self.error_total = 0
+        self.warning_total = 0
+        self.error_counts: Dict[str, int] = {}
+        self.suppressed_errors: Dict[str, int] = {}
+    
     def add_error(self, error_type: str, file_path: str, yaml_path: str = "", 
                   expected: str = "", actual: str = "", line_num: int = 0):
         """Fügt Validierungsfehler hinzu"""
-        self.errors.append({
+        self.record_error({
             "error_type": error_type,
             "affected_file": file_path,
             "yaml_path": yaml_path,
@@ -39,14 +113,38 @@ class TemplateValidator:
             "line_number": line_num
         })
     
+    def record_error(self, error: Dict[str, Any]):
+        """Zählt einen Fehler und gibt ihn unterhalb des Kategorie-Limits aus"""
+        error_type = error["error_type"]
+        self.error_total += 1
+        category_count = self.error_counts.get(error_type, 0) + 1
+        self.error_counts[error_type] = category_count
+        
+        if self.max_errors_per_category and category_count > self.max_errors_per_category:
+            self.suppressed_errors[error_type] = self.suppressed_errors.get(error_type, 0) + 1
+            return
+        
+        if self.reporter:
+            self.reporter.write_error(error)
+        if self.retain_results:
+            self.errors.append(error)
+    
     def add_warning(self, warning_type: str, file_path: str, message: str):
         """Fügt Warnung hinzu"""
-        self.warnings.append({
+        self.record_warning({
             "warning_type": warning_type,
             "affected_file": file_path,
             "message": message
         })
     
+    def record_warning(self, warning: Dict[str, Any]):
+        """Zählt eine Warnung und gibt sie aus"""
+        self.warning_total += 1
+        if self.reporter:
+            self.reporter.write_warning(warning)
+        if self.retain_results:
+            self.warnings.append(warning)
+    
     def get_template_for_file(self, file_path: Path) -> Path:
         """Bestimmt das entsprechende Template für eine Datei"""
         file_name = file_path.name
@@ -113,8 +211,107 @@ class TemplateValidator:
         else:
             return isinstance(value, expected_python_type)
     
+    def get_vocab_ids(self) -> Optional[Container[str]]:
+        """Gültige Intent-IDs aus dem Snapshot des Vocab-Stores (Binärsuche statt YAML-Parse).
+
+        Ist das Vokabular nicht lesbar, wird None geliefert und der Grund in
+        ``_vocab_error`` gemerkt, statt alle Intent-IDs als unbekannt zu melden.
+        """
+        if self._vocab_ids is None and self._vocab_error is None:
+            store = VocabStore(self.project_root / "core" / "vocab" / "vocab.yaml")
+            try:
+                self._vocab_ids = store.snapshot()
+            except VocabStoreError as e:
+                self._vocab_error = str(e)
+        return self._vocab_ids
+    
+    def get_mode_slugs(self) -> Set[str]:
+        """Sammelt die Slugs aller mode.*.yaml einmalig"""
+        if self._mode_slugs is None:
+            self._mode_slugs = set()
+            for mode_file in self.get_subsystem_files("modes"):
+                if mode_file.name.startswith("mode."):
+                    mode_data = self.load_yaml(mode_file, record_errors=False) or {}
+                    if isinstance(mode_data, dict) and "slug" in mode_data:
+                        self._mode_slugs.add(mode_data["slug"])
+        return self._mode_slugs
+    
+    def invalidate(self, file_path: Path):
+        """Verwirft abgeleitete Daten, die von einer geänderten Datei abhängen"""
+        if self._parsed_cache is not None:
+            self._parsed_cache.pop(file_path, None)
+        if file_path.name == "vocab.yaml":
+            self._vocab_ids = None
+            self._vocab_error = None
+        elif classify(file_path.name) == "mode":
+            self._mode_slugs = None
+    
+    def validate_flow_references(self, file_path: Path, flows_data: Dict[str, Any]):
+        """Prüft, dass alle Schritte in buddy-flows.yaml existierende Modes referenzieren"""
+        mode_slugs = self.get_mode_slugs()
+        
+        for flow_index, flow in enumerate(flows_data.get("flows") or []):
+            if not isinstance(flow, dict):
+                continue
+            for step_index, step in enumerate(flow.get("steps") or []):
+                if step not in mode_slugs:
+                    self.add_error("unknown_mode_reference", str(file_path),
+                                 f"flows[{flow_index}].steps[{step_index}]",
+                                 "slug in mode.*.yaml", str(step))
+    
+    def validate_mapping_file(self, file_path: Path) -> bool:
+        """Prüft jede intent_id einer *.mapped.json gegen vocab.yaml (streamend)"""
+        vocab_ids = self.get_vocab_ids()
+        error_count = self.error_total
+        if vocab_ids is None:
+            # Ohne Vokabular wird die Intent-ID-Prüfung übersprungen, nicht alles gemeldet
+            self.add_error("vocab_load_error", str(file_path), "", "readable vocab.yaml",
+                           self._vocab_error)
+        
+        try:
+            for index, entry in enumerate(iter_json_array(file_path)):
+                if not isinstance(entry, dict):
+                    self.add_error("invalid_field_type", str(file_path), f"[{index}]",
+                                 "object", type(entry).__name__)
+                    continue
+                
+                intent_id = entry.get("intent_id")
+                if vocab_ids is not None and intent_id is not None and intent_id not in vocab_ids:
+                    self.add_error("unknown_intent_id", str(file_path),
+                                 f"[{index}].intent_id", "id in vocab.yaml", str(intent_id))
+        except (JsonStreamError, OSError, UnicodeDecodeError) as e:
+            self.add_error("json_load_error", str(file_path), "", "", str(e))
+        
+        return self.error_total == error_count
+    
+    def validate_transcript_file(self, file_path: Path) -> bool:
+        """Prüft die Pflichtfelder jedes Turns einer *.transcript.json (streamend)"""
+        error_count = self.error_total
+        
+        try:
+            for index, turn in enumerate(iter_json_array(file_path)):
+                if not isinstance(turn, dict):
+                    self.add_error("invalid_field_type", str(file_path), f"[{index}]",
+                                 "object", type(turn).__name__)
+                    continue
+                
+                for field in TRANSCRIPT_REQUIRED_FIELDS:
+                    if field not in turn:
+                        self.add_error("missing_required_field", str(file_path),
+                                     f"[{index}].{field}", field, "missing")
+        except (JsonStreamError, OSError, UnicodeDecodeError) as e:
+            self.add_error("json_load_error", str(file_path), "", "", str(e))
+        
+        return self.error_total == error_count
+    
     def validate_file(self, file_path: Path) -> bool:
         """Validiert eine einzelne Datei gegen ihr Template"""
+        if file_path.name.endswith(".mapped.json"):
+            return self.validate_mapping_file(file_path)
+        if file_path.name.endswith(".transcript.json"):
+            return self.validate_transcript_file(file_path)
+        
+        error_count = self.error_total
         template_path = self.get_template_for_file(file_path)
         
         if not template_path:
@@ -137,69 +334,167 @@ class TemplateValidator:
         # Validiere erforderliche Felder
         self.validate_required_fields(file_data, template_data, str(file_path))
         
-        return len(self.errors) == 0
+        # buddy_flows_mode_consistency
+        if file_path.name == "buddy-flows.yaml" and isinstance(file_data, dict):
+            self.validate_flow_references(file_path, file_data)
+        
+        return self.error_total == error_count
     
-    def validate_project(self, subsystem: str = "all") -> bool:
+    def validate_file_isolated(self, file_path: Path) -> Tuple[bool, List, List]:
+        """Validiert eine Datei isoliert und liefert Ergebnis, Fehler und Warnungen"""
+        saved_state = (self.errors, self.warnings, self.error_total, self.warning_total,
+                       self.error_counts, self.suppressed_errors, self.reporter,
+                       self.max_errors_per_category, self.retain_results)
+        self._reset_results()
+        self.reporter, self.max_errors_per_category, self.retain_results = None, None, True
+        try:
+            passed = self.validate_file(file_path)
+            return passed, self.errors, self.warnings
+        finally:
+            (self.errors, self.warnings, self.error_total, self.warning_total,
+             self.error_counts, self.suppressed_errors, self.reporter,
+             self.max_errors_per_category, self.retain_results) = saved_state
+    
+    def validate_project(self, subsystem: str = "all", jobs: int = 1) -> bool:
         """Validiert das gesamte Projekt oder ein Subsystem"""
-        if subsystem == "all":
-            yaml_files = list(self.project_root.rglob("*.yaml"))
-            # Filtere Template-Dateien und CI-Dateien aus
-            yaml_files = [f for f in yaml_files 
-                         if not f.name.startswith("template.") 
-                         and not f.name.startswith("ci.")]
-        else:
-            # Subsystem-spezifische Validierung
-            yaml_files = self.get_subsystem_files(subsystem)
+        files = self.collect_project_files(subsystem)
+        if jobs > 1 and len(files) > 1:
+            return self.validate_files_parallel(files, jobs)
         
         validation_passed = True
         
-        for file_path in yaml_files:
+        for file_path in files:
             if not self.validate_file(file_path):
                 validation_passed = False
         
         return validation_passed
     
+    def validate_files_parallel(self, files: List[Path], jobs: int) -> bool:
+        """Validiert Dateien in einem Prozesspool.
+        
+        Die Ergebnisse werden in Dateireihenfolge übernommen, sodass Bericht,
+        Kategorie-Limits und Streaming-Ausgabe einem seriellen Lauf entsprechen.
+        """
+        validation_passed = True
+        chunk_size = max(1, len(files) // (jobs * 4))
+        
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(str(self.project_root), self.ignore_patterns)) as pool:
+            for passed, errors, warnings in pool.map(_validate_in_worker, files,
+                                                     chunksize=chunk_size):
+                for error in errors:
+                    self.record_error(error)
+                for warning in warnings:
+                    self.record_warning(warning)
+                if not passed:
+                    validation_passed = False
+        
+        return validation_passed
+    
+    def collect_project_files(self, subsystem: str = "all") -> List[Path]:
+        """Sammelt die zu prüfenden Dateien des Projekts oder eines Subsystems"""
+        # Template- und CI-Dateien sind über ihre Indexkategorie ausgeschlossen;
+        # sortiert für reproduzierbare Berichte
+        return sorted(self.get_subsystem_files(subsystem))
+    
+    def get_index(self, rebuild: bool = False) -> ProjectIndex:
+        """Baut den Dateiindex einmalig auf und teilt ihn zwischen allen Subsystemen"""
+        if self._index is None or rebuild:
+            patterns = self.load_discovery_ignores() + self.ignore_patterns
+            self._index = ProjectIndex(self.project_root, patterns).build()
+        return self._index
+    
+    def load_ci_rules(self) -> Dict[str, Any]:
+        """Lädt ci.rules.yaml des geprüften Projekts einmalig"""
+        if self._ci_rules is None:
+            rules_path = self.project_root / "core" / "ci" / "ci.rules.yaml"
+            rules = self.load_yaml(rules_path, record_errors=False) if rules_path.exists() else {}
+            self._ci_rules = rules if isinstance(rules, dict) else {}
+        return self._ci_rules
+    
+    def load_discovery_ignores(self) -> List[str]:
+        """Liest zusätzliche Ignore-Muster aus ci.rules.yaml (discovery.ignore)"""
+        return list((self.load_ci_rules().get("discovery") or {}).get("ignore") or [])
+    
     def get_subsystem_files(self, subsystem: str) -> List[Path]:
         """Gibt Dateien für ein spezifisches Subsystem zurück"""
-        if subsystem == "vocab":
-            return list(self.project_root.rglob("vocab.yaml")) + \
-                   list(self.project_root.rglob("vocab.history.yaml"))
-        elif subsystem == "modes":
-            return list(self.project_root.rglob("mode.*.yaml")) + \
-                   list(self.project_root.rglob("spec.*.yaml"))
-        elif subsystem == "flows":
-            return list(self.project_root.rglob("buddy-flows.yaml"))
-        else:
-            return []
+        return self.get_index().get(*SUBSYSTEM_CATEGORIES.get(subsystem, []))
+    
+    def matches_subsystem(self, file_path: Path, subsystem: str) -> bool:
+        """Prüft, ob eine Datei zu einem Subsystem gehört"""
+        return classify(file_path.name) in SUBSYSTEM_CATEGORIES.get(subsystem, [])
     
     def generate_report(self) -> Dict[str, Any]:
         """Generiert Validierungsbericht"""
         return {
             "validation_summary": {
-                "total_errors": len(self.errors),
-                "total_warnings": len(self.warnings),
-                "validation_passed": len(self.errors) == 0
+                "total_errors": self.error_total,
+                "total_warnings": self.warning_total,
+                "validation_passed": self.error_total == 0,
+                "suppressed_errors": dict(self.suppressed_errors)
             },
             "errors": self.errors,
             "warnings": self.warnings
         }
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python template_validator.py <project_root> [subsystem]")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="RooCode Template Validator")
+    parser.add_argument("project_root", help="Projektverzeichnis")
+    parser.add_argument("subsystem", nargs="?", default="all",
+                        help="Subsystem (all, vocab, modes, flows, mappings, transcripts)")
+    parser.add_argument("--serve", action="store_true",
+                        help="Als Validierungs-Daemon mit Dateiüberwachung starten")
+    parser.add_argument("--client", action="store_true",
+                        help="Bericht von einem laufenden Daemon abfragen")
+    parser.add_argument("--host", default="127.0.0.1", help="Daemon-Adresse")
+    parser.add_argument("--port", type=int, default=8082, help="Daemon-Port")
+    parser.add_argument("--ignore", action="append", default=[], metavar="PATTERN",
+                        help="Zusätzliches Ignore-Muster im gitignore-Format (mehrfach möglich)")
+    parser.add_argument("--format", choices=["json", "jsonl", "sarif"], default="json",
+                        help="Berichtsformat; jsonl und sarif werden während der Prüfung gestreamt")
+    parser.add_argument("--max-errors-per-category", type=int, default=None, metavar="N",
+                        help="Fehler je Kategorie begrenzen (0 = unbegrenzt, "
+                             "Standard aus ci.rules.yaml)")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                        help="Dateien in N Prozessen parallel prüfen")
+    args = parser.parse_args()
+    
+    project_root = args.project_root
+    subsystem = args.subsystem
+    
+    validator = TemplateValidator(project_root, ignore_patterns=args.ignore)
+    max_errors = args.max_errors_per_category
+    if max_errors is None:
+        output_config = validator.load_ci_rules().get("output_configuration") or {}
+        max_errors = output_config.get("max_errors_per_category")
+    validator.max_errors_per_category = max_errors or None
+    
+    if args.serve or args.client:
+        from core.ci.validator_daemon import ValidationDaemon, fetch_report
+        if args.serve:
+            ValidationDaemon(project_root, host=args.host, port=args.port,
+                             ignore_patterns=args.ignore,
+                             max_errors_per_category=max_errors or None).serve_forever()
+            return
+        report = fetch_report(subsystem, host=args.host, port=args.port)
+        print(json.dumps(report, indent=2))
+        sys.exit(0 if report["validation_summary"]["validation_passed"] else 1)
     
-    project_root = sys.argv[1]
-    subsystem = sys.argv[2] if len(sys.argv) > 2 else "all"
+    if args.format != "json":
+        # Streaming: Fehler sofort ausgeben, keine Ergebnislisten im Speicher halten
+        validator.reporter = create_report_writer(args.format, sys.stdout, Path(project_root))
+        validator.retain_results = False
     
-    validator = TemplateValidator(project_root)
-    validation_passed = validator.validate_project(subsystem)
+    validation_passed = validator.validate_project(subsystem, jobs=args.jobs)
     
     # Generiere Bericht
     report = validator.generate_report()
     
-    # Ausgabe als JSON für weitere Verarbeitung
-    print(json.dumps(report, indent=2))
+    if validator.reporter:
+        validator.reporter.close(report["validation_summary"])
+    else:
+        # Ausgabe als JSON für weitere Verarbeitung
+        print(json.dumps(report, indent=2))
     
     sys.exit(0 if validation_passed else 1)
 
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+RooCode Validation Daemon
+Hält Templates und geparste Dateien resident und validiert nur geänderte Dateien neu
+"""
+
+import json
+import time
+import logging
+import threading
+import http.server
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Set, Tuple
+from urllib.parse import urlparse, parse_qs, quote
+
+from core.ci.file_index import classify
+from core.ci.template_validator import TemplateValidator
+
+logger = logging.getLogger('roocode.validator_daemon')
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8082
+
+
+class ValidationDaemon:
+    """Validierungsdienst mit Dateiüberwachung und lokaler HTTP-Schnittstelle"""
+
+    def __init__(self, project_root: str, host: str = DEFAULT_HOST,
+                 port: int = DEFAULT_PORT, poll_interval: float = 1.0,
+                 ignore_patterns: Optional[List[str]] = None,
+                 max_errors_per_category: Optional[int] = None):
+        self.project_root = Path(project_root)
+        self.validator = TemplateValidator(project_root, cache_parsed=True,
+                                           ignore_patterns=ignore_patterns)
+        self.host = host
+        self.port = port
+        self.poll_interval = poll_interval
+        self.max_errors_per_category = max_errors_per_category
+        self.file_order: List[Path] = []
+        self.results: Dict[Path, Tuple[bool, List, List]] = {}
+        self.snapshot: Dict[Path, Tuple[int, int]] = {}
+        self.lock = threading.Lock()
+        self.running = False
+        self.httpd: Optional[http.server.ThreadingHTTPServer] = None
+
+    def _take_snapshot(self) -> Tuple[List[Path], Dict[Path, Tuple[int, int]]]:
+        """Erfasst Projektdateien und Templates mit Änderungszeit und Größe"""
+        self.validator.get_index(rebuild=True)
+        project_files = self.validator.collect_project_files("all")
+        watched = set(project_files)
+        watched.update(self.validator.templates_dir.glob("template.*.yaml"))
+
+        snapshot = {}
+        for path in watched:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+
+        return project_files, snapshot
+
+    def affected_files(self, changed: Set[Path], project_files: Set[Path]) -> Set[Path]:
+        """Bestimmt geänderte Dateien und alle Dateien, die von ihnen abhängen"""
+        affected = changed & project_files
+
+        for path in changed:
+            if path.parent == self.validator.templates_dir:
+                affected.update(f for f in project_files
+                                if self.validator.get_template_for_file(f) == path)
+            elif path.name == "vocab.yaml":
+                # intent_mapping_consistency: Mappings prüfen gegen vocab.yaml
+                affected.update(f for f in project_files
+                                if self.validator.matches_subsystem(f, "mappings"))
+            elif classify(path.name) == "mode":
+                # buddy_flows_mode_consistency: Flows prüfen gegen Mode-Slugs
+                affected.update(f for f in project_files
+                                if self.validator.matches_subsystem(f, "flows"))
+
+        return affected
+
+    def refresh(self) -> int:
+        """Gleicht den Dateistand ab und validiert betroffene Dateien neu.
+
+        Nur hier wird der Dateiindex neu aufgebaut (beim Start und in jedem
+        Takt der Überwachung); Berichtsabfragen lesen die gespeicherten Ergebnisse.
+        """
+        with self.lock:
+            project_files, snapshot = self._take_snapshot()
+            changed = {path for path, key in snapshot.items() if self.snapshot.get(path) != key}
+            changed.update(set(self.snapshot) - set(snapshot))
+
+            if not changed:
+                return 0
+
+            for path in changed:
+                self.validator.invalidate(path)
+
+            project_set = set(project_files)
+            for path in set(self.results) - project_set:
+                del self.results[path]
+
+            affected = self.affected_files(changed, project_set)
+            for path in sorted(affected):
+                self.results[path] = self.validator.validate_file_isolated(path)
+
+            self.file_order = project_files
+            self.snapshot = snapshot
+
+            logger.info(f"Revalidated {len(affected)} file(s) after {len(changed)} change(s)")
+            return len(affected)
+
+    def generate_report(self, subsystem: str = "all") -> Dict[str, Any]:
+        """Erzeugt denselben Bericht wie ein einmaliger Validatorlauf"""
+        with self.lock:
+            errors, warnings = [], []
+            total_errors = 0
+            category_counts: Dict[str, int] = {}
+            suppressed: Dict[str, int] = {}
+
+            for path in self.file_order:
+                if path not in self.results or not self.validator.matches_subsystem(path, subsystem):
+                    continue
+                _, file_errors, file_warnings = self.results[path]
+                total_errors += len(file_errors)
+                warnings += file_warnings
+
+                # Kategorie-Limit wie im Einzellauf in Dateireihenfolge anwenden
+                for error in file_errors:
+                    error_type = error["error_type"]
+                    category_counts[error_type] = category_counts.get(error_type, 0) + 1
+                    if (self.max_errors_per_category
+                            and category_counts[error_type] > self.max_errors_per_category):
+                        suppressed[error_type] = suppressed.get(error_type, 0) + 1
+                    else:
+                        errors.append(error)
+
+        return {
+            "validation_summary": {
+                "total_errors": total_errors,
+                "total_warnings": len(warnings),
+                "validation_passed": total_errors == 0,
+                "suppressed_errors": suppressed
+            },
+            "errors": errors,
+            "warnings": warnings
+        }
+
+    def _watch_loop(self):
+        """Überwacht den Projektbaum per Polling"""
+        while self.running:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Error while revalidating project: {e}")
+            time.sleep(self.poll_interval)
+
+    def start(self):
+        """Startet Dateiüberwachung und HTTP-Schnittstelle"""
+        self.refresh()
+
+        self.httpd = http.server.ThreadingHTTPServer((self.host, self.port), ReportRequestHandler)
+        self.httpd.validation_daemon = self
+        self.port = self.httpd.server_address[1]
+        self.running = True
+
+        watch_thread = threading.Thread(target=self._watch_loop)
+        watch_thread.daemon = True
+        watch_thread.start()
+
+        server_thread = threading.Thread(target=self.httpd.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+
+        logger.info(f"Validation daemon listening on http://{self.host}:{self.port}")
+
+    def stop(self):
+        """Beendet den Dienst"""
+        self.running = False
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def serve_forever(self):
+        """Startet den Dienst und blockiert bis Ctrl+C"""
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        self.start()
+        try:
+            while self.running:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            logger.info("Received interrupt signal")
+        finally:
+            self.stop()
+
+
+class ReportRequestHandler(http.server.BaseHTTPRequestHandler):
+    """HTTP-Endpunkte /report und /health des Validierungsdienstes"""
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        daemon = self.server.validation_daemon
+
+        if parsed.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif parsed.path == "/report":
+            subsystem = parse_qs(parsed.query).get("subsystem", ["all"])[0]
+            self._send_json(200, daemon.generate_report(subsystem))
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint {parsed.path}"})
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+def fetch_report(subsystem: str = "all", host: str = DEFAULT_HOST,
+                 port: int = DEFAULT_PORT, timeout: float = 30) -> Dict[str, Any]:
+    """Fragt den Bericht eines laufenden Validierungsdienstes ab"""
+    url = f"http://{host}:{port}/report?subsystem={quote(subsystem)}"
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.load(response)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+RooCode Atomic File Output
+Ersetzt Zieldateien erst nach vollständigem Schreiben (temporäre Datei + rename)
+"""
+
+import os
+import stat
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Optional, Tuple, Union
+
+# Versuche, einen freien temporären Namen zu finden
+TEMP_NAME_ATTEMPTS = 100
+
+
+def existing_mode(file_path: Union[str, Path]) -> Optional[int]:
+    """Rechte des bisherigen Ziels; None, wenn es noch nicht existiert"""
+    try:
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        return None
+
+
+def create_temp(file_path: Path) -> Tuple[int, str]:
+    """Legt eine temporäre Datei neben dem Ziel an.
+
+    Anders als mkstemp (0600) mit 0o666, sodass das Betriebssystem die umask
+    beim Aufruf anwendet und eine neue Datei wie mit open() angelegt wirkt.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    for _ in range(TEMP_NAME_ATTEMPTS):
+        temp_name = str(file_path.parent / f".{file_path.name}.{os.urandom(6).hex()}.tmp")
+        try:
+            return os.open(temp_name, flags, 0o666), temp_name
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"No free temporary name for {file_path}")
+
+
+@contextmanager
+def atomic_output(file_path: Union[str, Path], binary: bool = False) -> Iterator[IO]:
+    """Schreibt in eine temporäre Datei im Zielverzeichnis und ersetzt das Ziel erst bei Erfolg.
+
+    Ein bestehendes Ziel behält seine Rechte, ein neues folgt der umask.
+    """
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = create_temp(file_path)
+    try:
+        with (os.fdopen(fd, 'wb') if binary else
+              os.fdopen(fd, 'w', encoding='utf-8', newline='')) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        mode = existing_mode(file_path)
+        if mode is not None:
+            os.chmod(temp_name, mode)
+        os.replace(temp_name, file_path)
+    except BaseException:
+        try:
+            os.unlink(temp_name)
+        except OSError:
+            pass
+        raise
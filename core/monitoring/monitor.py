@@ -6,6 +6,7 @@ Version: 1.0
 Created: 2025-06-29
 """
 
+import sys
 import json
 import time
 import yaml
@@ -21,6 +22,13 @@ import http.server
 import socketserver
 from urllib.parse import urlparse, parse_qs
 
+# Projekt-Root für Paketimporte verfügbar machen (Aufruf als Skript aus core/monitoring)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.vocab.vocab_store import VocabStore
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -53,6 +61,8 @@ class MetricsCollector:
         self.config = config
         self.docker_client = None
         self.metrics_history = {}
+        # Snapshot bleibt zwischen den Sammelläufen gemappt
+        self.vocab_store = VocabStore(PROJECT_ROOT / "core" / "vocab" / "vocab.yaml")
         
         # Initialize Docker client if available
         try:
@@ -192,18 +202,15 @@ class MetricsCollector:
             )
         
         # Check vocabulary file
-        vocab_file = project_root / "core" / "vocab" / "vocab.yaml"
-        if vocab_file.exists():
+        if self.vocab_store.vocab_path.exists():
             try:
-                with open(vocab_file, 'r', encoding='utf-8') as f:
-                    vocab_data = yaml.safe_load(f)
-                    intent_count = len(vocab_data.get('intents', []))
-                    
-                    metrics['application.vocabulary_size'] = MetricValue(
-                        value=intent_count,
-                        timestamp=datetime.now(),
-                        unit="count"
-                    )
+                intent_count = len(self.vocab_store.snapshot())
+                
+                metrics['application.vocabulary_size'] = MetricValue(
+                    value=intent_count,
+                    timestamp=datetime.now(),
+                    unit="count"
+                )
             except Exception as e:
                 logger.warning(f"Failed to read vocabulary file: {e}")
         
@@ -62,6 +62,14 @@ def sample_vocab():
         ]
     }
 
+@pytest.fixture(scope="function")
+def vocab_copy(tmp_path):
+    """Copy of core/vocab/vocab.yaml so its compiled snapshot is written to tmp_path."""
+    vocab_path = tmp_path / "repo-vocab" / "vocab.yaml"
+    vocab_path.parent.mkdir()
+    shutil.copy(project_root / "core" / "vocab" / "vocab.yaml", vocab_path)
+    return vocab_path
+
 @pytest.fixture(scope="session")
 def sample_transcript():
     """Provide sample transcript for testing."""
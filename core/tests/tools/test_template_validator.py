@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Tool-Tests für den Template-Validator
+Prüft Streaming-Parser und referenzielle Prüfungen des CI-Validators
+"""
+
+import io
+import json
+import pytest
+import yaml
+from pathlib import Path
+
+from core.ci.benchmark_validator import run_mode
+from core.ci.file_index import IgnoreRules, ProjectIndex
+from core.ci.json_stream import JsonStreamError, JsonStreamReader, iter_json_array
+from core.ci.report_writers import JsonLinesReportWriter, ReportWriter, SarifReportWriter
+from core.ci.synthetic_project import generate_project
+from core.ci.template_validator import TemplateValidator
+from core.ci.validator_daemon import ValidationDaemon, fetch_report
+
+
+def write_vocab(project_root: Path, intent_ids):
+    """Legt eine minimale vocab.yaml an"""
+    vocab_dir = project_root / "core" / "vocab"
+    vocab_dir.mkdir(parents=True, exist_ok=True)
+    intents = [{"id": intent_id, "label": intent_id, "created_on": "2025-06-29T00:00:00Z",
+                "origin": "test"} for intent_id in intent_ids]
+    with open(vocab_dir / "vocab.yaml", 'w', encoding='utf-8') as f:
+        yaml.dump({"intents": intents}, f)
+
+
+class TestJsonStreamReader:
+    """Test-Klasse für den inkrementellen JSON-Parser"""
+
+    def test_array_elements_across_chunk_boundaries(self):
+        """Prüft, dass Elemente über Puffergrenzen hinweg korrekt dekodiert werden"""
+        data = [{"turn_ref": f"user:{i}", "intent_id": None, "confidence": 12345 + i}
+                for i in range(200)]
+        reader = JsonStreamReader(io.StringIO(json.dumps(data)), chunk_size=7)
+
+        assert list(reader.iter_array()) == data
+        reader.expect_end()
+
+    def test_buffer_stays_bounded(self):
+        """Prüft, dass der Puffer nicht mit der Dateigröße wächst"""
+        data = [{"text": "x" * 100, "index": i} for i in range(5000)]
+        reader = JsonStreamReader(io.StringIO(json.dumps(data)), chunk_size=1024)
+
+        max_buffer = 0
+        for _ in reader.iter_array():
+            max_buffer = max(max_buffer, len(reader.buffer))
+
+        assert max_buffer < 4096, "Reader buffer grows with file size"
+
+    def test_streamed_object_member(self, tmp_path):
+        """Prüft das Streamen eines Arrays unter einem Objektschlüssel"""
+        export = {"conversation_id": "c1", "messages": [{"role": "user", "content": "Hi"}] * 3,
+                  "metadata": {"source": "test"}}
+        export_file = tmp_path / "sample.chat.json"
+        export_file.write_text(json.dumps(export), encoding='utf-8')
+
+        assert list(iter_json_array(export_file, key="messages")) == export["messages"]
+
+    def test_invalid_json_raises(self):
+        """Prüft, dass abgeschnittene Dateien als Fehler erkannt werden"""
+        reader = JsonStreamReader(io.StringIO('[{"a": 1}, {"a": '), chunk_size=4)
+
+        with pytest.raises(JsonStreamError):
+            list(reader.iter_array())
+
+
+class TestMappingValidation:
+    """Test-Klasse für die Prüfung von *.mapped.json gegen vocab.yaml"""
+
+    def test_unknown_intent_ids_reported(self, tmp_path):
+        """Prüft, dass unbekannte intent_id-Werte gemeldet werden"""
+        write_vocab(tmp_path, ["inform.question", "task.execute"])
+        mappings_dir = tmp_path / "data" / "mappings"
+        mappings_dir.mkdir(parents=True)
+        mapping = [
+            {"turn_ref": "user:0", "intent_id": "inform.question", "confidence": 0.9},
+            {"turn_ref": "agent:0", "intent_id": None, "confidence": None},
+            {"turn_ref": "user:1", "intent_id": "inform.unknown", "confidence": 0.8}
+        ]
+        (mappings_dir / "chat.mapped.json").write_text(json.dumps(mapping), encoding='utf-8')
+
+        validator = TemplateValidator(str(tmp_path))
+        assert not validator.validate_project("mappings")
+
+        assert len(validator.errors) == 1
+        assert validator.errors[0]["error_type"] == "unknown_intent_id"
+        assert validator.errors[0]["yaml_path"] == "[2].intent_id"
+
+    def test_unreadable_vocab_skips_intent_check(self, tmp_path):
+        """Prüft, dass ein defektes Vokabular gemeldet und nicht jede intent_id verworfen wird"""
+        write_vocab(tmp_path, ["task.execute", "task.execute"])
+        mappings_dir = tmp_path / "data" / "mappings"
+        mappings_dir.mkdir(parents=True)
+        mapping = [{"turn_ref": "user:0", "intent_id": "task.execute", "confidence": 0.9}]
+        (mappings_dir / "chat.mapped.json").write_text(json.dumps(mapping), encoding='utf-8')
+
+        validator = TemplateValidator(str(tmp_path))
+        assert not validator.validate_project("mappings")
+
+        assert [e["error_type"] for e in validator.errors] == ["vocab_load_error"]
+        assert "DUPLICATE_INTENT_ID" in validator.errors[0]["actual_value"]
+
+    def test_transcript_turn_fields_checked(self, tmp_path, sample_transcript):
+        """Prüft die Pflichtfeldprüfung für Transkript-Turns"""
+        transcripts_dir = tmp_path / "data" / "transcripts"
+        transcripts_dir.mkdir(parents=True)
+        broken = [dict(turn) for turn in sample_transcript]
+        del broken[1]["char_pos_end"]
+        (transcripts_dir / "chat.transcript.json").write_text(json.dumps(broken), encoding='utf-8')
+
+        validator = TemplateValidator(str(tmp_path))
+        assert not validator.validate_project("transcripts")
+        assert [e["yaml_path"] for e in validator.errors] == ["[1].char_pos_end"]
+
+    def test_flow_steps_must_reference_modes(self, tmp_path):
+        """Prüft, dass unbekannte Mode-Slugs in Flow-Schritten gemeldet werden"""
+        mode_dir = tmp_path / "core" / "modes" / "buddy"
+        mode_dir.mkdir(parents=True)
+        (mode_dir / "mode.buddy.yaml").write_text("slug: buddy\n", encoding='utf-8')
+        flows_path = mode_dir / "buddy-flows.yaml"
+
+        validator = TemplateValidator(str(tmp_path))
+        validator.validate_flow_references(flows_path,
+                                           {"flows": [{"id": "f", "steps": ["buddy", "ghost"]}]})
+
+        assert [(e["error_type"], e["yaml_path"], e["actual_value"]) for e in validator.errors] \
+            == [("unknown_mode_reference", "flows[0].steps[1]", "ghost")]
+
+
+def write_broken_mappings(project_root: Path, entries: int):
+    """Legt eine Mapping-Datei an, deren Intents alle unbekannt sind"""
+    write_vocab(project_root, ["inform.question"])
+    mappings_dir = project_root / "data" / "mappings"
+    mappings_dir.mkdir(parents=True, exist_ok=True)
+    mapping = [{"turn_ref": f"user:{i}", "intent_id": "unknown.intent", "confidence": 0.9}
+               for i in range(entries)]
+    (mappings_dir / "chat.mapped.json").write_text(json.dumps(mapping), encoding='utf-8')
+
+
+class TestStreamingReports:
+    """Test-Klasse für JSONL/SARIF-Ausgabe und Fehlerlimits je Kategorie"""
+
+    def test_category_cap_counts_suppressed_errors(self, tmp_path):
+        """Prüft, dass Fehler über dem Limit gezählt, aber nicht gespeichert werden"""
+        write_broken_mappings(tmp_path, 25)
+
+        validator = TemplateValidator(str(tmp_path), max_errors_per_category=10)
+        validator.validate_project("mappings")
+        summary = validator.generate_report()["validation_summary"]
+
+        assert len(validator.errors) == 10
+        assert summary["total_errors"] == 25
+        assert summary["suppressed_errors"] == {"unknown_intent_id": 15}
+
+    def test_jsonl_streams_without_retaining_results(self, tmp_path):
+        """Prüft, dass JSONL-Einträge sofort geschrieben und nicht gesammelt werden"""
+        write_broken_mappings(tmp_path, 5)
+        stream = io.StringIO()
+        writer = JsonLinesReportWriter(stream)
+
+        validator = TemplateValidator(str(tmp_path), reporter=writer, retain_results=False)
+        validator.validate_project("mappings")
+        assert validator.errors == [], "Streaming mode must not keep an error list"
+        assert len(stream.getvalue().splitlines()) == 5, "Errors not written as found"
+
+        writer.close(validator.generate_report()["validation_summary"])
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [r["record"] for r in records] == ["error"] * 5 + ["summary"]
+        assert records[-1]["total_errors"] == 5
+
+    def test_sarif_output_is_valid_document(self, tmp_path):
+        """Prüft, dass der gestreamte SARIF-Bericht ein gültiges Dokument ergibt"""
+        write_broken_mappings(tmp_path, 3)
+        stream = io.StringIO()
+        writer = SarifReportWriter(stream, tmp_path)
+
+        validator = TemplateValidator(str(tmp_path), reporter=writer, retain_results=False)
+        validator.validate_project("mappings")
+        writer.close(validator.generate_report()["validation_summary"])
+
+        sarif = json.loads(stream.getvalue())
+        run = sarif["runs"][0]
+        assert sarif["version"] == "2.1.0"
+        assert len(run["results"]) == 3
+        assert run["tool"]["driver"]["rules"][0]["id"] == "unknown_intent_id"
+        uri = run["results"][0]["locations"][0]["physicalLocation"]["artifactLocation"]["uri"]
+        assert uri == "data/mappings/chat.mapped.json"
+
+    def test_incomplete_writer_cannot_be_instantiated(self):
+        """Prüft, dass ein Writer ohne alle Methoden schon beim Anlegen scheitert"""
+        class ErrorsOnlyWriter(ReportWriter):
+            def write_error(self, error):
+                pass
+
+        with pytest.raises(TypeError):
+            ErrorsOnlyWriter(io.StringIO())
+
+
+class TestProjectIndex:
+    """Test-Klasse für Dateisuche und Subsystem-Index"""
+
+    def test_ignore_rules_gitignore_semantics(self):
+        """Prüft Verankerung, Verzeichnismuster, Negation und **"""
+        rules = IgnoreRules(["/models/", "*.tmp", "!keep.tmp", "data/**/raw/", "cache/"])
+
+        assert rules.is_ignored("models", is_dir=True)
+        assert not rules.is_ignored("core/models", is_dir=True)
+        assert not rules.is_ignored("models", is_dir=False)
+        assert rules.is_ignored("core/scratch.tmp", is_dir=False)
+        assert not rules.is_ignored("core/keep.tmp", is_dir=False)
+        assert rules.is_ignored("data/a/b/raw", is_dir=True)
+        assert rules.is_ignored("core/deep/cache", is_dir=True)
+
+    def test_index_prunes_ignored_directories(self, tmp_path):
+        """Prüft, dass ignorierte Verzeichnisse nicht betreten werden"""
+        for rel_path in ["core/modes/mode.demo.yaml", "core/modes/spec.demo.yaml",
+                         "core/vocab/vocab.yaml", "core/templates/template.mode.yaml",
+                         "data/mappings/a.mapped.json", "models/big/mode.shadow.yaml",
+                         ".git/objects/x.yaml", "extra/skip/mode.other.yaml"]:
+            target = tmp_path / rel_path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text("{}", encoding='utf-8')
+
+        index = ProjectIndex(tmp_path, ["extra/skip/"]).build()
+
+        assert [p.name for p in index.get("mode")] == ["mode.demo.yaml"]
+        assert [p.name for p in index.get("mappings")] == ["a.mapped.json"]
+        assert [p.name for p in index.get("template")] == ["template.mode.yaml"]
+        assert not index.get("yaml"), ".git and models must not be indexed"
+
+    def test_subsystems_share_single_walk(self, tmp_path, monkeypatch):
+        """Prüft, dass alle Subsysteme denselben Index verwenden"""
+        write_vocab(tmp_path, ["inform.question"])
+        builds = []
+        original_build = ProjectIndex.build
+        monkeypatch.setattr(ProjectIndex, "build",
+                            lambda self: builds.append(1) or original_build(self))
+
+        validator = TemplateValidator(str(tmp_path))
+        for subsystem in ["vocab", "modes", "flows", "mappings", "transcripts", "all"]:
+            validator.validate_project(subsystem)
+
+        assert len(builds) == 1
+
+
+class TestValidationDaemon:
+    """Test-Klasse für den residenten Validierungsdienst"""
+
+    @pytest.fixture
+    def mapped_project(self, tmp_path):
+        """Projekt mit Vokabular und einer Mapping-Datei"""
+        write_vocab(tmp_path, ["inform.question"])
+        mappings_dir = tmp_path / "data" / "mappings"
+        mappings_dir.mkdir(parents=True)
+        mapping = [{"turn_ref": "user:0", "intent_id": "task.execute", "confidence": 0.9}]
+        (mappings_dir / "chat.mapped.json").write_text(json.dumps(mapping), encoding='utf-8')
+        return tmp_path
+
+    def test_report_matches_single_run(self, mapped_project):
+        """Prüft, dass der Daemon denselben Bericht wie ein Einzellauf liefert"""
+        validator = TemplateValidator(str(mapped_project))
+        validator.validate_project("all")
+
+        daemon = ValidationDaemon(str(mapped_project), port=0, poll_interval=60)
+        daemon.start()
+        try:
+            report = fetch_report("all", port=daemon.port)
+        finally:
+            daemon.stop()
+
+        assert report == json.loads(json.dumps(validator.generate_report()))
+
+    def test_report_served_from_cache(self, mapped_project, monkeypatch):
+        """Prüft, dass Berichtsabfragen den Index nicht neu aufbauen"""
+        daemon = ValidationDaemon(str(mapped_project), port=0, poll_interval=60)
+        daemon.start()
+        builds = []
+        original_build = ProjectIndex.build
+        monkeypatch.setattr(ProjectIndex, "build",
+                            lambda self: builds.append(1) or original_build(self))
+        try:
+            first = fetch_report("all", port=daemon.port)
+            second = fetch_report("mappings", port=daemon.port)
+        finally:
+            daemon.stop()
+
+        assert builds == []
+        assert first == json.loads(json.dumps(daemon.generate_report("all")))
+        assert second["validation_summary"]["total_errors"] == 1
+
+    def test_vocab_change_revalidates_dependent_mappings(self, mapped_project):
+        """Prüft, dass eine Vokabeländerung abhängige Mappings neu validiert"""
+        daemon = ValidationDaemon(str(mapped_project), poll_interval=60)
+        daemon.refresh()
+        assert daemon.generate_report("mappings")["validation_summary"]["total_errors"] == 1
+
+        write_vocab(mapped_project, ["inform.question", "task.execute", "zzz.padding"])
+        revalidated = daemon.refresh()
+
+        assert revalidated == 2, "Expected vocab.yaml and its dependent mapping file"
+        assert daemon.generate_report("mappings")["validation_summary"]["validation_passed"]
+        assert daemon.refresh() == 0, "Unchanged tree must not trigger revalidation"
+
+
+class TestValidatorBenchmark:
+    """Test-Klasse für synthetische Projekte und den parallelen Validierungsmodus"""
+
+    def test_parallel_report_matches_serial(self, tmp_path):
+        """Prüft, dass der Prozesspool denselben Bericht wie ein serieller Lauf liefert"""
+        generate_project(tmp_path, scale=3, error_rate=0.3)
+
+        serial = TemplateValidator(str(tmp_path), max_errors_per_category=2)
+        serial_passed = serial.validate_project("all")
+        parallel = TemplateValidator(str(tmp_path), max_errors_per_category=2)
+        parallel_passed = parallel.validate_project("all", jobs=2)
+
+        assert not serial_passed, "Synthetic project should contain injected errors"
+        assert parallel_passed == serial_passed
+        assert parallel.generate_report() == serial.generate_report()
+
+    def test_benchmark_phases_cover_project(self, tmp_path):
+        """Prüft, dass alle Phasen gemessen werden und die Dateien vollständig abdecken"""
+        counts = generate_project(tmp_path, scale=2)
+
+        result = run_mode(tmp_path, jobs=1)
+        phases = result["phases"]
+
+        assert list(phases) == ["discovery", "parsing", "template_checks", "referential_checks"]
+        assert phases["discovery"]["files"] == (
+            phases["template_checks"]["files"] + phases["referential_checks"]["files"])
+        assert phases["referential_checks"]["files"] == counts["flows"] + counts["mappings"]
+        assert counts["intents"] == 20
+        assert result["peak_rss_mb"]["self"] is None or result["peak_rss_mb"]["self"] > 0
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für das atomare Ersetzen von Ausgabedateien
+Prüft Dateirechte und das Aufräumen nach Fehlern
+"""
+
+import os
+
+import pytest
+
+from core.common.atomic_file import atomic_output
+
+
+class TestAtomicOutput:
+    """Test-Klasse für atomic_output"""
+
+    def test_new_file_follows_current_umask(self, tmp_path):
+        """Prüft, dass die umask zum Zeitpunkt des Schreibens gilt, nicht beim Import"""
+        target = tmp_path / "out.json"
+        previous = os.umask(0o027)
+        try:
+            with atomic_output(target) as f:
+                f.write("[]")
+        finally:
+            os.umask(previous)
+        assert target.stat().st_mode & 0o777 == 0o640
+
+    def test_existing_file_keeps_mode(self, tmp_path):
+        """Prüft, dass ein ersetztes Ziel seine Rechte behält"""
+        target = tmp_path / "out.bin"
+        target.write_bytes(b"old")
+        target.chmod(0o600)
+        with atomic_output(target, binary=True) as f:
+            f.write(b"new")
+        assert target.read_bytes() == b"new"
+        assert target.stat().st_mode & 0o777 == 0o600
+
+    def test_failed_write_leaves_target(self, tmp_path):
+        """Prüft, dass ein Fehler das Ziel unverändert lässt und keine Temp-Datei zurückbleibt"""
+        target = tmp_path / "out.json"
+        target.write_text("old", encoding='utf-8')
+        with pytest.raises(RuntimeError):
+            with atomic_output(target) as f:
+                f.write("partial")
+                raise RuntimeError("abort")
+        assert target.read_text(encoding='utf-8') == "old"
+        assert [path.name for path in tmp_path.iterdir()] == ["out.json"]
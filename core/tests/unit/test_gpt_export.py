@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für den GPT-Export-Splitter
+Prüft Linearisierung des aktiven Zweigs und parallele Ausgabe je Konversation
+"""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from core.agents.gpt_export import linearize_active_branch, split_export
+
+
+def node(node_id, parent, children, role=None, text=None, content_type="text"):
+    """Nachrichtenknoten im Format des GPT-Exports"""
+    message = None
+    if role is not None:
+        message = {"id": node_id, "author": {"role": role},
+                   "content": {"content_type": content_type, "parts": [text]}}
+    return {"id": node_id, "message": message, "parent": parent, "children": children}
+
+
+def branched_conversation(conversation_id="conv-a"):
+    """Konversation mit bearbeiteter Nutzerfrage; aktiv ist der zweite Zweig"""
+    mapping = {
+        "root": node("root", None, ["sys"]),
+        "sys": node("sys", "root", ["u1", "u1b"], "system", ""),
+        "u1": node("u1", "sys", ["a1"], "user", "Erste Frage"),
+        "a1": node("a1", "u1", [], "assistant", "Antwort auf die erste Frage"),
+        "u1b": node("u1b", "sys", ["t1"], "user", "Bearbeitete Frage"),
+        "t1": node("t1", "u1b", ["a1b"], "tool", "search results"),
+        "a1b": node("a1b", "t1", [], "assistant", "Antwort auf die bearbeitete Frage")
+    }
+    return {"conversation_id": conversation_id, "title": "Test", "mapping": mapping,
+            "current_node": "a1b"}
+
+
+class TestGptExport:
+    """Test-Klasse für die Zerlegung von GPT-Exporten"""
+
+    def test_active_branch_only(self):
+        """Prüft, dass nur der aktive Zweig ohne Tool- und Leer-Nachrichten übernommen wird"""
+        messages = linearize_active_branch(branched_conversation())
+
+        assert messages == [
+            {"role": "user", "content": "Bearbeitete Frage"},
+            {"role": "assistant", "content": "Antwort auf die bearbeitete Frage"}
+        ]
+
+    def test_missing_current_node_uses_latest_branch(self):
+        """Prüft den Rückfall auf den jüngsten Zweig ohne current_node"""
+        conversation = branched_conversation()
+        del conversation["current_node"]
+
+        messages = linearize_active_branch(conversation)
+        assert messages[0]["content"] == "Bearbeitete Frage"
+
+    def test_deep_conversation_without_recursion(self):
+        """Prüft, dass sehr tiefe Bäume ohne Rekursionsgrenze linearisiert werden"""
+        depth = 20000
+        mapping = {}
+        for i in range(depth):
+            role = "user" if i % 2 == 0 else "assistant"
+            mapping[f"n{i}"] = node(f"n{i}", f"n{i - 1}" if i else None,
+                                    [f"n{i + 1}"] if i + 1 < depth else [], role, f"Turn {i}")
+        conversation = {"id": "deep", "mapping": mapping, "current_node": f"n{depth - 1}"}
+
+        messages = linearize_active_branch(conversation)
+        assert len(messages) == depth
+        assert messages[-1]["content"] == f"Turn {depth - 1}"
+
+    def test_parallel_split_matches_serial(self, tmp_path):
+        """Prüft je Konversation ein Transkript, parallel identisch zum seriellen Lauf"""
+        conversations = [branched_conversation(f"conv-{i}") for i in range(5)]
+        conversations.append({"conversation_id": "empty", "mapping": {}, "current_node": None})
+        export_file = tmp_path / "account.gpt-export.json"
+        export_file.write_text(json.dumps(conversations), encoding='utf-8')
+
+        serial = split_export(export_file, tmp_path / "serial")
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            parallel = split_export(export_file, tmp_path / "parallel", pool, max_pending=2)
+
+        assert [r["status"] for r in serial] == ["success"] * 5 + ["failed"]
+        assert [r["conversation_id"] for r in parallel] == [r["conversation_id"] for r in serial]
+        for i in range(5):
+            name = f"account.conv-{i}.transcript.json"
+            assert (tmp_path / "serial" / name).read_bytes() == \
+                (tmp_path / "parallel" / name).read_bytes()
+
+        turns = json.loads((tmp_path / "serial" / "account.conv-0.transcript.json").read_text())
+        assert [t["speaker"] for t in turns] == ["user", "agent"]
+        assert turns[1]["char_pos_start"] == len("Bearbeitete Frage") + 1
+
+    def test_conversations_under_object_key(self, tmp_path):
+        """Prüft Exporte, die die Konversationen unter 'conversations' enthalten"""
+        export_file = tmp_path / "wrapped.gpt-export.json"
+        export_file.write_text(json.dumps({"conversations": [branched_conversation()],
+                                           "exported_at": "2025-06-29"}), encoding='utf-8')
+
+        results = split_export(export_file, tmp_path / "out")
+        assert [r["status"] for r in results] == ["success"]
+        assert (tmp_path / "out" / "wrapped.conv-a.transcript.json").exists()
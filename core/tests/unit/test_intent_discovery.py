@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für die Intent-Discovery
+Prüft unmapped-Auswahl, MinHash/LSH-Clustering und einen Vorschlag je Cluster
+"""
+
+import json
+
+import yaml
+
+from core.agents.intent_discovery import (DiscoverySettings, UnmappedTurn, cluster_turns,
+                                          collect_unmapped, discover)
+
+
+class RecordingDrafter:
+    """Ersetzt den LLM-Entwurf und zählt die Anfragen"""
+
+    def __init__(self):
+        self.clusters = []
+
+    def draft(self, cluster):
+        self.clusters.append(cluster)
+        return f"Draft {len(self.clusters)}", "Drafted from cluster"
+
+
+def turn(text, index, transcript_file="chat.transcript.json"):
+    return UnmappedTurn(transcript_file, "user", index, text)
+
+
+WEATHER = ["Wie wird das Wetter morgen in Berlin?", "wie wird das wetter morgen in berlin",
+           "Wie wird das Wetter morgen in Bern?"]
+INVOICE = ["Bitte schick mir die Rechnung vom März als PDF",
+           "Bitte schicke mir die Rechnung vom März als PDF."]
+
+
+class TestIntentDiscovery:
+    """Test-Klasse für die Vorschlagserzeugung aus unmapped Turns"""
+
+    def test_near_duplicates_share_a_cluster(self):
+        """Prüft, dass Varianten zusammenfallen und verschiedene Anliegen getrennt bleiben"""
+        turns = [turn(text, i) for i, text in
+                 enumerate([WEATHER[0], INVOICE[0], WEATHER[1], "Danke!", INVOICE[1], WEATHER[2]])]
+
+        clusters = cluster_turns(turns, DiscoverySettings(clustering_enabled=True))
+
+        assert [[t.index for t in cluster] for cluster in clusters] == [[0, 2, 5], [1, 4], [3]]
+        assert cluster_turns(turns, DiscoverySettings()) == [[t] for t in turns], \
+            "Without clustering every turn is its own suggestion"
+
+    def test_one_suggestion_per_cluster(self, tmp_path, vocab_copy):
+        """Prüft Vorschlagsdateien mit allen source_turns und einen Entwurf je Cluster"""
+        texts = WEATHER + INVOICE
+        transcript = [{"speaker": "user", "index": i, "text": text}
+                      for i, text in enumerate(texts + ["Status bitte"])]
+        (tmp_path / "chat.transcript.json").write_text(json.dumps(transcript), encoding='utf-8')
+        mappings = [{"turn_ref": f"user:{i}", "intent_id": None, "confidence": 0.2}
+                    for i in range(len(texts))]
+        mappings.append({"turn_ref": f"user:{len(texts)}", "intent_id": "system.status",
+                         "confidence": 0.9})
+        mapping_path = tmp_path / "chat.mapped.json"
+        mapping_path.write_text(json.dumps(mappings), encoding='utf-8')
+        drafter = RecordingDrafter()
+
+        summary = discover([mapping_path], tmp_path, tmp_path / "suggestions",
+                           DiscoverySettings(clustering_enabled=True), drafter,
+                           created_on="2025-06-29T00:00:00Z", vocab_path=vocab_copy)
+
+        assert summary == {"unmapped_turns_count": 5, "suggestions_count": 2,
+                           "already_suggested_count": 0}
+        assert len(drafter.clusters) == 2
+        files = sorted((tmp_path / "suggestions").glob("*.yaml"))
+        assert [f.name for f in files] == ["2025-06-29_chat-00001.yaml", "2025-06-29_chat-00002.yaml"]
+        first = yaml.safe_load(files[0].read_text(encoding='utf-8'))
+        assert first["suggested_id"] == "inform.uncategorized.00001"
+        assert first["source_turn"] == "user:0"
+        assert [m["source_turn"] for m in first["source_turns"]] == ["user:0", "user:1", "user:2"]
+
+        transcript.append({"speaker": "user", "index": len(transcript), "text": "Neues Thema"})
+        (tmp_path / "chat.transcript.json").write_text(json.dumps(transcript), encoding='utf-8')
+        mapping_path.write_text(json.dumps(mappings + [{"turn_ref": f"user:{len(texts) + 1}",
+                                                        "intent_id": None}]), encoding='utf-8')
+        again = discover([mapping_path], tmp_path, tmp_path / "suggestions",
+                         DiscoverySettings(clustering_enabled=True),
+                         created_on="2025-06-30T00:00:00Z", vocab_path=vocab_copy)
+        assert again == {"unmapped_turns_count": 6, "suggestions_count": 1,
+                         "already_suggested_count": 5}, "Suggested turns must not repeat"
+        assert [f.name for f in (tmp_path / "suggestions").glob("2025-06-30_*.yaml")] == \
+            ["2025-06-30_chat-00003.yaml"]
+
+    def test_join_streams_pairs_in_parallel(self, tmp_path):
+        """Prüft den Abgleich über turn_ref, parallel wie seriell und ohne Transkript"""
+        for name in ("a", "b", "c"):
+            transcript = [{"speaker": speaker, "index": i, "text": f"{name} {speaker} {i}"}
+                          for i in range(50) for speaker in ("user", "agent")]
+            mappings = [{"turn_ref": f"{t['speaker']}:{t['index']}",
+                         "intent_id": None if t["index"] % 7 == 0 else "task.execute",
+                         "confidence": 0.5} for t in reversed(transcript)]
+            (tmp_path / f"{name}.mapped.json").write_text(json.dumps(mappings), encoding='utf-8')
+            if name != "c":
+                (tmp_path / f"{name}.transcript.json").write_text(json.dumps(transcript),
+                                                                  encoding='utf-8')
+        mapping_paths = sorted(tmp_path.glob("*.mapped.json"), reverse=True)
+
+        serial = collect_unmapped(mapping_paths, tmp_path, jobs=1)
+
+        assert [t.text for t in serial[:4]] == ["a user 0", "a agent 0", "a user 7", "a agent 7"]
+        assert len(serial) == 2 * 2 * 8, "Pair without transcript must be skipped"
+        assert collect_unmapped(mapping_paths, tmp_path, jobs=2) == serial
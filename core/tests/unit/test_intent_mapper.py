@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für die Intent-Mapper-Engine
+Prüft Embedding-Cache, Schwellwert, Rundung, alphabetische Gleichstandsregel und LLM-Klassifikation
+"""
+
+import json
+import math
+import time
+import threading
+
+import numpy as np
+import pytest
+
+from core.agents.intent_mapper import (EmbeddingClassifier, EmbeddingIndex, HashingEmbedder,
+                                       IntentMapper, LlmClassifier, MapperSettings, MappingError,
+                                       answer_length, intent_grammar, load_vocabulary,
+                                       UncachedResult, mapping_path_for)
+from core.agents.llm_client import LlmClientError
+from core.agents.mapping_cache import MappingCache
+
+
+class CountingEmbedder(HashingEmbedder):
+    """Hashing-Embedder, der die eingebetteten Texte mitzählt"""
+
+    def __init__(self):
+        super().__init__(dimension=256)
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(len(texts))
+        return super().embed(texts)
+
+
+class FixedEmbedder:
+    """Liefert vorgegebene Vektoren je Text"""
+    name = "fixed"
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed(self, texts):
+        return np.array([self.vectors[text] for text in texts], dtype=np.float32)
+
+
+class FakeClient:
+    """Ersetzt den llama.cpp-Server für LLM-Klassifikator-Tests.
+
+    Antworten kommen aus einer festen Folge (Exceptions darin werden geworfen)
+    oder mit ``respond`` aus dem Prompt; gleichzeitige Anfragen werden wie an
+    parallele Server-Slots gezählt.
+    """
+    name = "fake"
+
+    def __init__(self, answers=(), respond=None, parallel_slots=1, context_tokens=2048,
+                 delay=0.0):
+        self.answers = list(answers)
+        self.respond = respond
+        self.parallel_slots = parallel_slots
+        self.context_tokens = context_tokens
+        self.slot_context_tokens = context_tokens // parallel_slots
+        self.delay = delay
+        self.prompts = []
+        self.parameters = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def complete(self, prompt, **parameters):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.prompts.append(prompt)
+            self.parameters.append(parameters)
+            answer = self.respond(prompt) if self.respond else self.answers.pop(0)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if isinstance(answer, Exception):
+            raise answer
+        return answer if isinstance(answer, dict) else {"content": answer}
+
+
+def prompt_probabilities(prompt):
+    """Schlüssel-Wahrscheinlichkeiten, die nur vom Prompt abhängen"""
+    weight = len(prompt) % 7 / 10
+    return {"completion_probabilities": [{"probs": [
+        {"tok_str": "A", "prob": 0.4 + weight}, {"tok_str": "B", "prob": 0.4 + weight},
+        {"tok_str": "0", "prob": 0.2}]}]}
+
+
+def intent(intent_id, label, description=None):
+    """Vokabulareintrag mit Pflichtfeldern"""
+    return {"id": intent_id, "label": label, "description": description,
+            "created_on": "2025-06-28T00:00:00Z", "origin": "manual"}
+
+
+def embedding_mapper(intents, embedder, settings=None):
+    """Mapper mit Embedding-Klassifikator ohne Plattencache"""
+    settings = settings or MapperSettings()
+    classifier = EmbeddingClassifier(EmbeddingIndex.build(intents, embedder, None), embedder,
+                                     settings)
+    return IntentMapper(classifier, settings)
+
+
+def turns_for(texts):
+    """Turns mit wechselnden Speakern"""
+    return [{"speaker": "user" if i % 2 == 0 else "agent", "index": i // 2, "text": text}
+            for i, text in enumerate(texts)]
+
+
+class TestIntentMapper:
+    """Test-Klasse für die semantische Intent-Zuordnung"""
+
+    def test_vocabulary_embedded_once_and_cached(self, tmp_path, vocab_copy):
+        """Prüft, dass die Vokabularmatrix nach Inhalts-Hash wiederverwendet wird"""
+        intents = load_vocabulary(vocab_copy)
+        embedder = CountingEmbedder()
+
+        first = EmbeddingIndex.build(intents, embedder, tmp_path)
+        second = EmbeddingIndex.build(intents, embedder, tmp_path)
+        assert embedder.calls == [len(intents)], "Cached vocabulary embedded again"
+        assert np.array_equal(first.matrix, second.matrix)
+        assert first.intent_ids == sorted(first.intent_ids)
+
+        changed = intents + [intent("smalltalk.greeting", "Greeting")]
+        EmbeddingIndex.build(changed, embedder, tmp_path)
+        assert embedder.calls == [len(intents), len(changed)]
+        assert len(list(tmp_path.glob("*.npy"))) == 2
+
+    def test_turns_embedded_in_batches(self, vocab_copy):
+        """Prüft Stapel-Embedding und die Abbildung identischer Formulierungen"""
+        intents = load_vocabulary(vocab_copy)
+        embedder = CountingEmbedder()
+        mapper = embedding_mapper(intents, embedder, MapperSettings(batch_size=4))
+        texts = ["System Status Inquiry. User requests information about system state or health",
+                 "zzz qqq"] + [f"Nachricht {i}" for i in range(8)]
+
+        mappings = mapper.map_turns(turns_for(texts))
+
+        assert embedder.calls[1:] == [4, 4, 2]
+        assert [m["turn_ref"] for m in mappings[:3]] == ["user:0", "agent:0", "user:1"]
+        assert mappings[0] == {"turn_ref": "user:0", "intent_id": "system.status",
+                               "confidence": 1.0}
+        assert mappings[1]["intent_id"] is None, "Below threshold must map to null"
+
+    def test_threshold_rounding_and_alphabetical_ties(self):
+        """Prüft Schwellwert 0.7, drei Nachkommastellen und Gleichstand nach ID"""
+        vectors = {"Zeta": [1.0, 0.0], "Alpha": [1.0, 0.0], "Beta": [0.0, 1.0],
+                   "tie": [1.0, 0.0], "near": [0.7, 0.71414284], "low": [0.6, 0.8]}
+        embedder = FixedEmbedder(vectors)
+        intents = [intent("zeta.intent", "Zeta"), intent("alpha.intent", "Alpha"),
+                   intent("beta.intent", "Beta")]
+        settings = MapperSettings(include_candidates=True, max_candidates=2)
+        mapper = embedding_mapper(intents, embedder, settings)
+
+        tie, near, low = mapper.map_turns(turns_for(["tie", "near", "low"]))
+
+        assert tie["intent_id"] == "alpha.intent"
+        assert [c["intent_id"] for c in tie["candidates"]] == ["alpha.intent", "zeta.intent"]
+        assert (near["intent_id"], near["confidence"]) == ("beta.intent", 0.714)
+        assert near["candidates"][1] == {"intent_id": "alpha.intent", "confidence": 0.7}
+        assert (low["intent_id"], low["confidence"]) == ("beta.intent", 0.8)
+
+    def test_map_file_and_errors(self, tmp_path, vocab_copy):
+        """Prüft Ausgabedatei und Fehlercodes für Vokabular und Transkript"""
+        vocab_file = tmp_path / "vocab.yaml"
+        vocab_file.write_text("intents: []\n", encoding='utf-8')
+        with pytest.raises(MappingError) as error:
+            load_vocabulary(vocab_file)
+        assert error.value.code == "VOCABULARY_EMPTY"
+
+        duplicate = {"intents": [intent("a.b", "A"), intent("a.b", "B")]}
+        vocab_file.write_text(json.dumps(duplicate), encoding='utf-8')
+        with pytest.raises(MappingError) as error:
+            load_vocabulary(vocab_file)
+        assert error.value.code == "DUPLICATE_INTENT_ID"
+
+        embedder = HashingEmbedder()
+        settings = MapperSettings.from_config()
+        settings.memo_cache_path = str(tmp_path / "memo.sqlite3")
+        mapper = IntentMapper.from_config(embedder, vocab_copy, settings=settings, cache_dir=None)
+        transcript = tmp_path / "chat.transcript.json"
+        transcript.write_text(json.dumps(turns_for(["Task Execution Request"])), encoding='utf-8')
+        output = mapping_path_for(transcript, tmp_path / "mappings")
+
+        summary = mapper.map_file(transcript, output)
+
+        assert output.name == "chat.mapped.json"
+        assert json.loads(output.read_text(encoding='utf-8'))[0]["intent_id"] == "task.execute"
+        assert summary["intents_mapped_count"] == 1
+
+        transcript.write_text("[]", encoding='utf-8')
+        with pytest.raises(MappingError) as error:
+            mapper.map_file(transcript, output)
+        assert error.value.code == "TRANSCRIPT_EMPTY"
+
+    def test_streaming_matches_in_memory(self, tmp_path, vocab_copy):
+        """Prüft, dass große Transkripte fensterweise identisch gemappt werden"""
+        texts = ["Task Execution Request", "Danke!", "danke! ", "System Status Inquiry"] * 30
+        transcript = tmp_path / "long.transcript.json"
+        transcript.write_text(json.dumps(turns_for(texts)), encoding='utf-8')
+        embedder = CountingEmbedder()
+        intents = load_vocabulary(vocab_copy)
+
+        in_memory = embedding_mapper(intents, embedder)
+        expected = in_memory.map_file(transcript, tmp_path / "memory.mapped.json")
+        streaming = embedding_mapper(intents, embedder,
+                                     MapperSettings(streaming_threshold=10, streaming_window=7))
+        embedder.calls.clear()
+        summary = streaming.map_file(transcript, tmp_path / "stream.mapped.json")
+
+        assert (tmp_path / "stream.mapped.json").read_bytes() == \
+            (tmp_path / "memory.mapped.json").read_bytes()
+        assert summary == expected
+        assert sum(embedder.calls) == 3, "Repeated turns classified again across windows"
+
+        transcript.write_text(json.dumps(turns_for(texts))[:-40], encoding='utf-8')
+        with pytest.raises(MappingError) as error:
+            streaming.map_file(transcript, tmp_path / "stream.mapped.json")
+        assert error.value.code == "TRANSCRIPT_INVALID_FORMAT"
+        assert json.loads((tmp_path / "stream.mapped.json").read_text(encoding='utf-8')) == \
+            json.loads((tmp_path / "memory.mapped.json").read_text(encoding='utf-8'))
+
+    def test_settings_follow_mode_configuration(self):
+        """Prüft Schwellwert, Kandidaten und Cache aus Mode und Spezifikation"""
+        settings = MapperSettings.from_config()
+        assert settings.confidence_threshold == 0.7
+        assert settings.max_candidates == 3
+        assert settings.decimal_places == 3
+        assert settings.cache_enabled is True
+
+
+class TestIntentGrammar:
+    """Test-Klasse für GBNF-Grammatiken aus Kandidaten-IDs"""
+
+    def test_grammar_lists_candidates_and_null(self):
+        """Prüft, dass genau die Kandidaten, null und eine Konfidenz in [0, 1] zulässig sind"""
+        grammar = intent_grammar(("confirm.approval", "task.execute"))
+
+        assert 'intent ::= "null" | "\\"confirm.approval\\"" | "\\"task.execute\\""' in grammar
+        assert 'confidence ::= "0." [0-9] [0-9] [0-9] | "1.000"' in grammar
+        assert grammar.startswith('root ::= "{\\"intent_id\\": " intent')
+
+    def test_grammar_cached_per_candidate_set(self):
+        """Prüft, dass dieselbe Kandidatenmenge nur einmal übersetzt wird"""
+        intent_grammar.cache_clear()
+        intent_grammar(("a.b", "c.d"))
+        intent_grammar(("a.b", "c.d"))
+        intent_grammar(("a.b",))
+
+        info = intent_grammar.cache_info()
+        assert (info.hits, info.misses) == (1, 2)
+
+    def test_request_carries_grammar_and_token_bound(self, vocab_copy):
+        """Prüft, dass jede Anfrage die Grammatik und ein knappes n_predict mitschickt"""
+        longest_answer = json.dumps({"intent_id": "confirm.approval", "confidence": 0.123})
+        client = FakeClient(['{"intent_id": "confirm.approval", "confidence": 0.912}'])
+        classifier = LlmClassifier.build(load_vocabulary(vocab_copy), client, MapperSettings(),
+                                         cache_dir=None)
+
+        result = classifier.classify(["Please confirm the approval"])[0]
+
+        assert result == {"intent_id": "confirm.approval", "confidence": 0.912}
+        parameters = client.parameters[0]
+        candidate_ids = [line[2:].split(":")[0] for line in client.prompts[0].splitlines()
+                         if line.startswith("- ")]
+        assert parameters["grammar"] == intent_grammar(tuple(candidate_ids))
+        assert parameters["n_predict"] == answer_length(candidate_ids)
+        assert parameters["n_predict"] >= len(longest_answer)
+        assert parameters["temperature"] == 0.0
+
+
+class TestLogprobScoring:
+    """Test-Klasse für die Bewertung aller Kandidaten über Token-Wahrscheinlichkeiten"""
+
+    @pytest.fixture(autouse=True)
+    def vocabulary(self, vocab_copy):
+        self.intents = load_vocabulary(vocab_copy)
+
+    def classifier(self, client, **overrides):
+        settings = MapperSettings(llm_scoring="logprobs", include_candidates=True,
+                                  max_candidates=3, **overrides)
+        return LlmClassifier.build(self.intents, client, settings, cache_dir=None)
+
+    def test_probabilities_fill_confidence_and_candidates(self):
+        """Prüft normierte Konfidenzen, Kandidaten und eine Anfrage je Turn"""
+        probs = {"completion_probabilities": [{"content": "A", "probs": [
+            {"tok_str": "A", "prob": 0.72}, {"tok_str": " B", "prob": 0.15},
+            {"tok_str": "B", "prob": 0.05}, {"tok_str": "0", "prob": 0.08},
+            {"tok_str": "x", "prob": 0.1}]}]}
+        client = FakeClient([probs])
+        classifier = self.classifier(client)
+
+        result = classifier.classify(["Information request about the system status"])[0]
+
+        prompt, parameters = client.prompts[0], client.parameters[0]
+        first, second = [line[3:].split(":")[0] for line in prompt.splitlines()
+                         if line[:3] in ("A) ", "B) ")]
+        assert parameters["n_predict"] == 1 and parameters["n_probs"] >= 2
+        assert result["intent_id"] == first
+        assert result["confidence"] == 0.72
+        assert result["candidates"][:2] == [
+            {"intent_id": first, "confidence": 0.72},
+            {"intent_id": second, "confidence": 0.2}]
+        assert len(client.prompts) == 1
+
+    def test_none_mass_and_alphabetical_ties(self):
+        """Prüft Null-Zuordnung bei Übergewicht von "keiner" und Gleichstand nach ID"""
+        logprobs = {"completion_probabilities": [{"top_logprobs": [
+            {"token": "A", "logprob": math.log(0.3)}, {"token": "B", "logprob": math.log(0.3)},
+            {"token": "0", "logprob": math.log(0.4)}]}]}
+        client = FakeClient([logprobs])
+
+        result = self.classifier(client).classify(["Request task execution status"])[0]
+
+        a, b = [line[3:].split(":")[0] for line in client.prompts[0].splitlines()
+                if line[:3] in ("A) ", "B) ")]
+        assert result["intent_id"] is None, "Below threshold must map to null"
+        assert result["confidence"] == 0.3
+        assert [c["intent_id"] for c in result["candidates"][:2]] == sorted([a, b])
+
+    def test_scoring_prompt_shares_prefix(self):
+        """Prüft, dass Anweisung und Kandidaten vor dem Turn stehen"""
+        empty = {"completion_probabilities": []}
+        client = FakeClient([empty, empty])
+        classifier = self.classifier(client)
+
+        results = classifier.classify(["Information request one", "Information request two"])
+
+        assert results == [{"intent_id": None, "confidence": 0.0, "candidates": []}] * 2
+        first, second = client.prompts
+        assert first.rsplit("Turn:", 1)[0] == second.rsplit("Turn:", 1)[0]
+        assert client.parameters[0]["cache_prompt"] is True
+
+    def test_failed_scoring_not_memoized(self, tmp_path):
+        """Prüft, dass ein Fehlschlag von score() nicht als Mapping im Memo-Cache landet"""
+        answer = {"completion_probabilities": [{"probs": [{"tok_str": "A", "prob": 0.9},
+                                                          {"tok_str": "0", "prob": 0.1}]}]}
+        client = FakeClient([{"completion_probabilities": []}, answer])
+        classifier = self.classifier(client)
+        cache = MappingCache(tmp_path / "memo.sqlite3", "v1", classifier.name)
+        mapper = IntentMapper(classifier, classifier.settings, cache)
+        turns = turns_for(["Information request about the system status"])
+
+        assert mapper.map_turns(turns)[0]["intent_id"] is None
+        assert len(cache) == 0, "Failed classification must not be cached"
+        assert mapper.map_turns(turns)[0]["confidence"] == 0.9
+        assert len(cache) == 1 and len(client.prompts) == 2
+
+
+class TestConcurrentClassification:
+    """Test-Klasse für gleichzeitige Anfragen an die Server-Slots"""
+
+    def test_concurrent_results_identical_to_serial(self, vocab_copy):
+        """Prüft identische Ergebnisse und Reihenfolge bei gleichzeitigen Anfragen"""
+        texts = [f"Information request number {i} about the task status" for i in range(12)]
+        settings = dict(llm_scoring="logprobs", include_candidates=True)
+        serial_client, parallel_client = [
+            FakeClient(respond=prompt_probabilities, parallel_slots=4, delay=0.02)
+            for _ in range(2)]
+        serial = LlmClassifier.build(load_vocabulary(vocab_copy), serial_client, MapperSettings(**settings),
+                                     cache_dir=None)
+        parallel = LlmClassifier.build(
+            load_vocabulary(vocab_copy), parallel_client,
+            MapperSettings(parallel_turn_processing=True, **settings), cache_dir=None)
+
+        assert parallel.classify(texts) == serial.classify(texts)
+        assert serial_client.max_active == 1
+        assert 1 < parallel_client.max_active <= 4
+
+    def test_prompt_fits_slot_context(self):
+        """Prüft, dass der Prompt in den Kontext eines einzelnen Slots passt"""
+        intents = [intent(f"topic{i:04d}.request", f"Request about topic{i:04d}",
+                          f"User asks about subject number {i}") for i in range(500)]
+        client = FakeClient(respond=prompt_probabilities, parallel_slots=4, context_tokens=1024)
+        classifier = LlmClassifier.build(intents, client,
+                                         MapperSettings(llm_scoring="logprobs",
+                                                        prefilter_candidates=20),
+                                         cache_dir=None)
+
+        classifier.classify(["Request about topic0100 and subject number 100"])
+
+        assert len(client.prompts[0]) <= (1024 // 4 - 1) * 4
+        assert "topic0100.request" in client.prompts[0]
+
+    def test_long_turns_identical_in_both_modes(self):
+        """Prüft gleiche Prompts und Ergebnisse seriell und gleichzeitig bei langen Turns"""
+        intents = [intent(f"topic{i:04d}.request", f"Request about topic{i:04d}",
+                          f"User asks about subject number {i}") for i in range(200)]
+        texts = [f"Request about topic{i:04d} " + "with a lot of detail " * 30 for i in range(6)]
+        settings = dict(llm_scoring="logprobs", prefilter_candidates=20)
+        serial_client, parallel_client = [
+            FakeClient(respond=prompt_probabilities, parallel_slots=4, context_tokens=2048,
+                       delay=0.01)
+            for _ in range(2)]
+        serial = LlmClassifier.build(intents, serial_client, MapperSettings(**settings),
+                                     cache_dir=None)
+        parallel = LlmClassifier.build(intents, parallel_client,
+                                       MapperSettings(parallel_turn_processing=True, **settings),
+                                       cache_dir=None)
+
+        assert parallel.classify(texts) == serial.classify(texts)
+        assert sorted(parallel_client.prompts) == sorted(serial_client.prompts)
+        assert parallel_client.max_active > 1
+        assert parallel.name == serial.name
+
+    def test_failed_request_keeps_other_turns(self, vocab_copy):
+        """Prüft, dass ein Serverfehler nur seinen Turn auf null setzt (log_and_continue)"""
+        texts = [f"Information request number {i} about the task status" for i in range(8)]
+
+        def respond(prompt):
+            if "number 3 " in prompt:
+                return LlmClientError("/completion: timed out")
+            return prompt_probabilities(prompt)
+
+        client = FakeClient(respond=respond, parallel_slots=4, delay=0.01)
+        settings = MapperSettings(llm_scoring="logprobs", parallel_turn_processing=True)
+        expected = LlmClassifier.build(load_vocabulary(vocab_copy), FakeClient(respond=prompt_probabilities,
+                                                                     parallel_slots=4),
+                                       settings, cache_dir=None).classify(texts)
+
+        results = LlmClassifier.build(load_vocabulary(vocab_copy), client, settings,
+                                      cache_dir=None).classify(texts)
+
+        assert results[3] == {"intent_id": None, "confidence": 0.0}
+        assert isinstance(results[3], UncachedResult)
+        assert results[:3] + results[4:] == expected[:3] + expected[4:]
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für die lexikalische Kandidatenvorauswahl und die LLM-Klassifikation
+Prüft BM25-Ranking, Index-Cache und Prompt-Kandidaten
+"""
+
+from core.agents.intent_mapper import LlmClassifier, MapperSettings, load_vocabulary
+from core.agents.lexical_index import LexicalIndex
+
+
+class FakeClient:
+    """Ersetzt den llama.cpp-Server und merkt sich die Prompts"""
+    name = "fake"
+
+    def __init__(self, answers, context_tokens=2048):
+        self.answers = list(answers)
+        self.context_tokens = context_tokens
+        self.slot_context_tokens = context_tokens
+        self.parallel_slots = 1
+        self.prompts = []
+        self.parameters = []
+
+    def complete(self, prompt, **parameters):
+        self.prompts.append(prompt)
+        self.parameters.append(parameters)
+        answer = self.answers.pop(0)
+        return answer if isinstance(answer, dict) else {"content": answer}
+
+
+def synthetic_intents(count):
+    """Großes Vokabular mit unterscheidbaren Labels"""
+    return [{"id": f"topic{i:04d}.request", "label": f"Request about topic{i:04d}",
+             "description": f"User asks about subject number {i}"} for i in range(count)]
+
+
+class TestLexicalIndex:
+    """Test-Klasse für Trigramm-Index und LLM-Vorauswahl"""
+
+    def test_ranking_and_alphabetical_ties(self):
+        """Prüft BM25-Reihenfolge, Gleichstand nach ID und fehlende Treffer"""
+        index = LexicalIndex.build([("system.status", "System Status Inquiry"),
+                                    ("task.execute", "Task Execution Request"),
+                                    ("b.same", "Duplicate label"), ("a.same", "Duplicate label")])
+
+        assert index.top_k("what is the system status?", 2)[0][0] == "system.status"
+        assert [i for i, _ in index.top_k("duplicate label", 2)] == ["a.same", "b.same"]
+        assert index.top_k("xyz", 3) == []
+
+    def test_index_cached_per_vocabulary_version(self, tmp_path):
+        """Prüft, dass der Index gespeichert und unverändert wieder geladen wird"""
+        documents = [(intent["id"], intent["label"]) for intent in synthetic_intents(50)]
+        built = LexicalIndex.load_or_build(documents, tmp_path / "v1.npz")
+        loaded = LexicalIndex.load_or_build([], tmp_path / "v1.npz")
+
+        assert loaded.intent_ids == built.intent_ids
+        assert loaded.top_k("topic0042", 3) == built.top_k("topic0042", 3)
+
+    def test_only_prefiltered_candidates_reach_prompt(self):
+        """Prüft, dass bei großem Vokabular nur die Top-k-Kandidaten im Prompt stehen"""
+        intents = synthetic_intents(3000)
+        client = FakeClient(['{"intent_id": "topic1234.request", "confidence": 0.91}'])
+        settings = MapperSettings(algorithm="llm_classification", prefilter_candidates=5)
+        classifier = LlmClassifier.build(intents, client, settings, cache_dir=None)
+
+        result = classifier.classify(["Tell me about topic1234 please"])[0]
+
+        assert result == {"intent_id": "topic1234.request", "confidence": 0.91}
+        prompt = client.prompts[0]
+        assert prompt.count("\n- ") == 5
+        assert "topic1234.request" in prompt
+        assert len(prompt) < 2048 * 4
+
+    def test_invalid_answer_maps_to_null_without_retry(self, vocab_copy):
+        """Prüft, dass eine unbrauchbare Antwort ohne erneute Anfrage als null gilt"""
+        intents = load_vocabulary(vocab_copy)
+        client = FakeClient(["I think it is a question"])
+        classifier = LlmClassifier.build(intents, client, MapperSettings(), cache_dir=None)
+
+        result = classifier.classify(["Information request about status"])[0]
+        assert result == {"intent_id": None, "confidence": 0.0}
+        assert len(client.prompts) == 1
+
+        client = FakeClient(['{"intent_id": "inform.question", "confidence": 0.55}'])
+        classifier = LlmClassifier.build(intents, client, MapperSettings(), cache_dir=None)
+        assert classifier.classify(["Information request"])[0] == \
+            {"intent_id": None, "confidence": 0.55}, "Below threshold must map to null"
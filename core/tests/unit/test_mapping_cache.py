@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für den Memo-Cache des Intent-Mappers
+Prüft Wiederverwendung über Läufe, Vokabular-Invalidierung und LRU-Verdrängung
+"""
+
+from core.agents.intent_mapper import (EmbeddingClassifier, EmbeddingIndex, HashingEmbedder,
+                                       IntentMapper, load_vocabulary, vocabulary_version)
+from core.agents.mapping_cache import MappingCache, normalize_text, text_hash
+
+
+class CountingEmbedder(HashingEmbedder):
+    """Hashing-Embedder, der die eingebetteten Texte mitzählt"""
+
+    def __init__(self):
+        super().__init__(dimension=256)
+        self.texts = []
+
+    def embed(self, texts):
+        self.texts.extend(texts)
+        return super().embed(texts)
+
+
+def turns_for(texts):
+    """Turns mit wechselnden Speakern"""
+    return [{"speaker": "user" if i % 2 == 0 else "agent", "index": i // 2, "text": text}
+            for i, text in enumerate(texts)]
+
+
+def make_mapper(cache_path, intents, embedder):
+    """Mapper mit eigenem Cache-Handle, wie bei einem neuen Lauf"""
+    mapper = IntentMapper(EmbeddingClassifier(EmbeddingIndex.build(intents, embedder, None),
+                                              embedder))
+    mapper.cache = MappingCache(cache_path, vocabulary_version(intents), mapper.model_id)
+    return mapper
+
+
+class TestMappingCache:
+    """Test-Klasse für die Memoisierung von Turn-Klassifikationen"""
+
+    def test_repeated_turns_classified_once(self, tmp_path, vocab_copy):
+        """Prüft, dass wiederholte Turns über Dateien und Läufe nicht neu klassifiziert werden"""
+        intents = load_vocabulary(vocab_copy)
+        texts = ["Danke!", "Ok", "danke! ", "Task Execution Request", "OK"] * 20
+        embedder = HashingEmbedder(256)
+        uncached = IntentMapper(EmbeddingClassifier(EmbeddingIndex.build(intents, embedder, None),
+                                                    embedder)).map_turns(turns_for(texts))
+
+        embedder = CountingEmbedder()
+        first_run = make_mapper(tmp_path / "memo.sqlite3", intents, embedder)
+        intents_embedded = len(embedder.texts)
+        assert first_run.map_turns(turns_for(texts)) == uncached
+        assert embedder.texts[intents_embedded:] == ["Danke!", "Ok", "Task Execution Request"]
+
+        second_run = make_mapper(tmp_path / "memo.sqlite3", intents, embedder)
+        embedded = len(embedder.texts)
+        assert second_run.map_turns(turns_for(["ok", "Danke!"])) == \
+            [{**uncached[1], "turn_ref": "user:0"}, {**uncached[0], "turn_ref": "agent:0"}]
+        assert len(embedder.texts) == embedded, "Cached turns classified again"
+
+    def test_vocabulary_change_invalidates(self, tmp_path, vocab_copy):
+        """Prüft, dass eine geänderte Vokabularversion keine alten Einträge trifft"""
+        intents = load_vocabulary(vocab_copy)
+        embedder = CountingEmbedder()
+        make_mapper(tmp_path / "memo.sqlite3", intents, embedder).map_turns(turns_for(["Ok"]))
+
+        changed = [dict(intent) for intent in intents]
+        changed[0]["description"] = "Geänderte Beschreibung"
+        assert vocabulary_version(changed) != vocabulary_version(intents)
+
+        mapper = make_mapper(tmp_path / "memo.sqlite3", changed, embedder)
+        embedded = len(embedder.texts)
+        mapper.map_turns(turns_for(["Ok"]))
+        assert embedder.texts[embedded:] == ["Ok"]
+
+    def test_lru_eviction(self, tmp_path):
+        """Prüft die Größenbegrenzung mit Verdrängung des am längsten ungenutzten Eintrags"""
+        cache = MappingCache(tmp_path / "memo.sqlite3", "v1", "model", max_entries=3)
+        result = {"intent_id": None, "confidence": 0.1}
+
+        for key in ["a", "b", "c"]:
+            cache.put_many([(key, result)])
+        assert set(cache.get_many(["a"])) == {"a"}
+        cache.put_many([("d", result)])
+
+        assert len(cache) == 3
+        assert set(cache.get_many(["a", "b", "c", "d"])) == {"a", "c", "d"}
+        cache.close()
+
+    def test_eviction_bounded_with_equal_timestamps(self, tmp_path):
+        """Prüft, dass ein Stapel mit gleichem last_used die Grenze nicht überschreitet"""
+        cache = MappingCache(tmp_path / "memo.sqlite3", "v1", "model", max_entries=3)
+        result = {"intent_id": None, "confidence": 0.1}
+
+        cache.put_many([(key, result) for key in ["a", "b", "c", "d", "e"]])
+
+        assert len(cache) == 3
+        assert set(cache.get_many(["a", "b", "c", "d", "e"])) == {"c", "d", "e"}
+        cache.close()
+
+    def test_text_normalization(self):
+        """Prüft die Vereinheitlichung von Leerraum, Schreibweise und Unicode-Form"""
+        assert normalize_text("  Danke\n schön ") == "danke schön"
+        assert text_hash("Gru\u0308\u00dfe") == text_hash("GR\u00dc\u00dfE")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für die fusionierte Transkript-Pipeline
+Prüft einmaliges Parsen und identische Artefakte gegenüber getrennten Läufen
+"""
+
+import json
+import pytest
+
+from core.agents import pipeline
+from core.agents.intent_discovery import DiscoverySettings
+from core.agents.intent_mapper import (EmbeddingClassifier, EmbeddingIndex, HashingEmbedder,
+                                       IntentMapper, MapperSettings)
+from core.agents.pipeline import (PipelineContext, PipelineError, Transcript, fused_segments,
+                                  load_flow, run_steps)
+from core.agents.transkriptor import iter_turns
+
+
+@pytest.fixture
+def transcript_file(tmp_path):
+    """Gültiges Transkript auf der Platte"""
+    messages = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"Nachricht {i}"}
+                for i in range(12)]
+    path = tmp_path / "chat.transcript.json"
+    path.write_text(json.dumps(list(iter_turns(messages))), encoding='utf-8')
+    return path
+
+
+def offline_context(project_root, output_dir, vocab_path):
+    """Kontext mit Hashing-Mapper und ohne LLM-Entwurf"""
+    embedder = HashingEmbedder()
+    intents = [{"id": "task.execute", "label": "Nachricht 1"}]
+    settings = MapperSettings(confidence_threshold=0.95)
+    mapper = IntentMapper(EmbeddingClassifier(EmbeddingIndex.build(intents, embedder, None),
+                                              embedder, settings), settings)
+    return PipelineContext(project_root, output_dir,
+                           resources={"intent_mapper": mapper, "drafter": None,
+                                      "discovery_settings": DiscoverySettings(),
+                                      "vocab_path": vocab_path})
+
+
+def artifact(path):
+    """Artefaktinhalt ohne Zeitstempel"""
+    data = json.loads(open(path, encoding='utf-8').read())
+    data.pop("validated_at", None)
+    return data
+
+
+class TestFusedPipeline:
+    """Test-Klasse für die gemeinsame Nutzung eines geparsten Transkripts"""
+
+    def test_transcript_parsed_once(self, tmp_path, transcript_file, monkeypatch):
+        """Prüft, dass im fusionierten Modus nur ein Lesevorgang stattfindet"""
+        loads = []
+        original_load = Transcript.load.__func__
+        monkeypatch.setattr(Transcript, "load",
+                            classmethod(lambda cls, path: loads.append(path)
+                                        or original_load(cls, path)))
+        context = PipelineContext(tmp_path, tmp_path / "out")
+
+        run_steps(transcript_file, ["validator", "validator"], context, fused=True)
+        assert len(loads) == 1
+
+        run_steps(transcript_file, ["validator", "validator"], context, fused=False)
+        assert len(loads) == 3
+
+    def test_artifacts_match_separate_runs(self, tmp_path, transcript_file):
+        """Prüft, dass die Artefakte denen getrennter Läufe entsprechen"""
+        fused = run_steps(transcript_file, ["validator"],
+                          PipelineContext(tmp_path, tmp_path / "fused"), fused=True)
+        separate = run_steps(transcript_file, ["validator"],
+                             PipelineContext(tmp_path, tmp_path / "separate"), fused=False)
+
+        assert fused[0]["status"] == separate[0]["status"] == "valid"
+        assert artifact(fused[0]["artifact"]) == artifact(separate[0]["artifact"])
+
+    def test_shared_transcript_is_immutable(self, transcript_file):
+        """Prüft, dass Schritte das geteilte Transkript nicht verändern können"""
+        transcript = Transcript.load(transcript_file)
+
+        with pytest.raises(TypeError):
+            transcript.turns[0]["text"] = "geändert"
+        with pytest.raises(AttributeError):
+            transcript.turns.append({})
+
+    def test_flow_segments(self):
+        """Prüft die Gruppierung registrierter Schritte und die Opt-in-Einstellung der Flows"""
+        flow = load_flow("transcript_processing")
+
+        assert flow["fused"] is False, "Fused execution must stay opt-in"
+        assert ["validator", "intent-mapper", "intent-discovery"] in fused_segments(flow["steps"])
+        assert fused_segments(["transkriptor", "validator", "validator"]) == \
+            [["transkriptor"], ["validator", "validator"]]
+
+    def test_discovery_uses_mappings_in_memory(self, tmp_path, transcript_file, monkeypatch,
+                                               vocab_copy):
+        """Prüft, dass die Discovery im fusionierten Modus weder Transkript noch Mappings liest"""
+        reads = []
+        original = pipeline.iter_json_array
+        monkeypatch.setattr(pipeline, "iter_json_array",
+                            lambda path: reads.append(path) or original(path))
+        steps = ["intent-mapper", "intent-discovery"]
+
+        fused = run_steps(transcript_file, steps,
+                          offline_context(tmp_path / "a", tmp_path / "a", vocab_copy), fused=True)
+        assert reads == []
+        separate = run_steps(transcript_file, steps,
+                             offline_context(tmp_path / "b", tmp_path / "b", vocab_copy),
+                             fused=False)
+        assert len(reads) == 1
+
+        assert fused[1]["unmapped_turns_count"] == separate[1]["unmapped_turns_count"] == 11
+        assert fused[1]["suggestions_count"] == 11
+        assert len(list((tmp_path / "a" / "intent-scout" / "suggestions").glob("*.yaml"))) == 11
+
+    def test_invalid_transcript_stops_flow(self, tmp_path):
+        """Prüft Abbruch nach ungültiger Validierung und Fehler bei falscher Wurzel"""
+        path = tmp_path / "chat.transcript.json"
+        path.write_text(json.dumps([{"speaker": "user", "index": 3, "text": "x"}]),
+                        encoding='utf-8')
+        context = PipelineContext(tmp_path, tmp_path / "out")
+
+        results = run_steps(path, ["validator", "intent-mapper"], context)
+
+        assert [r["step"] for r in results] == ["validator"]
+        assert results[0]["status"] == "invalid"
+        assert not (tmp_path / "out" / "chat.mapped.json").exists()
+
+        path.write_text(json.dumps({"speaker": "user", "index": 0, "text": "x"}), encoding='utf-8')
+        with pytest.raises(PipelineError) as error:
+            Transcript.load(path)
+        assert error.value.code == "TRANSCRIPT_INVALID_FORMAT"
+
+        with pytest.raises(PipelineError) as error:
+            Transcript.load(tmp_path / "missing.transcript.json")
+        assert error.value.code == "TRANSCRIPT_INVALID_FORMAT"
+
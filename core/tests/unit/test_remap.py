@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für das inkrementelle Re-Mapping nach Vokabularänderungen
+Prüft Gleichheit mit vollständigem Neu-Mapping und die Auswahl betroffener Turns
+"""
+
+import json
+
+from core.agents import intent_mapper
+from core.agents.intent_mapper import (EmbeddingClassifier, EmbeddingIndex, HashingEmbedder,
+                                       IntentMapper, LlmClassifier, MapperSettings,
+                                       VocabularyDiff, load_vocabulary)
+from core.agents.remap import remap_file
+
+
+class CountingEmbedder(HashingEmbedder):
+    """Hashing-Embedder, der die eingebetteten Texte mitzählt"""
+
+    def __init__(self):
+        super().__init__(dimension=256)
+        self.texts = []
+
+    def embed(self, texts):
+        self.texts.extend(texts)
+        return super().embed(texts)
+
+
+class EchoClient:
+    """LLM-Server, der stets den ersten Kandidaten mit fester Konfidenz wählt"""
+    name = "echo"
+    context_tokens = 2048
+    slot_context_tokens = 2048
+    parallel_slots = 1
+
+    def __init__(self):
+        self.prompts = []
+
+    def complete(self, prompt, **parameters):
+        self.prompts.append(prompt)
+        first = [line[2:].split(":")[0] for line in prompt.splitlines() if line.startswith("- ")][0]
+        return {"content": json.dumps({"intent_id": first, "confidence": 0.9})}
+
+
+def turns_for(texts):
+    """Turns mit wechselnden Speakern"""
+    return [{"speaker": "user" if i % 2 == 0 else "agent", "index": i // 2, "text": text}
+            for i, text in enumerate(texts)]
+
+
+def embedding_mapper(intents, embedder, settings):
+    return IntentMapper(EmbeddingClassifier(EmbeddingIndex.build(intents, embedder, None),
+                                            embedder, settings), settings)
+
+
+TEXTS = ["Task Execution Request", "Danke!", "System Status Inquiry", "Weather forecast please",
+         "Information request about the weather", "Ok", "Confirmation Request"]
+
+
+class TestRemap:
+    """Test-Klasse für das Re-Mapping betroffener Turns"""
+
+    def test_embedding_remap_matches_full_remap(self, tmp_path, vocab_copy):
+        """Prüft identisches Ergebnis zum Neu-Mapping bei weniger Klassifikationen"""
+        previous = load_vocabulary(vocab_copy)
+        current = [intent for intent in previous if intent["id"] != "confirm.approval"] + [
+            {"id": "weather.forecast", "label": "Weather forecast",
+             "description": "User asks for the weather forecast"}]
+        diff = VocabularyDiff.between(previous, current)
+        assert (diff.added, diff.removed, diff.changed) == \
+            (["weather.forecast"], ["confirm.approval"], [])
+
+        transcript = tmp_path / "chat.transcript.json"
+        transcript.write_text(json.dumps(turns_for(TEXTS)), encoding='utf-8')
+        for include_candidates in (False, True):
+            settings = MapperSettings(include_candidates=include_candidates, max_candidates=1)
+            output = tmp_path / f"chat-{include_candidates}.mapped.json"
+            expected = tmp_path / f"full-{include_candidates}.mapped.json"
+            embedding_mapper(previous, HashingEmbedder(256), settings).map_file(transcript, output)
+            embedding_mapper(current, HashingEmbedder(256), settings).map_file(transcript, expected)
+
+            embedder = CountingEmbedder()
+            mapper = embedding_mapper(current, embedder, settings)
+            embedder.texts.clear()
+            summary = remap_file(mapper, diff, transcript, output)
+
+            assert output.read_bytes() == expected.read_bytes()
+            assert summary["turns_changed"] >= 1 and summary["full_remap"] is False
+        # Mit gespeicherten Kandidaten sind nur Turns nahe dem neuen Intent betroffen
+        assert 0 < summary["turns_reclassified"] < len(TEXTS)
+
+        unchanged = remap_file(mapper, VocabularyDiff.between(current, current), transcript, output)
+        assert unchanged["turns_reclassified"] == 0
+
+    def test_llm_remap_only_requests_changed_candidate_sets(self, tmp_path, vocab_copy):
+        """Prüft, dass nur Turns mit geänderter Kandidatenauswahl erneut angefragt werden"""
+        previous = load_vocabulary(vocab_copy)
+        current = [dict(intent) for intent in previous] + [
+            {"id": "weather.forecast", "label": "Weather forecast"}]
+        settings = MapperSettings(algorithm="llm_classification", llm_scoring="generate")
+        transcript = tmp_path / "chat.transcript.json"
+        transcript.write_text(json.dumps(turns_for(TEXTS)), encoding='utf-8')
+        output, expected = tmp_path / "chat.mapped.json", tmp_path / "full.mapped.json"
+        IntentMapper(LlmClassifier.build(previous, EchoClient(), settings, None),
+                     settings).map_file(transcript, output)
+        IntentMapper(LlmClassifier.build(current, EchoClient(), settings, None),
+                     settings).map_file(transcript, expected)
+
+        client = EchoClient()
+        mapper = IntentMapper(LlmClassifier.build(current, client, settings, None), settings)
+        summary = remap_file(mapper, VocabularyDiff.between(previous, current), transcript, output)
+
+        assert output.read_bytes() == expected.read_bytes()
+        requested = [prompt.rsplit("Turn:", 1)[-1] for prompt in client.prompts]
+        assert not any("System Status Inquiry" in turn for turn in requested), \
+            "Unchanged candidate set requested again"
+        assert any("Weather forecast please" in turn for turn in requested)
+        assert summary["turns_reclassified"] == len(client.prompts) < len(TEXTS)
+
+    def test_previous_index_built_once_per_run(self, tmp_path, vocab_copy, monkeypatch):
+        """Prüft, dass der Index des alten Vokabulars nicht je Datei neu gebaut wird"""
+        previous = load_vocabulary(vocab_copy)
+        current = previous + [{"id": "weather.forecast", "label": "Weather forecast"}]
+        settings = MapperSettings(algorithm="llm_classification", llm_scoring="generate")
+        old_mapper = IntentMapper(LlmClassifier.build(previous, EchoClient(), settings, None),
+                                  settings)
+        files = []
+        for name in ["a", "b", "c"]:
+            transcript = tmp_path / f"{name}.transcript.json"
+            transcript.write_text(json.dumps(turns_for(TEXTS)), encoding='utf-8')
+            old_mapper.map_file(transcript, tmp_path / f"{name}.mapped.json")
+            files.append((transcript, tmp_path / f"{name}.mapped.json"))
+
+        mapper = IntentMapper(LlmClassifier.build(current, EchoClient(), settings, None), settings)
+        builds = []
+        original_build = intent_mapper.LexicalIndex.build
+        monkeypatch.setattr(intent_mapper.LexicalIndex, "build",
+                            lambda documents: builds.append(1) or original_build(documents))
+        diff = VocabularyDiff.between(previous, current)
+        for transcript, output in files:
+            remap_file(mapper, diff, transcript, output)
+
+        assert len(builds) == 1
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für die Transkript-Validator-Engine
+Prüft Sequenz- und Positionsregeln sowie Fehlerlimits des Berichts
+"""
+
+import json
+
+from core.agents.transcript_validator import (TranscriptValidator, ValidatorSettings,
+                                              validation_path_for, write_report)
+from core.agents.transkriptor import iter_turns
+
+
+def make_turns(count):
+    """Gültiges Transkript mit abwechselnden Speakern"""
+    messages = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"Turn Nummer {i}"}
+                for i in range(count)]
+    return list(iter_turns(messages))
+
+
+def codes(report):
+    """Fehlercodes in Berichtsreihenfolge"""
+    return [error["code"] for error in report["errors"]]
+
+
+class TestTranscriptValidator:
+    """Test-Klasse für die spaltenweise Transkriptprüfung"""
+
+    def test_transkriptor_output_is_valid(self):
+        """Prüft, dass Transkriptor-Ausgaben ohne Befunde validieren"""
+        report = TranscriptValidator().validate_turns(make_turns(50), "chat.transcript.json")
+
+        assert report["status"] == "valid"
+        assert report["turn_count"] == 50
+        assert report["statistics"]["turns_by_speaker"] == {"user": 25, "agent": 25, "system": 0}
+
+    def test_empty_transcript_is_invalid(self, tmp_path):
+        """Prüft min_turns: leere und zu kurze Transkripte sind ungültig"""
+        report = TranscriptValidator().validate_turns([], "empty.transcript.json")
+        assert report["status"] == "invalid"
+        assert codes(report) == ["TOO_FEW_TURNS"]
+
+        path = tmp_path / "empty.transcript.json"
+        path.write_text("[]", encoding='utf-8')
+        assert codes(TranscriptValidator().validate_file(path)) == ["TOO_FEW_TURNS"]
+
+        settings = ValidatorSettings.from_spec()
+        assert settings.min_turns == 1
+        settings.min_turns = 3
+        assert codes(TranscriptValidator(settings).validate_turns(make_turns(2))) == \
+            ["TOO_FEW_TURNS"]
+        assert TranscriptValidator(settings).validate_turns(make_turns(3))["status"] == "valid"
+
+    def test_sequence_and_position_errors(self):
+        """Prüft Index-Lücken, Überlappungen, Lücken und falsche Längen"""
+        turns = make_turns(8)
+        turns[2]["index"] = 5                      # user: 0, 5, 2, 3 -> Fehler an 2 und 4
+        turns[3]["char_pos_start"] -= 3            # Überlappung mit Turn 2
+        turns[3]["char_pos_end"] -= 3
+        turns[6]["char_pos_start"] += 10           # Lücke, Länge passt nicht mehr
+        turns[7]["speaker"] = "bot"
+
+        report = TranscriptValidator().validate_turns(turns)
+        found = {(e["code"], e["turn_index"]) for e in report["errors"]}
+
+        assert ("INDEX_SEQUENCE_ERROR", 2) in found
+        assert ("INDEX_SEQUENCE_ERROR", 4) in found
+        assert ("CHARACTER_POSITION_OVERLAP", 3) in found
+        assert ("CHARACTER_POSITION_GAP", 4) in found
+        assert ("CHARACTER_POSITION_GAP", 6) in found
+        assert ("CHARACTER_POSITION_MISMATCH", 6) in found
+        assert ("INVALID_SPEAKER", 7) in found
+        assert report["status"] == "invalid"
+
+    def test_structural_errors(self):
+        """Prüft fehlende Felder, falsche Typen und zusätzliche Felder"""
+        turns = make_turns(3)
+        del turns[0]["text"]
+        turns[1]["index"] = "1"
+        turns[2]["timestamp"] = "2025-06-29T00:00:00Z"
+
+        report = TranscriptValidator().validate_turns(turns)
+
+        assert [(e["code"], e["turn_index"], e["field"]) for e in report["errors"]][:3] == [
+            ("MISSING_REQUIRED_FIELD", 0, "text"),
+            ("INVALID_FIELD_TYPE", 1, "index"),
+            ("UNEXPECTED_FIELD", 2, "timestamp")
+        ]
+
+    def test_max_errors_per_category(self):
+        """Prüft, dass über dem Limit nur gezählt wird"""
+        turns = make_turns(30)
+        for turn in turns:
+            turn["char_pos_end"] += 1
+
+        settings = ValidatorSettings(max_errors_per_category=5)
+        report = TranscriptValidator(settings).validate_turns(turns)
+        statistics = report["statistics"]
+
+        assert codes(report).count("CHARACTER_POSITION_MISMATCH") == 5
+        assert statistics["findings_by_code"]["CHARACTER_POSITION_MISMATCH"] == 30
+        assert statistics["suppressed_by_code"]["CHARACTER_POSITION_MISMATCH"] == 25
+
+    def test_collect_all_errors_disabled_stops_at_first(self):
+        """Prüft, dass ohne collect_all_errors nur der erste Fehler gemeldet wird"""
+        turns = make_turns(10)
+        turns[1]["speaker"] = "bot"
+        turns[4]["index"] = 9
+
+        settings = ValidatorSettings(collect_all_errors=False)
+        report = TranscriptValidator(settings).validate_turns(turns)
+
+        assert codes(report) == ["INVALID_SPEAKER"]
+
+    def test_validation_report_file(self, tmp_path):
+        """Prüft Dateiprüfung, ungültiges JSON und den geschriebenen Bericht"""
+        transcript = tmp_path / "chat.transcript.json"
+        transcript.write_text(json.dumps(make_turns(4)), encoding='utf-8')
+        broken = tmp_path / "broken.transcript.json"
+        broken.write_text('[{"speaker": "user"', encoding='utf-8')
+
+        validator = TranscriptValidator(ValidatorSettings.from_spec())
+        report = validator.validate_file(transcript)
+        output = validation_path_for(transcript, tmp_path / "validation")
+        write_report(report, output)
+
+        saved = json.loads(output.read_text(encoding='utf-8'))
+        assert output.name == "chat.validation.json"
+        assert set(saved) == {"status", "file", "validated_at", "turn_count", "errors",
+                              "warnings", "statistics"}
+        assert saved["status"] == "valid"
+        assert codes(validator.validate_file(broken)) == ["INVALID_JSON"]
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für die Transkriptor-Engine
+Prüft Speaker-Zuordnung, Zeichenpositionen und streamende Ausgabe
+"""
+
+import io
+import json
+import time
+import pytest
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from core.agents import transkriptor
+
+from core.agents.transkriptor import (BatchSettings, TranscriptError, TranscriptLimits,
+                                      find_inputs, iter_shards, iter_turns, transcribe_batch,
+                                      transcribe_file, transcript_path_for)
+from core.ci.json_stream import JsonArrayWriter, JsonStreamReader
+
+
+def write_chat_export(path, messages, conversation_id="conv_001"):
+    """Legt einen Chat-Export mit den angegebenen Nachrichten an"""
+    export = {"conversation_id": conversation_id, "messages": messages}
+    path.write_text(json.dumps(export), encoding='utf-8')
+    return path
+
+
+class TestTranskriptor:
+    """Test-Klasse für die Umwandlung von Chat-Exporten"""
+
+    def test_offsets_and_speaker_indices(self, tmp_path, sample_chat_export):
+        """Prüft Rollenabbildung, Indizes je Speaker und Zeichenpositionen"""
+        input_file = tmp_path / "sample.chat.json"
+        input_file.write_text(json.dumps(sample_chat_export), encoding='utf-8')
+        output_file = transcript_path_for(input_file, tmp_path / "out")
+
+        result = transcribe_file(input_file, output_file)
+        turns = json.loads(output_file.read_text(encoding='utf-8'))
+
+        assert output_file.name == "sample.transcript.json"
+        assert [(t["speaker"], t["index"]) for t in turns] == [("user", 0), ("agent", 0),
+                                                                ("user", 1)]
+        full_text = "\n".join(m["content"] for m in sample_chat_export["messages"])
+        for turn in turns:
+            assert full_text[turn["char_pos_start"]:turn["char_pos_end"]] == turn["text"]
+        assert result["speakers"] == {"user": 2, "agent": 1}
+
+    def test_output_matches_json_dump(self, tmp_path):
+        """Prüft, dass die gestreamte Ausgabe zeichengleich mit json.dump ist"""
+        messages = [{"role": "user" if i % 2 else "assistant", "content": f"Nachricht {i} – ü"}
+                    for i in range(50)]
+        input_file = write_chat_export(tmp_path / "a.chat.json", messages)
+        output_file = tmp_path / "a.transcript.json"
+
+        transcribe_file(input_file, output_file)
+
+        expected = json.dumps(list(iter_turns(messages)), indent=2, ensure_ascii=False)
+        assert output_file.read_text(encoding='utf-8') == expected
+
+    def test_messages_are_streamed(self):
+        """Prüft, dass Nachrichten nicht vollständig in den Speicher geladen werden"""
+        export = json.dumps({"conversation_id": "c", "messages": [
+            {"role": "user", "content": "x" * 200} for _ in range(2000)]})
+        reader = JsonStreamReader(io.StringIO(export), chunk_size=1024)
+        writer = JsonArrayWriter(io.StringIO())
+
+        max_buffer = 0
+        for key, messages in reader.iter_object(stream_keys=("messages",)):
+            if key == "messages":
+                for turn in iter_turns(messages):
+                    writer.write(turn)
+                    max_buffer = max(max_buffer, len(reader.buffer))
+
+        assert max_buffer < 4096, "Reader buffer grows with export size"
+
+    def test_invalid_export_leaves_no_output(self, tmp_path):
+        """Prüft Fehlercodes und dass bei Fehlern keine Ausgabedatei entsteht"""
+        output_file = tmp_path / "bad.transcript.json"
+
+        unknown_role = write_chat_export(tmp_path / "role.chat.json",
+                                         [{"role": "user", "content": "Hi"},
+                                          {"role": "tool", "content": "x"}])
+        with pytest.raises(TranscriptError) as error:
+            transcribe_file(unknown_role, output_file)
+        assert error.value.code == "SPEAKER_DETECTION_FAILED"
+
+        missing_id = tmp_path / "noid.chat.json"
+        missing_id.write_text(json.dumps({"messages": [{"role": "user", "content": "Hi"}]}),
+                              encoding='utf-8')
+        with pytest.raises(TranscriptError) as error:
+            transcribe_file(missing_id, output_file)
+        assert error.value.code == "MISSING_REQUIRED_FIELDS"
+
+        too_many = write_chat_export(tmp_path / "many.chat.json",
+                                     [{"role": "user", "content": "Hi"}] * 3)
+        with pytest.raises(TranscriptError) as error:
+            transcribe_file(too_many, output_file, TranscriptLimits(max_messages=2))
+        assert error.value.code == "CONTENT_TOO_LARGE"
+
+        assert list(tmp_path.glob("*.transcript.json*")) == []
+        assert list(tmp_path.glob(".*.tmp")) == [], "Temporary output not cleaned up"
+
+    def test_limits_read_from_spec(self):
+        """Prüft, dass die Grenzen aus spec.transkriptor.yaml übernommen werden"""
+        limits = TranscriptLimits.from_spec()
+        assert (limits.max_size_mb, limits.max_messages, limits.max_content_length) == \
+            (50, 10000, 10000)
+
+
+class TestBatchTranskription:
+    """Test-Klasse für Stapelverarbeitung im Prozesspool"""
+
+    @pytest.fixture
+    def input_dir(self, tmp_path):
+        """Eingabeordner mit mehreren Exporten und einer fehlerhaften Datei"""
+        input_dir = tmp_path / "input"
+        input_dir.mkdir()
+        for i in range(6):
+            messages = [{"role": "user" if j % 3 else "assistant",
+                         "content": f"Export {i}, Nachricht {j}"} for j in range(i * 7 + 1)]
+            write_chat_export(input_dir / f"chat-{i}.chat.json", messages, f"conv_{i}")
+        write_chat_export(input_dir / "broken.chat.json", [{"role": "tool", "content": "x"}])
+        return input_dir
+
+    def test_parallel_output_identical_to_serial(self, tmp_path, input_dir):
+        """Prüft, dass Ergebnisse und Dateien byte-identisch zum seriellen Lauf sind"""
+        inputs = find_inputs(input_dir)
+        serial = transcribe_batch(inputs, tmp_path / "serial", BatchSettings(jobs=1))
+        parallel = transcribe_batch(inputs, tmp_path / "parallel", BatchSettings(jobs=3))
+
+        def strip_paths(results):
+            return [{k: v for k, v in r.items() if k not in ("input_file", "output_file")}
+                    for r in results]
+
+        assert strip_paths(parallel) == strip_paths(serial)
+        assert [r["status"] for r in serial].count("failed") == 1
+        serial_files = sorted(p.name for p in (tmp_path / "serial").iterdir())
+        assert serial_files == sorted(p.name for p in (tmp_path / "parallel").iterdir())
+        assert len(serial_files) == 6, "Failed input must not produce an output file"
+        for name in serial_files:
+            assert (tmp_path / "serial" / name).read_bytes() == \
+                (tmp_path / "parallel" / name).read_bytes()
+
+    def test_timeout_is_retried_then_reported(self, tmp_path, input_dir):
+        """Prüft, dass Zeitüberschreitungen wiederholt und dann als Fehler gemeldet werden"""
+        settings = BatchSettings(jobs=1, timeout_seconds=-1, retry_attempts=2)
+        results = transcribe_batch([input_dir / "chat-1.chat.json"], tmp_path / "out", settings)
+
+        assert results[0]["status"] == "failed"
+        assert results[0]["error_code"] == "PROCESSING_TIMEOUT"
+        assert results[0]["attempts"] == 3
+        assert not (tmp_path / "out" / "chat-1.transcript.json").exists()
+
+    def test_hanging_worker_reported_as_timeout(self, tmp_path, input_dir, monkeypatch):
+        """Prüft, dass das Warten auf kleine Exporte durch die Frist des Stapels begrenzt ist"""
+        run_task = transkriptor._transcribe_task
+
+        def hanging_task(task):
+            if task[0].name == "chat-1.chat.json":
+                time.sleep(2.0)
+            return run_task(task)
+
+        monkeypatch.setattr(transkriptor, "ProcessPoolExecutor", ThreadPoolExecutor)
+        monkeypatch.setattr(transkriptor, "_transcribe_task", hanging_task)
+        inputs = [input_dir / "chat-0.chat.json", input_dir / "chat-1.chat.json"]
+        settings = BatchSettings(jobs=2, timeout_seconds=0.1, retry_attempts=0)
+
+        started = time.monotonic()
+        results = transcribe_batch(inputs, tmp_path / "out", settings)
+
+        assert time.monotonic() - started < 1.0
+        assert [r["status"] for r in results] == ["success", "failed"]
+        assert results[1]["error_code"] == "PROCESSING_TIMEOUT"
+
+    def test_settings_follow_mode_configuration(self):
+        """Prüft Timeout und Wiederholungen aus mode.transkriptor.yaml"""
+        settings = BatchSettings.from_config()
+        assert settings.timeout_seconds == 300
+        assert settings.retry_attempts == 2
+        assert settings.jobs >= 1
+
+
+class TestShardedTranskription:
+    """Test-Klasse für die Aufteilung großer Exporte in Nachrichtenbereiche"""
+
+    @staticmethod
+    def mixed_messages(count):
+        """Nachrichten mit wechselnden Rollen und Längen"""
+        roles = ["user", "assistant", "user", "system", "assistant"]
+        return [{"role": roles[i % len(roles)], "content": "ä" * (i % 13 + 1) + f" {i}"}
+                for i in range(count)]
+
+    def test_shard_bases_are_prefix_sums(self):
+        """Prüft Startposition und Speaker-Zähler jedes Bereichs"""
+        messages = self.mixed_messages(23)
+        serial = list(iter_turns(messages))
+        final_counts = {}
+
+        for shard, position, counts, first in iter_shards(messages, 5, final_counts):
+            first_turn = serial[first]
+            assert position == first_turn["char_pos_start"]
+            assert counts.get(first_turn["speaker"], 0) == first_turn["index"]
+            assert len(shard) == min(5, 23 - first)
+
+        assert final_counts == {"user": 10, "agent": 9, "system": 4}
+
+    def test_sharded_output_identical_to_serial(self, tmp_path):
+        """Prüft, dass die zusammengesetzte Ausgabe byte-identisch ist"""
+        input_file = write_chat_export(tmp_path / "big.chat.json", self.mixed_messages(101))
+        transcribe_file(input_file, tmp_path / "serial.transcript.json")
+
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            result = transcribe_file(input_file, tmp_path / "sharded.transcript.json",
+                                     pool=pool, shard_messages=7)
+
+        assert (tmp_path / "sharded.transcript.json").read_bytes() == \
+            (tmp_path / "serial.transcript.json").read_bytes()
+        assert result["turns"] == 101
+        assert result["speakers"] == {"user": 41, "agent": 40, "system": 20}
+
+    def test_shard_errors_match_serial(self, tmp_path):
+        """Prüft, dass Fehler in einem Bereich wie im seriellen Lauf gemeldet werden"""
+        messages = self.mixed_messages(40)
+        messages[23]["role"] = "tool"
+        input_file = write_chat_export(tmp_path / "bad.chat.json", messages)
+
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            with pytest.raises(TranscriptError) as error:
+                transcribe_file(input_file, tmp_path / "bad.transcript.json",
+                                pool=pool, shard_messages=5)
+
+        assert error.value.code == "SPEAKER_DETECTION_FAILED"
+        assert "Message 23" in str(error.value)
+        assert not (tmp_path / "bad.transcript.json").exists()
+
+    def test_batch_shards_large_exports(self, tmp_path):
+        """Prüft, dass große Exporte im Stapellauf aufgeteilt und korrekt geschrieben werden"""
+        input_dir = tmp_path / "input"
+        input_dir.mkdir()
+        write_chat_export(input_dir / "large.chat.json", self.mixed_messages(300))
+        write_chat_export(input_dir / "small.chat.json", self.mixed_messages(3))
+        settings = BatchSettings(jobs=2, shard_threshold_mb=0.005, shard_messages=50)
+
+        results = transcribe_batch(find_inputs(input_dir), tmp_path / "out", settings)
+
+        assert [r["status"] for r in results] == ["success", "success"]
+        expected = json.dumps(list(iter_turns(self.mixed_messages(300))), indent=2,
+                              ensure_ascii=False)
+        assert (tmp_path / "out" / "large.transcript.json").read_text(encoding='utf-8') == expected
+
+    def test_large_export_shards_queued_first(self, tmp_path, monkeypatch):
+        """Prüft, dass kleine Exporte erst nach den Bereichen großer Exporte eingereiht werden"""
+        submitted = []
+
+        class RecordingPool(ThreadPoolExecutor):
+            def submit(self, fn, *args, **kwargs):
+                submitted.append(fn.__name__)
+                return super().submit(fn, *args, **kwargs)
+
+        monkeypatch.setattr(transkriptor, "ProcessPoolExecutor", RecordingPool)
+        input_dir = tmp_path / "input"
+        input_dir.mkdir()
+        write_chat_export(input_dir / "a-small.chat.json", self.mixed_messages(3))
+        write_chat_export(input_dir / "b-large.chat.json", self.mixed_messages(300))
+        settings = BatchSettings(jobs=2, shard_threshold_mb=0.005, shard_messages=50)
+
+        results = transcribe_batch(find_inputs(input_dir), tmp_path / "out", settings)
+
+        assert [r["status"] for r in results] == ["success", "success"]
+        assert submitted == ["_transcribe_shard"] * 6 + ["_transcribe_task"]
+
+    def test_hanging_shard_times_out(self, tmp_path, monkeypatch):
+        """Prüft, dass das Warten auf einen Bereich durch die Frist der Datei begrenzt ist"""
+        monkeypatch.setattr(transkriptor, "_transcribe_shard",
+                            lambda *args: time.sleep(1.0))
+        input_file = write_chat_export(tmp_path / "big.chat.json", self.mixed_messages(20))
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            started = time.monotonic()
+            with pytest.raises(TranscriptError) as error:
+                transcribe_file(input_file, tmp_path / "big.transcript.json",
+                                timeout_seconds=0.1, pool=pool, shard_messages=5)
+            elapsed = time.monotonic() - started
+
+        assert error.value.code == "PROCESSING_TIMEOUT"
+        assert elapsed < 1.0
+        assert not (tmp_path / "big.transcript.json").exists()
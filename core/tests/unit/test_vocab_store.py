@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für den Vocab-Store
+Prüft Snapshot-Lookup, Neuaufbau nach Änderungen und Fehlercodes
+"""
+
+import os
+
+import pytest
+import yaml
+
+from core.agents.intent_mapper import MappingError, load_vocabulary
+from core.vocab import vocab_store
+from core.vocab.vocab_store import VocabSnapshot, VocabStore, VocabStoreError, compile_snapshot
+
+
+def write_vocab(path, ids):
+    intents = [{"id": intent_id, "label": f"Label {intent_id}", "description": None,
+                "created_on": "2025-06-28T00:00:00Z", "origin": "manual"} for intent_id in ids]
+    path.write_text(yaml.safe_dump({"intents": intents}), encoding='utf-8')
+
+
+class TestVocabStore:
+    """Test-Klasse für kompilierte Vokabular-Snapshots"""
+
+    def test_sorted_lookup(self):
+        """Prüft Binärsuche, Reihenfolge nach ID und verzögert dekodierte Einträge"""
+        ids = ["task.execute", "confirm.approval", "ärger.melden", "inform.question"]
+        snapshot = VocabSnapshot(compile_snapshot([{"id": i, "label": i.upper()} for i in ids]))
+
+        assert list(snapshot.ids()) == sorted(ids)
+        assert len(snapshot) == 4
+        assert "ärger.melden" in snapshot and "inform" not in snapshot and None not in snapshot
+        assert snapshot.get("task.execute") == {"id": "task.execute", "label": "TASK.EXECUTE"}
+        assert snapshot.label_at(snapshot.find("confirm.approval")) == "CONFIRM.APPROVAL"
+        assert VocabSnapshot(compile_snapshot([])).find("a.b") is None
+
+    def test_prefix_queries(self, tmp_path):
+        """Prüft Präfixbereiche, Kategorienzählung, nächste Nummer und Mapper-Scope"""
+        ids = ["inform.question", "inform.uncategorized.00002", "inform.uncategorized.00010",
+               "informal.chat", "confirm.approval", "task.execute", "inform.uncategorized.x"]
+        vocab = tmp_path / "vocab.yaml"
+        write_vocab(vocab, ids)
+        snapshot = VocabStore(vocab).snapshot()
+
+        assert list(snapshot.with_prefix("inform.")) == [
+            "inform.question", "inform.uncategorized.00002", "inform.uncategorized.00010",
+            "inform.uncategorized.x"]
+        assert snapshot.count_prefix("inform") == 5
+        assert snapshot.count_prefix("zzz.") == 0
+        assert snapshot.categories() == {"confirm": 1, "inform": 4, "informal": 1, "task": 1}
+        assert snapshot.next_number("inform.uncategorized") == 11
+        assert snapshot.next_number("task.other") == 1
+
+        scoped = load_vocabulary(vocab, "task.")
+        assert [intent["id"] for intent in scoped] == ["task.execute"]
+        with pytest.raises(MappingError) as error:
+            load_vocabulary(vocab, "missing.")
+        assert error.value.code == "VOCABULARY_EMPTY"
+
+    def test_snapshot_follows_source(self, tmp_path):
+        """Prüft Wiederverwendung, Neuaufbau nach Änderung und reines Berühren der Quelle"""
+        vocab = tmp_path / "vocab.yaml"
+        write_vocab(vocab, ["a.one", "b.two"])
+        first = VocabStore(vocab).snapshot()
+        assert list(first.ids()) == ["a.one", "b.two"]
+        assert (tmp_path / ".vocab.snapshot").exists()
+
+        reopened = VocabStore(vocab)
+        reopened.rebuild = None  # Ein gültiger Snapshot darf nicht neu kompiliert werden
+        assert list(reopened.snapshot().ids()) == ["a.one", "b.two"]
+
+        stat = vocab.stat()
+        os.utime(vocab, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        assert reopened.snapshot() is not None, "Touched source must not trigger a rebuild"
+
+        store = VocabStore(vocab)
+        store.snapshot()
+        write_vocab(vocab, ["a.one", "b.two", "c.three"])
+        assert "c.three" in store.snapshot()
+        assert "b.two" in first, "Snapshots opened earlier stay readable"
+
+    def test_source_hashed_only_for_same_size(self, tmp_path, monkeypatch):
+        """Prüft, dass nur bei gleicher Größe und neuer mtime gehasht wird"""
+        vocab = tmp_path / "vocab.yaml"
+        write_vocab(vocab, ["a.one", "b.two"])
+        store = VocabStore(vocab)
+        snapshot = store.snapshot()
+        hashed = []
+        digest = vocab_store.file_digest
+        monkeypatch.setattr(vocab_store, "file_digest",
+                            lambda path: hashed.append(path) or digest(path))
+
+        assert store._is_current(snapshot, vocab.stat())
+        write_vocab(vocab, ["a.one", "b.two", "c.three"])
+        assert not store._is_current(snapshot, vocab.stat())
+        assert hashed == [], "Unchanged mtime or changed size must not hash the source"
+
+        write_vocab(vocab, ["a.one", "b.two"])
+        stat = vocab.stat()
+        os.utime(vocab, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        assert store._is_current(snapshot, vocab.stat())
+        assert hashed == [vocab]
+
+    def test_snapshot_mode_follows_umask(self, tmp_path):
+        """Prüft, dass der atomar ersetzte Snapshot nicht mit 0600 angelegt wird"""
+        vocab = tmp_path / "vocab.yaml"
+        write_vocab(vocab, ["a.one"])
+        umask = os.umask(0)
+        os.umask(umask)
+
+        VocabStore(vocab).rebuild()
+        snapshot_path = tmp_path / ".vocab.snapshot"
+        assert snapshot_path.stat().st_mode & 0o777 == 0o666 & ~umask
+
+        snapshot_path.chmod(0o640)
+        VocabStore(vocab).rebuild()
+        assert snapshot_path.stat().st_mode & 0o777 == 0o640
+
+    def test_error_codes(self, tmp_path):
+        """Prüft Fehlercodes für fehlende Datei und doppelte IDs"""
+        with pytest.raises(VocabStoreError) as error:
+            VocabStore(tmp_path / "missing.yaml").snapshot()
+        assert error.value.code == "VOCABULARY_MISSING"
+
+        vocab = tmp_path / "vocab.yaml"
+        write_vocab(vocab, ["a.one", "a.one"])
+        with pytest.raises(VocabStoreError) as error:
+            VocabStore(vocab).snapshot()
+        assert error.value.code == "DUPLICATE_INTENT_ID"
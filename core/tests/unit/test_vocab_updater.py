@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für den Vocab-Updater
+Prüft sortierten Merge, History-Anhang, Sicherung, Rücksetzen bei Fehlern und Inbox-Index
+"""
+
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+import yaml
+
+from core.agents import vocab_updater
+from core.agents.intent_mapper import load_vocabulary
+from core.agents.suggestion_inbox import SuggestionInbox
+from core.agents.vocab_updater import UpdaterSettings, process_inbox, update_vocabulary
+
+VOCAB_DIR = Path(__file__).resolve().parent.parent.parent / "vocab"
+NOW = datetime(2025, 7, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def settings_for(tmp_path):
+    shutil.copy(VOCAB_DIR / "vocab.yaml", tmp_path / "vocab.yaml")
+    shutil.copy(VOCAB_DIR / "vocab.history.yaml", tmp_path / "vocab.history.yaml")
+    return UpdaterSettings(vocab_path=tmp_path / "vocab.yaml",
+                           history_path=tmp_path / "vocab.history.yaml",
+                           backup_dir=tmp_path / "backups")
+
+
+def write_suggestion(path, suggested_id, status="approved"):
+    path.write_text(yaml.safe_dump({
+        "suggested_id": suggested_id, "label": f"Label {suggested_id}",
+        "explanation": "Erklärung", "source_turn": "user:3",
+        "metadata": {"created_on": "2025-06-29T00:00:00Z", "status": status}}), encoding='utf-8')
+    return path
+
+
+class TestVocabUpdater:
+    """Test-Klasse für stapelweise Vokabular-Updates"""
+
+    def test_batch_is_merged_sorted(self, tmp_path):
+        """Prüft Sortierung, erhaltene Kommentare, History-Anhang und eine Sicherung je Stapel"""
+        settings = settings_for(tmp_path)
+        files = [write_suggestion(tmp_path / "b.yaml", "inform.uncategorized.00002"),
+                 write_suggestion(tmp_path / "a.yaml", "confirm.cancel"),
+                 write_suggestion(tmp_path / "c.yaml", "task.execute"),
+                 write_suggestion(tmp_path / "d.yaml", "task.pause", status="pending")]
+
+        summary = update_vocabulary(files, settings, now=NOW)
+
+        assert summary["intents_added"] == 2
+        assert [s["reason"] for s in summary["skipped"]] == ["duplicate", "not_approved"]
+        ids = [intent["id"] for intent in load_vocabulary(settings.vocab_path)]
+        assert ids == sorted(ids) and "confirm.cancel" in ids and len(ids) == 6
+        added = next(i for i in load_vocabulary(settings.vocab_path) if i["id"] == "confirm.cancel")
+        assert added["added_by"] == "vocab-updater" and added["created_on"] == "2025-06-29T00:00:00Z"
+
+        text = settings.vocab_path.read_text(encoding='utf-8')
+        assert text.startswith("# Central Intent Vocabulary")
+        assert text.rstrip().endswith("no existing IDs are modified")
+
+        history_text = settings.history_path.read_text(encoding='utf-8')
+        history = yaml.safe_load(history_text)["history"]
+        assert [h["id"] for h in history[-2:]] == ["confirm.cancel", "inform.uncategorized.00002"]
+        assert history_text.rstrip().endswith("consistency with vocab.yaml")
+        assert len(list((tmp_path / "backups").iterdir())) == 1
+
+    def test_replaced_vocabulary_keeps_mode(self, tmp_path):
+        """Prüft, dass die atomar ersetzte vocab.yaml ihre Dateirechte behält"""
+        settings = settings_for(tmp_path)
+        settings.vocab_path.chmod(0o664)
+
+        update_vocabulary([write_suggestion(tmp_path / "a.yaml", "confirm.cancel")],
+                          settings, now=NOW)
+
+        assert settings.vocab_path.stat().st_mode & 0o777 == 0o664
+
+    def test_unquoted_timestamps_stay_iso(self, tmp_path):
+        """Prüft, dass von YAML als datetime gelesene Zeitstempel im ISO-Format bleiben"""
+        settings = settings_for(tmp_path)
+        vocab = settings.vocab_path.read_text(encoding='utf-8')
+        settings.vocab_path.write_text(vocab.replace('created_on: "2025-06-28T00:00:00Z"',
+                                                     'created_on: 2025-06-28T00:00:00Z'),
+                                       encoding='utf-8')
+        suggestion = tmp_path / "a.yaml"
+        suggestion.write_text("suggested_id: confirm.cancel\nlabel: Cancel\nexplanation: Stop\n"
+                              "metadata:\n  created_on: 2025-07-01T10:00:00Z\n  status: approved\n",
+                              encoding='utf-8')
+
+        update_vocabulary([suggestion], settings, now=NOW)
+
+        created = {i["id"]: i["created_on"] for i in load_vocabulary(settings.vocab_path)}
+        assert created["confirm.cancel"] == "2025-07-01T10:00:00Z"
+        assert created["task.execute"] == "2025-06-28T00:00:00Z"
+
+    def test_failed_write_rolls_back_history(self, tmp_path, monkeypatch):
+        """Prüft, dass ein Fehler beim Schreiben von vocab.yaml beide Dateien unverändert lässt"""
+        settings = settings_for(tmp_path)
+        vocab_before = settings.vocab_path.read_bytes()
+        history_before = settings.history_path.read_bytes()
+
+        def fail(*args):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(vocab_updater, "write_vocabulary", fail)
+        with pytest.raises(OSError):
+            update_vocabulary([write_suggestion(tmp_path / "a.yaml", "confirm.cancel")],
+                              settings, now=NOW)
+
+        assert settings.vocab_path.read_bytes() == vocab_before
+        assert settings.history_path.read_bytes() == history_before
+
+    def test_inbox_touches_only_new_approvals(self, tmp_path):
+        """Prüft, dass nur neue oder neu freigegebene Vorschläge gelesen und übernommen werden"""
+        settings = settings_for(tmp_path)
+        inbox_dir = tmp_path / "suggestions"
+        inbox_dir.mkdir()
+        write_suggestion(inbox_dir / "a.yaml", "confirm.cancel")
+        pending = write_suggestion(inbox_dir / "b.yaml", "task.pause", status="pending")
+
+        with SuggestionInbox(inbox_dir) as inbox:
+            first = process_inbox(inbox, settings, now=NOW)
+            assert (first["files_parsed"], first["files_processed"], first["intents_added"]) == (2, 1, 1)
+
+            second = process_inbox(inbox, settings, now=NOW)
+            assert (second["files_parsed"], second["files_processed"]) == (0, 0)
+
+            write_suggestion(pending, "task.pause")
+            third = process_inbox(inbox, settings, now=NOW)
+            assert (third["files_parsed"], third["files_processed"], third["intents_added"]) == (1, 1, 1)
+            assert "task.pause" in inbox and "task.unknown" not in inbox
+
+        assert "task.pause" in [i["id"] for i in load_vocabulary(settings.vocab_path)]
+
+    def test_inbox_records_rejected_files_as_skipped(self, tmp_path):
+        """Prüft, dass doppelte Vorschläge als übersprungen statt verarbeitet gelten"""
+        settings = settings_for(tmp_path)
+        inbox_dir = tmp_path / "suggestions"
+        inbox_dir.mkdir()
+        write_suggestion(inbox_dir / "a.yaml", "confirm.cancel")
+        duplicate = write_suggestion(inbox_dir / "b.yaml", "task.execute")
+
+        with SuggestionInbox(inbox_dir) as inbox:
+            summary = process_inbox(inbox, settings, now=NOW)
+            assert (summary["files_processed"], summary["files_skipped"]) == (1, 1)
+            assert inbox.skipped() == [duplicate]
+            assert process_inbox(inbox, settings, now=NOW)["files_skipped"] == 0
+
+            write_suggestion(duplicate, "task.pause")
+            assert process_inbox(inbox, settings, now=NOW)["files_processed"] == 1
+            assert inbox.skipped() == []
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+RooCode Vocabulary Store
+vocab.yaml bleibt die Quelle; ein kompilierter, per mmap lesbarer Snapshot
+(sortierte IDs, Labels, Einträge) erspart Konsumenten das YAML-Parsen
+"""
+
+import os
+import re
+import mmap
+import json
+import struct
+import hashlib
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import yaml
+
+from core.common.atomic_file import atomic_output
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+VOCAB_PATH = PROJECT_ROOT / "core" / "vocab" / "vocab.yaml"
+
+# category.subcategory, optional mit laufender Nummer (suggested_id der Intent-Discovery)
+INTENT_ID_PATTERN = re.compile(r"^[a-z][a-z0-9_]*\.[a-z][a-z0-9_]*(\.[0-9]+)?$")
+
+# ISO 8601 in UTC wie in vocab.yaml und vocab.history.yaml
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+MAGIC = b"RCVOCAB1"
+# Magic, Anzahl, Quellgröße, Quell-mtime (ns), SHA-256 der Quelle
+HEADER = struct.Struct("<8sQQQ32s")
+
+
+class VocabStoreError(ValueError):
+    """Vokabular fehlt oder ist nicht kompilierbar (Codes wie in spec.intent-mapper.yaml)"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+
+    def __reduce__(self):
+        return (VocabStoreError, (self.code, self.message))
+
+
+def snapshot_path_for(vocab_path: Path) -> Path:
+    """Snapshot neben der Quelldatei (vocab.yaml -> .vocab.snapshot)"""
+    vocab_path = Path(vocab_path)
+    return vocab_path.with_name(f".{vocab_path.stem}.snapshot")
+
+
+def iso_timestamp(value: Any) -> Any:
+    """Von YAML als Datum geparste Werte (unquotiertes created_on) als ISO-8601-String"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.strftime(TIMESTAMP_FORMAT)
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%dT00:00:00Z")
+    return value
+
+
+def _json_default(value: Any) -> str:
+    return str(iso_timestamp(value))
+
+
+def file_digest(path: Path) -> bytes:
+    """SHA-256 einer Datei, blockweise gelesen"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def parse_vocabulary(vocab_path: Path) -> List[Dict[str, Any]]:
+    """Liest die intents-Liste aus vocab.yaml; IDs müssen vorhanden und eindeutig sein"""
+    try:
+        with open(vocab_path, 'r', encoding='utf-8') as f:
+            vocab = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        raise VocabStoreError("VOCABULARY_MISSING", f"{vocab_path} not found") from None
+    except (OSError, yaml.YAMLError) as e:
+        raise VocabStoreError("VOCABULARY_INVALID_FORMAT", f"{vocab_path}: {e}") from None
+
+    intents = vocab.get("intents") if isinstance(vocab, dict) else None
+    if intents is None:
+        intents = []
+    if not isinstance(intents, list):
+        raise VocabStoreError("VOCABULARY_INVALID_FORMAT", f"{vocab_path} has no intents list")
+    seen = set()
+    for intent in intents:
+        intent_id = intent.get("id") if isinstance(intent, dict) else None
+        if not isinstance(intent_id, str):
+            raise VocabStoreError("VOCABULARY_INVALID_FORMAT", f"Invalid intent id: {intent_id!r}")
+        if intent_id in seen:
+            raise VocabStoreError("DUPLICATE_INTENT_ID", f"Duplicate intent id: {intent_id}")
+        seen.add(intent_id)
+    return intents
+
+
+def _section(values: List[bytes], start: int) -> Tuple[np.ndarray, bytes]:
+    """Absolute Offsets (n+1) und zusammenhängender Datenblock"""
+    offsets = np.zeros(len(values) + 1, dtype='<u8')
+    if values:
+        offsets[1:] = np.cumsum([len(value) for value in values])
+    offsets += start
+    return offsets, b"".join(values)
+
+
+def compile_snapshot(intents: List[Dict[str, Any]], source_size: int = 0,
+                     source_mtime_ns: int = 0, source_digest: bytes = b"\0" * 32) -> bytes:
+    """Kodiert die Intents nach ID (UTF-8-Bytefolge) sortiert.
+
+    Aufbau: Kopf, drei Offset-Tabellen (IDs, Labels, Einträge als JSON) und
+    die zugehörigen Datenblöcke; alle Offsets sind absolut in der Datei.
+    """
+    ordered = sorted(intents, key=lambda intent: intent["id"].encode('utf-8'))
+    columns = [[intent["id"].encode('utf-8') for intent in ordered],
+               [str(intent.get("label") or "").encode('utf-8') for intent in ordered],
+               [json.dumps(intent, ensure_ascii=False, default=_json_default).encode('utf-8')
+                for intent in ordered]]
+    position = HEADER.size + 3 * 8 * (len(ordered) + 1)
+    tables, blobs = [], []
+    for values in columns:
+        offsets, blob = _section(values, position)
+        tables.append(offsets.tobytes())
+        blobs.append(blob)
+        position += len(blob)
+    header = HEADER.pack(MAGIC, len(ordered), source_size, source_mtime_ns, source_digest)
+    return b"".join([header] + tables + blobs)
+
+
+class VocabSnapshot:
+    """Lesender Zugriff auf einen kompilierten Snapshot (mmap oder Bytes).
+
+    ID-Suche per Binärsuche in O(log n); Einträge werden erst beim Zugriff dekodiert.
+    """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap]):
+        if len(buffer) < HEADER.size:
+            raise VocabStoreError("VOCABULARY_INVALID_FORMAT", "Snapshot truncated")
+        magic, count, self.source_size, self.source_mtime_ns, self.source_digest = \
+            HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise VocabStoreError("VOCABULARY_INVALID_FORMAT", "Not a vocabulary snapshot")
+        self.buffer = buffer
+        self.count = count
+        width = count + 1
+        self._id_offsets, self._label_offsets, self._record_offsets = (
+            np.frombuffer(buffer, dtype='<u8', count=width, offset=HEADER.size + i * 8 * width)
+            for i in range(3))
+        if count and int(self._record_offsets[-1]) > len(buffer):
+            raise VocabStoreError("VOCABULARY_INVALID_FORMAT", "Snapshot truncated")
+
+    @classmethod
+    def open(cls, path: Path) -> "VocabSnapshot":
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def _slice(self, offsets: np.ndarray, position: int) -> bytes:
+        return self.buffer[int(offsets[position]):int(offsets[position + 1])]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def id_at(self, position: int) -> str:
+        return self._slice(self._id_offsets, position).decode('utf-8')
+
+    def label_at(self, position: int) -> str:
+        return self._slice(self._label_offsets, position).decode('utf-8')
+
+    def record_at(self, position: int) -> Dict[str, Any]:
+        return json.loads(self._slice(self._record_offsets, position))
+
+    def _bisect(self, key: bytes, width: Optional[int] = None, right: bool = False,
+                low: int = 0) -> int:
+        """Erste Position, deren (auf ``width`` Bytes gekürzte) ID >= bzw. > ``key`` ist"""
+        high = self.count
+        while low < high:
+            middle = (low + high) // 2
+            value = self._slice(self._id_offsets, middle)[:width]
+            if value < key or (right and value == key):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def find(self, intent_id: str) -> Optional[int]:
+        """Position der ID oder None"""
+        key = intent_id.encode('utf-8')
+        position = self._bisect(key)
+        if position < self.count and self._slice(self._id_offsets, position) == key:
+            return position
+        return None
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """Positionsbereich [start, stop) aller IDs mit dem Präfix (z.B. "inform.").
+
+        Die sortierten IDs bilden einen impliziten Präfixbaum: jeder Teilbaum ist
+        ein zusammenhängender Bereich, gefunden mit zwei Binärsuchen.
+        """
+        key = prefix.encode('utf-8')
+        start = self._bisect(key, len(key))
+        return start, self._bisect(key, len(key), right=True, low=start)
+
+    def with_prefix(self, prefix: str) -> Iterator[str]:
+        start, stop = self.prefix_range(prefix)
+        return (self.id_at(position) for position in range(start, stop))
+
+    def records_with_prefix(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        start, stop = self.prefix_range(prefix)
+        return (self.record_at(position) for position in range(start, stop))
+
+    def count_prefix(self, prefix: str) -> int:
+        start, stop = self.prefix_range(prefix)
+        return stop - start
+
+    def categories(self) -> Dict[str, int]:
+        """Anzahl Intents je Kategorie (erstes ID-Segment); ein Sprung je Kategorie"""
+        counts: Dict[str, int] = {}
+        position = 0
+        while position < self.count:
+            category = self.id_at(position).split(".", 1)[0]
+            _, stop = self.prefix_range(f"{category}.")
+            if stop <= position:
+                # ID ohne Punkt: eigene Kategorie der Länge eins
+                stop = position + 1
+            counts[category] = counts.get(category, 0) + stop - position
+            position = stop
+        return counts
+
+    def next_number(self, prefix: str) -> int:
+        """Nächste freie laufende Nummer für IDs der Form {prefix}.{nummer}"""
+        highest = 0
+        for intent_id in self.with_prefix(f"{prefix}."):
+            number = intent_id[len(prefix) + 1:]
+            if number.isdigit():
+                highest = max(highest, int(number))
+        return highest + 1
+
+    def __contains__(self, intent_id: object) -> bool:
+        return isinstance(intent_id, str) and self.find(intent_id) is not None
+
+    def get(self, intent_id: str) -> Optional[Dict[str, Any]]:
+        position = self.find(intent_id)
+        return self.record_at(position) if position is not None else None
+
+    def ids(self) -> Iterator[str]:
+        return (self.id_at(position) for position in range(self.count))
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """Alle Einträge in ID-Reihenfolge"""
+        return (self.record_at(position) for position in range(self.count))
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            # Offset-Tabellen verweisen auf den mmap-Puffer und müssen vorher weg
+            self._id_offsets = self._label_offsets = self._record_offsets = None
+            self.buffer.close()
+
+    def __enter__(self) -> "VocabSnapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class VocabStore:
+    """vocab.yaml mit automatisch nachgeführtem Snapshot.
+
+    Eine geänderte Größe der Quelle macht den Snapshot sofort ungültig; bei
+    gleicher Größe und mtime ist er gültig. Nur bei gleicher Größe und anderer
+    mtime entscheidet der SHA-256 des Inhalts, ob neu kompiliert wird. Ist das
+    Snapshot-Verzeichnis nicht beschreibbar, wird im Speicher kompiliert.
+    """
+
+    def __init__(self, vocab_path: Path = VOCAB_PATH, snapshot_path: Optional[Path] = None):
+        self.vocab_path = Path(vocab_path)
+        self.snapshot_path = Path(snapshot_path) if snapshot_path is not None \
+            else snapshot_path_for(self.vocab_path)
+        self._snapshot: Optional[VocabSnapshot] = None
+
+    def _is_current(self, snapshot: VocabSnapshot, stat: os.stat_result) -> bool:
+        # Andere Größe: sicher geändert, ohne die Quelle zu hashen
+        if snapshot.source_size != stat.st_size:
+            return False
+        if snapshot.source_mtime_ns == stat.st_mtime_ns:
+            return True
+        return snapshot.source_digest == file_digest(self.vocab_path)
+
+    def snapshot(self) -> VocabSnapshot:
+        """Aktueller Snapshot; bei geänderter Quelle wird er neu kompiliert"""
+        try:
+            stat = self.vocab_path.stat()
+        except FileNotFoundError:
+            raise VocabStoreError("VOCABULARY_MISSING", f"{self.vocab_path} not found") from None
+        if self._snapshot is not None and self._is_current(self._snapshot, stat):
+            return self._snapshot
+        # Ein veralteter Snapshot bleibt für noch laufende Leser gültig
+        self._snapshot = None
+
+        try:
+            snapshot = VocabSnapshot.open(self.snapshot_path)
+            if self._is_current(snapshot, stat):
+                self._snapshot = snapshot
+                return snapshot
+            snapshot.close()
+        except (OSError, ValueError):
+            pass
+        self._snapshot = self.rebuild(stat)
+        return self._snapshot
+
+    def rebuild(self, stat: Optional[os.stat_result] = None) -> VocabSnapshot:
+        """Kompiliert vocab.yaml und ersetzt den Snapshot atomar"""
+        stat = stat or self.vocab_path.stat()
+        digest = file_digest(self.vocab_path)
+        data = compile_snapshot(parse_vocabulary(self.vocab_path), stat.st_size,
+                                stat.st_mtime_ns, digest)
+        try:
+            with atomic_output(self.snapshot_path, binary=True) as f:
+                f.write(data)
+            return VocabSnapshot.open(self.snapshot_path)
+        except OSError:
+            return VocabSnapshot(data)
+
+    def close(self):
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+
+def open_vocabulary(vocab_path: Path = VOCAB_PATH) -> VocabSnapshot:
+    """Snapshot zu einer vocab.yaml ohne eigenes Store-Objekt"""
+    return VocabStore(vocab_path).snapshot()